@@ -5,6 +5,19 @@ class Settings(BaseSettings):
     # Database Configuration (supports both SQLite and PostgreSQL/Supabase)
     DATABASE_URL: str = "sqlite:///./ntu_food.db"
 
+    # Connection pool (per worker process; size workers x (pool + overflow) against the DB limit)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+
+    # SQLite pragmas applied to every new connection (ignored for PostgreSQL)
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_MMAP_SIZE: int = 268435456
+
     # Supabase Configuration (optional, for future Supabase Auth integration)
     SUPABASE_URL: Optional[str] = None
     SUPABASE_KEY: Optional[str] = None
@@ -15,6 +28,14 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
 
+    # Authenticated user cache (per worker; TTL bounds staleness across workers)
+    AUTH_CACHE_TTL_SECONDS: int = 60
+    AUTH_CACHE_MAX_SIZE: int = 10000
+
+    # Password hashing pool (bcrypt runs off the event loop; 429 once max pending is reached)
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64
+
     # Frontend
     FRONTEND_URL: str = "http://localhost:3000"
 
@@ -30,6 +51,44 @@ class Settings(BaseSettings):
     SMTP_FROM_NAME: str = "NTU Food"
     APP_URL: str = "http://localhost:5173"
 
+    # Outbound mail queue (durable outbox drained by background SMTP workers)
+    MAIL_WORKERS: int = 2
+    MAIL_MAX_ATTEMPTS: int = 5
+    MAIL_RETRY_BASE_SECONDS: int = 10
+    MAIL_POLL_SECONDS: int = 5
+    MAIL_CLAIM_TIMEOUT_SECONDS: int = 300
+    MAIL_SMTP_TIMEOUT_SECONDS: int = 30
+
+    # Realtime updates (leave unset for the in-process broker, or redis://... for multi-worker)
+    EVENT_BROKER_URL: Optional[str] = None
+    EVENT_HEARTBEAT_SECONDS: int = 15
+
+    # Conditional GET for stalls/menus (ETags hash the response body)
+    HTTP_CACHE_MAX_AGE_SECONDS: int = 0
+
+    # Stall/menu catalogue cache (leave unset for in-process, or redis://... to share across workers)
+    CATALOGUE_CACHE_URL: Optional[str] = None
+    CATALOGUE_CACHE_TTL_SECONDS: int = 300
+
+    # Admin dashboard totals are recomputed at most this often
+    DASHBOARD_CACHE_TTL_SECONDS: int = 10
+
+    # Stall order changes feed: cursors stay this far behind now so late commits are not skipped
+    CHANGES_FEED_SETTLE_SECONDS: int = 10
+
+    # Per-request SQL profiling (Server-Timing header, /internal/metrics)
+    QUERY_BUDGET_PER_REQUEST: int = 20  # 0 disables the budget warning
+    QUERY_PROFILE_DEBUG: bool = False  # Log every statement of over-budget or slow requests
+    QUERY_PROFILE_SLOW_REQUEST_MS: float = 500
+    INTERNAL_METRICS_TOKEN: Optional[str] = None  # /internal/* and /metrics require "Authorization: Bearer <token>"
+    INTERNAL_METRICS_OPEN: bool = False  # Development only: serve them without a token when none is set
+
+    # Stall spatial index (rebuilt on stall writes; max age bounds staleness across workers)
+    STALL_INDEX_MAX_AGE_SECONDS: int = 60
+
+    # Queue index (kept current from committed sessions; max age bounds staleness across workers)
+    QUEUE_INDEX_MAX_AGE_SECONDS: int = 30
+
     class Config:
         env_file = ".env"
         case_sensitive = True
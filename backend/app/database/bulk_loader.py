@@ -0,0 +1,230 @@
+"""
+Bulk Loader for NTU Food App
+Streams CSV/JSON records into a table in batches, skipping or updating rows whose key already exists
+"""
+import csv
+import io
+import json
+import logging
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import UniqueConstraint, and_, bindparam, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.services.password_hasher import pwd_context
+
+logger = logging.getLogger(__name__)
+
+Key = Tuple
+
+
+def read_records(path) -> Iterator[dict]:
+    """
+    Stream records from a .csv, .jsonl/.ndjson (one object per line) or
+    .json file. A .json file holds one array and is parsed whole, so use
+    JSON lines for large imports.
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+    with path.open(encoding="utf-8", newline="") as handle:
+        if suffix == ".csv":
+            yield from csv.DictReader(handle)
+        elif suffix in (".jsonl", ".ndjson"):
+            for line in handle:
+                if line.strip():
+                    yield json.loads(line)
+        elif suffix == ".json":
+            data = json.load(handle)
+            yield from (data if isinstance(data, list) else [data])
+        else:
+            raise ValueError(f"Unsupported input format '{suffix}' (expected .csv, .json or .jsonl)")
+
+
+def copy_rows(db: Session, table, columns: Sequence[str], rows: Sequence[tuple]):
+    """
+    Append pre-formatted rows (plain tuples, values already in their database
+    representation) as fast as the backend allows: COPY ... FROM STDIN on
+    PostgreSQL, a single executemany elsewhere. No defaults, conflict
+    handling or type processing is applied.
+    """
+    if not rows:
+        return
+    connection = db.connection()
+    column_list = ", ".join(columns)
+    if connection.dialect.name == "postgresql":
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        buffer.seek(0)
+        # NULL is an unquoted empty field in COPY's csv format, which is how csv writes None
+        cursor = connection.connection.cursor()
+        try:
+            cursor.copy_expert(f"COPY {table.name} ({column_list}) FROM STDIN WITH (FORMAT csv)", buffer)
+        finally:
+            cursor.close()
+    else:
+        placeholder = "?" if connection.dialect.paramstyle == "qmark" else "%s"
+        connection.exec_driver_sql(
+            f"INSERT INTO {table.name} ({column_list}) VALUES ({', '.join([placeholder] * len(columns))})",
+            list(rows)
+        )
+
+
+@lru_cache(maxsize=None)
+def cached_password_hash(password: str) -> str:
+    """
+    bcrypt each distinct password once per process. Seed and synthetic users
+    share a handful of passwords, and a real hash costs ~100ms each.
+    """
+    return pwd_context.hash(password)
+
+
+@dataclass
+class LoadResult:
+    inserted: int = 0
+    updated: int = 0
+    skipped: int = 0
+
+    def __str__(self):
+        return f"{self.inserted} inserted, {self.updated} updated, {self.skipped} skipped"
+
+
+class BulkLoader:
+    """
+    Loads records into one table, identified by a natural key such as
+    Stall.name or (MenuItem.stall_id, MenuItem.name).
+
+    Existing keys are fetched in a single query up front, so each record is
+    checked in memory instead of with a SELECT per row. New rows are inserted
+    with one executemany per batch; when the key is backed by a unique
+    constraint the insert becomes ON CONFLICT DO NOTHING, so a concurrent
+    writer cannot make the batch fail. Existing rows are skipped, or updated
+    in a batched UPDATE with on_existing="update". The caller commits.
+    """
+
+    def __init__(self, db: Session, model, key: Sequence[str], on_existing: str = "skip", batch_size: int = 5000):
+        if on_existing not in ("skip", "update"):
+            raise ValueError("on_existing must be 'skip' or 'update'")
+        self.db = db
+        self.table = model.__table__
+        self.key = tuple(key)
+        self.on_existing = on_existing
+        self.batch_size = batch_size
+        self.existing: Optional[Dict[Key, Optional[int]]] = None
+
+    def load(self, records: Iterable[dict], transform: Optional[Callable[[dict], Optional[dict]]] = None) -> LoadResult:
+        """
+        Load records, optionally mapped through transform first (return None
+        to skip a record). Duplicate keys within the input keep the first.
+        """
+        if self.existing is None:
+            self.existing = self.fetch_ids()
+
+        result = LoadResult()
+        records = iter(records)
+        while True:
+            batch = list(islice(records, self.batch_size))
+            if not batch:
+                break
+            new_rows, existing_rows = [], []
+            for record in batch:
+                row = transform(record) if transform else record
+                if row is None:
+                    result.skipped += 1
+                    continue
+                key = tuple(row[column] for column in self.key)
+                if key not in self.existing:
+                    self.existing[key] = None
+                    new_rows.append(row)
+                elif self.on_existing == "update":
+                    existing_rows.append(row)
+                else:
+                    result.skipped += 1
+
+            inserted = self._insert(new_rows)
+            # Rows a concurrent writer inserted first are dropped by ON CONFLICT DO NOTHING
+            result.inserted += inserted
+            result.skipped += len(new_rows) - inserted
+            result.updated += self._update(existing_rows)
+            logger.debug(f"{self.table.name}: {result}")
+        return result
+
+    def fetch_ids(self) -> Dict[Key, Optional[int]]:
+        """Map every stored key to its primary key, in one query"""
+        columns = [self.table.c[column] for column in self.key]
+        primary_key = list(self.table.primary_key.columns)
+        id_column = primary_key[0] if len(primary_key) == 1 else None
+        rows = self.db.execute(select(*columns, *([id_column] if id_column is not None else []))).all()
+        width = len(columns)
+        return {tuple(row[:width]): (row[width] if id_column is not None else None) for row in rows}
+
+    def _insert(self, rows: List[dict]) -> int:
+        """Insert rows and return how many the database actually wrote"""
+        if not rows:
+            return 0
+        stmt, guarded = self._insert_statement()
+        dialect = self.db.get_bind().dialect
+        inserted = 0
+        # executemany needs the same columns in every row, so group by shape
+        for group in _group_by_columns(rows).values():
+            if not guarded:
+                self.db.execute(stmt, group)
+                inserted += len(group)
+            elif dialect.insert_executemany_returning:
+                # Conflicting rows return nothing, so this counts only real inserts
+                returned = self.db.execute(stmt.returning(*(self.table.c[column] for column in self.key)), group)
+                inserted += len(returned.all())
+            else:
+                result = self.db.execute(stmt, group)
+                counted = dialect.supports_sane_multi_rowcount and result.rowcount >= 0
+                inserted += result.rowcount if counted else len(group)
+        return inserted
+
+    def _update(self, rows: List[dict]) -> int:
+        for columns, group in _group_by_columns(rows).items():
+            values = [column for column in columns if column not in self.key]
+            if not values:
+                continue
+            stmt = update(self.table).where(and_(*[
+                self.table.c[column] == bindparam(f"key_{column}") for column in self.key
+            ])).values({column: bindparam(f"value_{column}") for column in values})
+            self.db.execute(stmt, [
+                {
+                    **{f"key_{column}": row[column] for column in self.key},
+                    **{f"value_{column}": row[column] for column in values}
+                }
+                for row in group
+            ])
+        return len(rows)
+
+    def _insert_statement(self):
+        """The insert to run, and whether it skips conflicting keys"""
+        dialect = self.db.get_bind().dialect.name
+        if _is_unique(self.table, self.key):
+            if dialect == "postgresql":
+                return postgresql.insert(self.table).on_conflict_do_nothing(index_elements=list(self.key)), True
+            if dialect == "sqlite":
+                return sqlite.insert(self.table).on_conflict_do_nothing(index_elements=list(self.key)), True
+        return self.table.insert(), False
+
+
+def _group_by_columns(rows: List[dict]) -> Dict[Tuple[str, ...], List[dict]]:
+    groups: Dict[Tuple[str, ...], List[dict]] = {}
+    for row in rows:
+        groups.setdefault(tuple(sorted(row)), []).append(row)
+    return groups
+
+
+def _is_unique(table, key: Tuple[str, ...]) -> bool:
+    wanted = set(key)
+    if {column.name for column in table.primary_key.columns} == wanted:
+        return True
+    if len(key) == 1 and table.c[key[0]].unique:
+        return True
+    candidates = [constraint.columns for constraint in table.constraints if isinstance(constraint, UniqueConstraint)]
+    candidates += [index.columns for index in table.indexes if index.unique]
+    return any({column.name for column in columns} == wanted for columns in candidates)
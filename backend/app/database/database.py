@@ -1,23 +1,97 @@
-from sqlalchemy import create_engine
+import asyncio
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.config import settings
+from app.database.pool import InstrumentedQueuePool, instrument_engine, pool_metrics
 
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False} if SQLALCHEMY_DATABASE_URL.startswith("sqlite") else {}
+IS_SQLITE = SQLALCHEMY_DATABASE_URL.startswith("sqlite")
+# In-memory SQLite lives inside a single connection, so keep SQLAlchemy's default pool for it
+IS_SQLITE_MEMORY = IS_SQLITE and (
+    SQLALCHEMY_DATABASE_URL in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in SQLALCHEMY_DATABASE_URL
 )
 
+def _engine_options() -> dict:
+    if IS_SQLITE_MEMORY:
+        return {"connect_args": {"check_same_thread": False}}
+
+    options = {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if IS_SQLITE:
+        # busy_timeout is set as a pragma below; the driver timeout is in seconds
+        options["connect_args"] = {
+            "check_same_thread": False,
+            "timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000,
+        }
+    return options
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **_engine_options())
+instrument_engine(engine)
+
+if IS_SQLITE:
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        if not IS_SQLITE_MEMORY:
+            cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+            cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+        cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        cursor.close()
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
-def get_db():
+# Request sessions are admitted only while the pool has a connection for them.
+# Sync endpoints hop between the event loop and the threadpool several times
+# (auth, handler, response validation) while their session holds a connection;
+# without admission control a burst could fill every threadpool slot with
+# requests blocked on an empty pool while the connection holders waited for a
+# slot, deadlocking until pool_timeout. Waiting here costs no thread.
+DB_MAX_CONNECTIONS = None if IS_SQLITE_MEMORY else settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+_request_permits: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+# Closing (a ROLLBACK round trip) runs on its own executor so it never queues behind requests
+_session_closer = ThreadPoolExecutor(max_workers=2, thread_name_prefix="db-session-close")
+
+def _permits() -> Optional[asyncio.Semaphore]:
+    if DB_MAX_CONNECTIONS is None:
+        return None
+    loop = asyncio.get_running_loop()
+    permits = _request_permits.get(loop)
+    if permits is None:
+        permits = _request_permits[loop] = asyncio.Semaphore(DB_MAX_CONNECTIONS)
+    return permits
+
+async def get_db():
+    permits = _permits()
+    if permits is not None:
+        await permits.acquire()
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
+        try:
+            await asyncio.get_running_loop().run_in_executor(_session_closer, db.close)
+        finally:
+            if permits is not None:
+                permits.release()
 
+def get_pool_stats() -> dict:
+    return {
+        "backend": engine.dialect.name,
+        **pool_metrics.stats(engine.pool),
+    }
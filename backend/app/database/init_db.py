@@ -5,6 +5,7 @@ from app.models.stall import Stall
 from app.models.menu import MenuItem
 from app.models.order import Order, OrderItem, OrderStatus
 from app.models.queue import QueueEntry, QueueStatus
+from app.models import analytics  # noqa: F401 - register rollup tables
 from passlib.context import CryptContext
 from datetime import time, datetime, timedelta
 
@@ -130,9 +131,10 @@ def create_test_data(session):
         user_id=test_user.id,
         stall_id=stall_a.id,
         total_amount=10.30,
-        status=OrderStatus.PENDING,
+        status=OrderStatus.PENDING_PAYMENT,
         queue_number=1,
-        pickup_time=datetime.now() + timedelta(minutes=15),
+        pickup_window_start=datetime.now() + timedelta(minutes=15),
+        pickup_window_end=datetime.now() + timedelta(minutes=30),
         order_number="ORD00001"
     )
     session.add(sample_order)
@@ -161,5 +163,49 @@ def reset_database():
     Base.metadata.create_all(bind=engine)
     print("✅ Database reset successfully!")
 
+def rebuild_rollups():
+    from app.services.sales_rollups import sales_rollups
+
+    # Creates the rollup tables on databases that predate them
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    session = SessionLocal()
+    try:
+        summary = sales_rollups.rebuild(session)
+        print(f"✅ Rebuilt {summary['stall_days']} stall-days, {summary['item_days']} item-days "
+              f"and {summary['stall_customers']} stall customers")
+    finally:
+        session.close()
+
+def generate_synthetic_data(users, stalls, items_per_stall, orders, days=90, seed=42, now=None):
+    from app.database.synthetic_data import SyntheticDataGenerator
+
+    # Explicit ids need empty tables
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    session = SessionLocal()
+    try:
+        generator = SyntheticDataGenerator(
+            users=users, stalls=stalls, items_per_stall=items_per_stall,
+            orders=orders, days=days, seed=seed, now=now
+        )
+        summary = generator.generate(session)
+        print(f"✅ Generated {summary.users:,} users, {summary.stalls:,} stalls, {summary.menu_items:,} menu items, "
+              f"{summary.orders:,} orders ({summary.order_items:,} items, {summary.queue_entries:,} queue entries) "
+              f"in {summary.seconds:.1f}s")
+    except Exception as e:
+        session.rollback()
+        print(f"❌ Error generating data: {e}")
+        raise
+    finally:
+        session.close()
+
+    # Analytics read the rollups, and the planner needs fresh statistics
+    rebuild_rollups()
+    with engine.begin() as connection:
+        connection.exec_driver_sql("ANALYZE")
+
 if __name__ == "__main__":
     init_database()
\ No newline at end of file
@@ -0,0 +1,117 @@
+"""
+Connection Pool Telemetry for NTU Food App
+Counts checkouts, waits, overflow and timeouts so workers can be sized against the database
+"""
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+
+class PoolMetrics:
+    """Process-wide pool counters; survives engine.dispose() recreating the pool"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.waits = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+        self.peak_checked_out = 0
+        self.peak_overflow = 0
+
+    def record_wait(self, wait_ms: float, timed_out: bool = False):
+        with self.lock:
+            # Checkouts served straight from the pool take microseconds; only count real waits
+            if wait_ms >= 1.0:
+                self.waits += 1
+            self.total_wait_ms += wait_ms
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+            if timed_out:
+                self.timeouts += 1
+
+    def record_checkout(self, checked_out: int, overflow: int):
+        with self.lock:
+            self.checkouts += 1
+            self.peak_checked_out = max(self.peak_checked_out, checked_out)
+            self.peak_overflow = max(self.peak_overflow, overflow)
+
+    def increment(self, counter: str):
+        with self.lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def stats(self, pool) -> dict:
+        live = {}
+        if isinstance(pool, QueuePool):
+            live = {
+                "pool_size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                # Negative while the pool has not yet opened pool_size connections
+                "overflow": pool.overflow(),
+                "max_overflow": pool._max_overflow,
+                "timeout_seconds": pool.timeout(),
+            }
+        with self.lock:
+            return {
+                "pool_class": type(pool).__name__,
+                **live,
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "invalidations": self.invalidations,
+                "waits": self.waits,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self.total_wait_ms / self.checkouts, 3) if self.checkouts else 0.0,
+                "max_wait_ms": round(self.max_wait_ms, 3),
+                "peak_checked_out": self.peak_checked_out,
+                "peak_overflow": self.peak_overflow,
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that times how long each checkout waits for a free connection"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            pool_metrics.record_wait((time.perf_counter() - started) * 1000, timed_out=True)
+            raise
+        pool_metrics.record_wait((time.perf_counter() - started) * 1000)
+        return connection
+
+
+def instrument_engine(engine):
+    """Attach pool event listeners that feed pool_metrics"""
+
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        pool_metrics.increment("connects")
+
+    @event.listens_for(engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        pool = engine.pool
+        if isinstance(pool, QueuePool):
+            pool_metrics.record_checkout(pool.checkedout(), pool.overflow())
+        else:
+            pool_metrics.record_checkout(0, 0)
+
+    @event.listens_for(engine, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        pool_metrics.increment("checkins")
+
+    @event.listens_for(engine, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        pool_metrics.increment("invalidations")
+
+
+# Initialize pool metrics
+pool_metrics = PoolMetrics()
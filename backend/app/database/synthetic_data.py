@@ -0,0 +1,331 @@
+"""
+Synthetic Data Generator for NTU Food App
+Builds a realistic order history (lunch peaks, status mix, queue entries) for capacity planning
+"""
+import math
+import random
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.database.bulk_loader import cached_password_hash, copy_rows
+from app.models.menu import MenuItem
+from app.models.order import Order, OrderItem
+from app.models.queue import QueueCounter, QueueEntry
+from app.models.stall import Stall
+from app.models.user import User
+
+# Share of a day's orders, mean minute after midnight and spread (minutes)
+MEAL_PEAKS = [
+    (0.10, 8 * 60 + 30, 30),    # breakfast before morning lectures
+    (0.55, 12 * 60 + 15, 35),   # lunch rush
+    (0.25, 18 * 60 + 30, 45),   # dinner
+]
+# The remainder arrives evenly over opening hours
+OPEN_MINUTE, CLOSE_MINUTE = 7 * 60, 22 * 60
+WEEKEND_WEIGHT = 0.35
+
+# Where stalls are placed, with their approximate coordinates
+CAMPUS_LOCATIONS = [
+    ("North Spine Food Court", 1.3470, 103.6802),
+    ("South Spine Food Court", 1.3425, 103.6820),
+    ("Canteen 2", 1.3483, 103.6855),
+    ("Canteen 9", 1.3522, 103.6853),
+    ("Canteen 11", 1.3549, 103.6865),
+    ("Canteen 13", 1.3509, 103.6810),
+    ("Koufu @ The Quad", 1.3443, 103.6800),
+    ("Pioneer Food Court", 1.3372, 103.6880),
+]
+CUISINES = ["Chinese", "Malay", "Indian", "Western", "Japanese", "Korean", "Vegetarian", "Beverages"]
+
+SYNTHETIC_PASSWORD = "password123"
+
+
+@dataclass
+class GeneratorSummary:
+    users: int = 0
+    stalls: int = 0
+    menu_items: int = 0
+    orders: int = 0
+    order_items: int = 0
+    queue_entries: int = 0
+    seconds: float = 0.0
+
+
+class _TableWriter:
+    """Buffers rows for one table and flushes them with copy_rows"""
+
+    def __init__(self, db: Session, model, columns: Sequence[str], batch_size: int):
+        self.db = db
+        self.table = model.__table__
+        self.columns = list(columns)
+        self.batch_size = batch_size
+        self.rows: List[tuple] = []
+        self.count = 0
+
+    def add(self, row: tuple):
+        self.rows.append(row)
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        copy_rows(self.db, self.table, self.columns, self.rows)
+        self.count += len(self.rows)
+        self.rows = []
+
+
+class SyntheticDataGenerator:
+    """
+    Generates users, stalls, menus and an order history ending at `now`.
+
+    Orders are spread over `days` days (weekends quieter), cluster around
+    breakfast, lunch and dinner, favour popular stalls and regular
+    customers, and carry the status mix and queue entries the app itself
+    would have produced. The same seed and `now` give identical data.
+
+    Rows are written with explicit ids into empty tables, so run it on a
+    freshly reset database.
+    """
+
+    def __init__(self, users: int, stalls: int, items_per_stall: int, orders: int, days: int = 90,
+                 seed: int = 42, now: Optional[datetime] = None, batch_size: int = 50_000):
+        self.n_users = users
+        self.n_stalls = stalls
+        self.items_per_stall = items_per_stall
+        self.n_orders = orders
+        self.days = days
+        self.rng = random.Random(seed)
+        self.now = (now or datetime.now()).replace(microsecond=0)
+        self.batch_size = batch_size
+
+    def generate(self, db: Session) -> GeneratorSummary:
+        started = time.perf_counter()
+        summary = GeneratorSummary()
+
+        summary.users = self._write_users(db)
+        prices, prep_times = self._write_stalls_and_menus(db)
+        summary.stalls = self.n_stalls
+        summary.menu_items = len(prices)
+
+        orders, order_items, queue_entries = self._write_orders(db, prices, prep_times)
+        summary.orders, summary.order_items, summary.queue_entries = orders, order_items, queue_entries
+
+        if db.get_bind().dialect.name == "postgresql":
+            # Explicit ids leave the serial sequences behind the data
+            for table in ("users", "stalls", "menu_items", "orders", "order_items", "queue_entries"):
+                db.connection().exec_driver_sql(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), COALESCE((SELECT MAX(id) FROM {table}), 1))"
+                )
+        db.commit()
+        summary.seconds = time.perf_counter() - started
+        return summary
+
+    # ---- users, stalls and menus ----
+
+    def _write_users(self, db: Session) -> int:
+        hashed = cached_password_hash(SYNTHETIC_PASSWORD)
+        created = _format_datetime(self.now - timedelta(days=self.days + 30))
+        writer = _TableWriter(db, User, [
+            "id", "ntu_email", "student_id", "name", "phone", "hashed_password",
+            "role", "is_active", "is_verified", "created_at", "updated_at"
+        ], self.batch_size)
+
+        writer.add((1, "admin@ntu.edu.sg", "ADMIN001", "System Administrator", "+65 90000000",
+                    hashed, "admin", True, True, created, created))
+        for i in range(self.n_stalls):
+            writer.add((2 + i, f"owner{i}@ntu.edu.sg", f"S{i:09d}", f"Stall Owner {i}", f"+65 8{i % 10_000_000:07d}",
+                        hashed, "stall_owner", True, True, created, created))
+        for i in range(self.n_users):
+            writer.add((self._first_student_id + i, f"student{i}@e.ntu.edu.sg", f"U{i:09d}", f"Student {i}",
+                        f"+65 9{i % 10_000_000:07d}", hashed, "student", True, True, created, created))
+        writer.flush()
+        return writer.count
+
+    @property
+    def _first_student_id(self) -> int:
+        return 2 + self.n_stalls
+
+    def _write_stalls_and_menus(self, db: Session) -> Tuple[Dict[int, float], Dict[int, int]]:
+        rng = self.rng
+        stalls = _TableWriter(db, Stall, [
+            "id", "name", "location", "avg_prep_time", "max_concurrent_orders", "cuisine_type",
+            "is_open", "rating", "owner_id", "latitude", "longitude", "building_name"
+        ], self.batch_size)
+        menu = _TableWriter(db, MenuItem, [
+            "id", "stall_id", "name", "price", "prep_time", "category",
+            "is_available", "is_vegetarian", "is_halal"
+        ], self.batch_size)
+
+        prices: Dict[int, float] = {}
+        prep_times: Dict[int, int] = {}
+        for stall_id in range(1, self.n_stalls + 1):
+            location, lat, lng = rng.choice(CAMPUS_LOCATIONS)
+            cuisine = rng.choice(CUISINES)
+            avg_prep_time = rng.randint(5, 20)
+            stalls.add((
+                stall_id, f"{cuisine} Stall {stall_id}", location, avg_prep_time, rng.randint(6, 20), cuisine,
+                True, round(rng.uniform(3.5, 4.9), 1), 1 + stall_id,
+                round(lat + rng.uniform(-0.0005, 0.0005), 6), round(lng + rng.uniform(-0.0005, 0.0005), 6), location
+            ))
+            for j in range(self.items_per_stall):
+                item_id = (stall_id - 1) * self.items_per_stall + j + 1
+                prices[item_id] = round(rng.uniform(2.5, 9.5) * 2) / 2
+                prep_times[item_id] = max(2, int(rng.gauss(avg_prep_time, 3)))
+                menu.add((
+                    item_id, stall_id, f"{cuisine} Dish {j + 1}", prices[item_id], prep_times[item_id],
+                    "Beverage" if cuisine == "Beverages" else ("Side" if j % 4 == 3 else "Main"),
+                    rng.random() > 0.05, rng.random() < 0.2, rng.random() < 0.6
+                ))
+        stalls.flush()
+        menu.flush()
+        return prices, prep_times
+
+    # ---- order history ----
+
+    def _write_orders(self, db: Session, prices: Dict[int, float], prep_times: Dict[int, int]) -> Tuple[int, int, int]:
+        rng = self.rng
+        orders = _TableWriter(db, Order, [
+            "id", "user_id", "stall_id", "total_amount", "status", "payment_status", "payment_method",
+            "queue_number", "pickup_window_start", "pickup_window_end", "order_number", "created_at", "updated_at"
+        ], self.batch_size)
+        items = _TableWriter(db, OrderItem, ["id", "order_id", "menu_item_id", "quantity", "unit_price"], self.batch_size)
+        entries = _TableWriter(db, QueueEntry, [
+            "id", "stall_id", "order_id", "queue_position", "estimated_wait_time", "status",
+            "joined_at", "ready_at", "collected_at"
+        ], self.batch_size)
+
+        # A few stalls and regular customers account for most orders
+        stall_ids = list(range(1, self.n_stalls + 1))
+        stall_weights = _cumulative([1 / (rank + 1) ** 0.8 for rank in rng.sample(range(self.n_stalls), self.n_stalls)])
+        user_ids = list(range(self._first_student_id, self._first_student_id + self.n_users))
+        user_weights = _cumulative([rng.paretovariate(1.5) for _ in user_ids])
+        item_offsets = list(range(self.items_per_stall))
+        item_weights = _cumulative([1 / (j + 1) for j in item_offsets])
+
+        queue_numbers: Dict[int, int] = {}
+        last_day: Dict[int, date] = {}
+        order_id = item_id = 0
+
+        for day, count in self._orders_per_day():
+            minutes = sorted(self._order_minutes(count, day))
+            day_stalls = rng.choices(stall_ids, cum_weights=stall_weights, k=count)
+            day_users = rng.choices(user_ids, cum_weights=user_weights, k=count)
+            day_start = datetime.combine(day, datetime.min.time())
+            for minute, stall_id, user_id in zip(minutes, day_stalls, day_users):
+                order_id += 1
+                created_at = day_start + timedelta(minutes=minute)
+                if last_day.get(stall_id) != day:
+                    last_day[stall_id] = day
+                    queue_numbers[stall_id] = 0
+                queue_numbers[stall_id] += 1
+
+                total, longest_prep = 0.0, 0
+                first_item = (stall_id - 1) * self.items_per_stall + 1
+                n_lines = 1 if rng.random() < 0.6 else (2 if rng.random() < 0.75 else 3)
+                for offset in set(rng.choices(item_offsets, cum_weights=item_weights, k=n_lines)):
+                    item_id += 1
+                    menu_item_id = first_item + offset
+                    quantity = 1 if rng.random() < 0.85 else 2
+                    total += prices[menu_item_id] * quantity
+                    longest_prep = max(longest_prep, prep_times[menu_item_id])
+                    items.add((item_id, order_id, menu_item_id, quantity, prices[menu_item_id]))
+
+                status, queue_status = self._status_for((self.now - created_at).total_seconds() / 60)
+                ready_at = created_at + timedelta(minutes=longest_prep + rng.randint(0, 10))
+                collected_at = ready_at + timedelta(minutes=rng.randint(1, 15))
+                done = status == "completed"
+                pickup_start = created_at + timedelta(minutes=15 + rng.randint(0, 15))
+                orders.add((
+                    order_id, user_id, stall_id, round(total, 2), status,
+                    "pending" if status in ("pending_payment", "cancelled") else "confirmed",
+                    "paynow" if rng.random() < 0.8 else "cash",
+                    queue_numbers[stall_id], _format_datetime(pickup_start),
+                    _format_datetime(pickup_start + timedelta(minutes=15)), f"ORD{order_id:05d}",
+                    _format_datetime(created_at), _format_datetime(collected_at if done else created_at)
+                ))
+                entries.add((
+                    order_id, stall_id, order_id, queue_numbers[stall_id], longest_prep, queue_status,
+                    _format_datetime(created_at),
+                    _format_datetime(ready_at) if status in ("ready", "completed") else None,
+                    _format_datetime(collected_at) if done else None
+                ))
+
+        for writer in (orders, items, entries):
+            writer.flush()
+
+        # Today's counters continue where the history stops, as the allocator would
+        copy_rows(db, QueueCounter.__table__, ["stall_id", "service_date", "last_number"], [
+            (stall_id, day.isoformat(), queue_numbers[stall_id]) for stall_id, day in sorted(last_day.items())
+        ])
+        return orders.count, items.count, entries.count
+
+    def _orders_per_day(self) -> List[Tuple[date, int]]:
+        today = self.now.date()
+        now_minute = self.now.hour * 60 + self.now.minute
+        days = [today - timedelta(days=offset) for offset in range(self.days - 1, -1, -1)]
+        weights = [WEEKEND_WEIGHT if day.weekday() >= 5 else 1.0 for day in days]
+        # Only the part of today that has already happened
+        weights[-1] *= _share_before(now_minute)
+
+        total = sum(weights)
+        counts = [int(self.n_orders * weight / total) for weight in weights]
+        counts[-2 if len(counts) > 1 else -1] += self.n_orders - sum(counts)
+        return [(day, count) for day, count in zip(days, counts) if count]
+
+    def _order_minutes(self, count: int, day: date) -> List[float]:
+        rng = self.rng
+        latest = CLOSE_MINUTE
+        if day == self.now.date():
+            latest = min(CLOSE_MINUTE, self.now.hour * 60 + self.now.minute)
+        minutes = []
+        while len(minutes) < count:
+            draw = rng.random()
+            for share, mean, spread in MEAL_PEAKS:
+                if draw < share:
+                    minute = rng.gauss(mean, spread)
+                    break
+                draw -= share
+            else:
+                minute = rng.uniform(OPEN_MINUTE, CLOSE_MINUTE)
+            if OPEN_MINUTE <= minute < latest:
+                minutes.append(minute)
+        return minutes
+
+    def _status_for(self, age_minutes: float) -> Tuple[str, str]:
+        """Order and queue status for an order placed age_minutes ago"""
+        if age_minutes < 3:
+            return "pending_payment", "waiting"
+        if age_minutes < 8:
+            return "confirmed", "waiting"
+        if age_minutes < 20:
+            return "preparing", "preparing"
+        if age_minutes < 35 and self.rng.random() < 0.7:
+            return "ready", "ready"
+        if self.rng.random() < 0.06:
+            return "cancelled", "cancelled"
+        return "completed", "collected"
+
+
+def _cumulative(weights: Sequence[float]) -> List[float]:
+    total, cumulative = 0.0, []
+    for weight in weights:
+        total += weight
+        cumulative.append(total)
+    return cumulative
+
+
+def _share_before(minute: float) -> float:
+    """Fraction of a day's orders placed before the given minute"""
+    uniform_share = 1 - sum(share for share, _, _ in MEAL_PEAKS)
+    share = uniform_share * min(max((minute - OPEN_MINUTE) / (CLOSE_MINUTE - OPEN_MINUTE), 0.0), 1.0)
+    for peak_share, mean, spread in MEAL_PEAKS:
+        share += peak_share * 0.5 * (1 + math.erf((minute - mean) / (spread * math.sqrt(2))))
+    return share if minute > OPEN_MINUTE else 0.0
+
+
+def _format_datetime(value: datetime) -> str:
+    # The text form SQLAlchemy itself stores on SQLite (and PostgreSQL parses); much faster than strftime
+    return value.isoformat(" ", "microseconds")
@@ -3,16 +3,37 @@ from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import uvicorn
 
-from app.database.database import Base, engine
-from app.routes import auth, auth_otp, stalls, orders, menu, queue, users, admin
+from app.database.database import Base, engine, SessionLocal
+from app.routes import auth, auth_otp, stalls, orders, menu, queue, users, admin, events, internal
+from app.services.event_broker import event_broker
+from app.services.stall_index import stall_index
+from app.services.queue_index import queue_index
+from app.services.email_service import email_service
+from app.services.mail_queue import mail_queue
+from app.services.query_profiler import query_profiler, QueryProfilingMiddleware
+from app.services.metrics import metrics, MetricsMiddleware
+from app.utils.pagination import NEXT_CURSOR_HEADER, CHANGES_CURSOR_HEADER
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Import models to ensure they're registered
-    from app.models import user, stall, menu, order, queue, otp
+    from app.models import user, stall, menu, order, queue, otp, email, analytics
     # Create tables
     Base.metadata.create_all(bind=engine)
+    # Build the stall spatial index used by /api/stalls/nearby and the live queue index
+    db = SessionLocal()
+    try:
+        stall_index.rebuild(db)
+        queue_index.rebuild(db)
+    finally:
+        db.close()
+    await event_broker.start()
+    # Testing mode only logs emails, so there is nothing for mail workers to deliver
+    if not email_service.testing_mode:
+        mail_queue.start()
     yield
+    mail_queue.stop()
+    await event_broker.stop()
 
 app = FastAPI(
     title="NTU Food API",
@@ -21,12 +42,24 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Attribute every SQL statement to the request that issued it
+query_profiler.instrument(engine)
+app.add_middleware(QueryProfilingMiddleware, profiler=query_profiler)
+
+# Latency histograms per route plus order/email counters, scraped from /metrics
+metrics.track_orders(SessionLocal)
+app.add_middleware(MetricsMiddleware, registry=metrics)
+
+# Queue positions are answered from memory; committed queue entry changes keep it current
+queue_index.track(SessionLocal)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000", "http://localhost:5173", "http://localhost:5174", "https://ntu-food.vercel.app","ntu-food-ofqlojur8-lekekbots-projects.vercel.app"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, CHANGES_CURSOR_HEADER, "Server-Timing"],
 )
 
 @app.get("/")
@@ -50,6 +83,9 @@ app.include_router(menu.router, prefix="/api/menu", tags=["Menu"])
 app.include_router(orders.router, prefix="/api/orders", tags=["Orders"])
 app.include_router(queue.router, prefix="/api/queue", tags=["Queue"])
 app.include_router(admin.router, prefix="/api/admin", tags=["Admin"])
+app.include_router(events.router, prefix="/api/events", tags=["Realtime Events"])
+app.include_router(internal.router, prefix="/internal", tags=["Internal"])
+app.include_router(internal.metrics_router, tags=["Internal"])
 
 if __name__ == "__main__":
     uvicorn.run(
@@ -0,0 +1,35 @@
+from sqlalchemy import Column, Integer, Float, ForeignKey, Date, DateTime
+from datetime import datetime
+from app.database.database import Base
+
+# Sales rollups are keyed by the order's created_at date and only count COMPLETED orders.
+# They are maintained incrementally by app.services.sales_rollups and rebuilt with
+# `python manage_db.py rollups`.
+
+class DailyStallSales(Base):
+    __tablename__ = "daily_stall_sales"
+
+    stall_id = Column(Integer, ForeignKey("stalls.id", ondelete="CASCADE"), primary_key=True)
+    sales_date = Column(Date, primary_key=True)
+    completed_orders = Column(Integer, nullable=False, default=0)
+    items_sold = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0.0)
+
+class DailyItemSales(Base):
+    __tablename__ = "daily_item_sales"
+
+    menu_item_id = Column(Integer, ForeignKey("menu_items.id", ondelete="CASCADE"), primary_key=True)
+    sales_date = Column(Date, primary_key=True)
+    stall_id = Column(Integer, ForeignKey("stalls.id", ondelete="CASCADE"), nullable=False, index=True)
+    order_count = Column(Integer, nullable=False, default=0)
+    quantity = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0.0)
+
+class StallCustomer(Base):
+    """Distinct customers per stall, so unique-customer counts need no scan of orders"""
+    __tablename__ = "stall_customers"
+
+    stall_id = Column(Integer, ForeignKey("stalls.id", ondelete="CASCADE"), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    completed_orders = Column(Integer, nullable=False, default=0)
+    first_order_at = Column(DateTime, default=datetime.utcnow)
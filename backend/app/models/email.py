@@ -0,0 +1,31 @@
+from sqlalchemy import Column, Integer, String, DateTime, Enum, Text, Index
+from datetime import datetime
+from app.database.database import Base
+import enum
+
+class EmailStatus(enum.Enum):
+    PENDING = "pending"      # Waiting for a delivery attempt (new or retrying)
+    SENDING = "sending"      # Claimed by a mail worker
+    SENT = "sent"            # Accepted by the SMTP server
+    FAILED = "failed"        # Gave up after the maximum number of attempts
+
+class EmailOutbox(Base):
+    __tablename__ = "email_outbox"
+
+    id = Column(Integer, primary_key=True, index=True)
+    recipient = Column(String, nullable=False, index=True)
+    kind = Column(String, nullable=False)  # otp, welcome
+    subject = Column(String, nullable=False)
+    html_body = Column(Text, nullable=False)
+    text_body = Column(Text, nullable=False)
+    status = Column(Enum(EmailStatus, name='email_status', values_callable=lambda x: [e.value for e in x]), default=EmailStatus.PENDING, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    last_error = Column(Text)
+    next_attempt_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    claimed_at = Column(DateTime)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    sent_at = Column(DateTime)
+
+    __table_args__ = (
+        Index("ix_email_outbox_status_next_attempt", "status", "next_attempt_at"),
+    )
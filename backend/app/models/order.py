@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Enum, Text
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Enum, Text, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database.database import Base
@@ -38,7 +38,18 @@ class Order(Base):
     user = relationship("User", back_populates="orders")
     stall = relationship("Stall", back_populates="orders")
     order_items = relationship("OrderItem", back_populates="order", cascade="all, delete-orphan")
-    queue_entry = relationship("QueueEntry", back_populates="order", uselist=False)
+    queue_entry = relationship("QueueEntry", back_populates="order", uselist=False, cascade="all, delete-orphan")
+
+    __table_args__ = (
+        # Stall order views filtered by status, newest first
+        Index("ix_orders_stall_status_created", "stall_id", "status", "created_at"),
+        # Stall order views without a status filter
+        Index("ix_orders_stall_created", "stall_id", "created_at"),
+        # Stall dashboard polling for orders changed since a cursor
+        Index("ix_orders_stall_updated", "stall_id", "updated_at"),
+        # A student's order list and history, newest first
+        Index("ix_orders_user_created", "user_id", "created_at"),
+    )
 
 class OrderItem(Base):
     __tablename__ = "order_items"
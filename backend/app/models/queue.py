@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, Enum
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Date, Enum, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database.database import Base
@@ -25,4 +25,17 @@ class QueueEntry(Base):
     collected_at = Column(DateTime)
 
     order = relationship("Order", back_populates="queue_entry")
-    stall = relationship("Stall", back_populates="queue_entries")
\ No newline at end of file
+    stall = relationship("Stall", back_populates="queue_entries")
+
+    __table_args__ = (
+        # Live queue per stall (waiting/preparing) in join order, as listed and counted by queue_index
+        Index("ix_queue_entries_stall_status_id", "stall_id", "status", "id"),
+    )
+
+class QueueCounter(Base):
+    """Per-stall queue number sequence, reset at the start of each service day"""
+    __tablename__ = "queue_counters"
+
+    stall_id = Column(Integer, ForeignKey("stalls.id", ondelete="CASCADE"), primary_key=True)
+    service_date = Column(Date, nullable=False)
+    last_number = Column(Integer, nullable=False, default=0)
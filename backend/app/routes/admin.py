@@ -1,20 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
+from sqlalchemy import func
 from typing import List, Optional
 from datetime import datetime, date
-from app.database.database import get_db
+from app.database.database import get_db, get_pool_stats
 from app.models.user import User, UserRole
 from app.models.stall import Stall
 from app.models.menu import MenuItem
 from app.models.order import Order, OrderItem, OrderStatus
 from app.models.queue import QueueEntry, QueueStatus
+from app.models.analytics import DailyItemSales, DailyStallSales, StallCustomer
 from app.schemas.admin import (
     UserUpdate, StallCreate, StallUpdate, MenuItemCreate, MenuItemUpdate,
     OrderStatusUpdate, UserListResponse, StallListResponse, MenuItemResponse,
     OrderListResponse, AnalyticsResponse, DashboardStats
 )
-from app.routes.auth import get_current_user, get_password_hash
+from app.routes.auth import get_current_user
+from app.services.event_broker import publish_order_event, publish_queue_event
+from app.services.stall_index import stall_index
+from app.services.queue_index import queue_index
+from app.services.response_versions import response_versions
+from app.services.catalogue_cache import catalogue_cache
+from app.services.sales_rollups import sales_rollups
+from app.services.dashboard_stats import dashboard_stats
+from app.services.user_cache import user_cache
+from app.services.password_hasher import password_hasher
+from app.utils.pagination import paginate_newest_first, set_next_cursor
 
 router = APIRouter()
 
@@ -70,7 +81,7 @@ async def update_user(
     update_data = user_update.model_dump(exclude_unset=True)
 
     if "password" in update_data and update_data["password"]:
-        update_data["hashed_password"] = get_password_hash(update_data.pop("password"))
+        update_data["hashed_password"] = await password_hasher.hash(update_data.pop("password"))
 
     for field, value in update_data.items():
         setattr(db_user, field, value)
@@ -78,6 +89,7 @@ async def update_user(
     db_user.updated_at = datetime.utcnow()
     db.commit()
     db.refresh(db_user)
+    user_cache.invalidate(subject=db_user.student_id)
     return db_user
 
 @router.delete("/users/{user_id}")
@@ -95,6 +107,7 @@ async def delete_user(
 
     db.delete(db_user)
     db.commit()
+    user_cache.invalidate(subject=db_user.student_id)
     return {"message": "User deleted successfully"}
 
 @router.get("/stalls", response_model=List[StallListResponse])
@@ -124,6 +137,8 @@ async def create_stall(
     db.add(db_stall)
     db.commit()
     db.refresh(db_stall)
+    stall_index.invalidate()
+    catalogue_cache.invalidate_stall(db_stall.id)
     return db_stall
 
 @router.put("/stalls/{stall_id}", response_model=StallListResponse)
@@ -151,6 +166,8 @@ async def update_stall(
 
     db.commit()
     db.refresh(db_stall)
+    stall_index.invalidate()
+    catalogue_cache.invalidate_stall(stall_id)
     return db_stall
 
 @router.delete("/stalls/{stall_id}")
@@ -165,6 +182,8 @@ async def delete_stall(
 
     db.delete(db_stall)
     db.commit()
+    stall_index.invalidate()
+    catalogue_cache.invalidate_stall(stall_id)
     return {"message": "Stall deleted successfully"}
 
 @router.get("/menu-items", response_model=List[MenuItemResponse])
@@ -196,6 +215,7 @@ async def create_menu_item(
     db.add(db_item)
     db.commit()
     db.refresh(db_item)
+    catalogue_cache.invalidate_menu(db_item.stall_id)
     return db_item
 
 @router.put("/menu-items/{item_id}", response_model=MenuItemResponse)
@@ -210,12 +230,14 @@ async def update_menu_item(
         raise HTTPException(status_code=404, detail="Menu item not found")
 
     update_data = item_update.model_dump(exclude_unset=True)
+    previous_stall_id = db_item.stall_id
 
     for field, value in update_data.items():
         setattr(db_item, field, value)
 
     db.commit()
     db.refresh(db_item)
+    catalogue_cache.invalidate_menu(previous_stall_id, db_item.stall_id)
     return db_item
 
 @router.delete("/menu-items/{item_id}")
@@ -228,19 +250,22 @@ async def delete_menu_item(
     if not db_item:
         raise HTTPException(status_code=404, detail="Menu item not found")
 
+    stall_id = db_item.stall_id
     db.delete(db_item)
     db.commit()
+    catalogue_cache.invalidate_menu(stall_id)
     return {"message": "Menu item deleted successfully"}
 
 @router.get("/orders", response_model=List[OrderListResponse])
 async def get_all_orders(
+    response: Response,
     status: Optional[str] = None,
     stall_id: Optional[int] = None,
     user_id: Optional[int] = None,
     date_from: Optional[date] = None,
     date_to: Optional[date] = None,
-    skip: int = 0,
-    limit: int = 100,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
     admin_user: User = Depends(get_admin_user),
     db: Session = Depends(get_db)
 ):
@@ -257,7 +282,8 @@ async def get_all_orders(
     if date_to:
         query = query.filter(Order.created_at <= date_to)
 
-    orders = query.order_by(Order.created_at.desc()).offset(skip).limit(limit).all()
+    orders, next_cursor = paginate_newest_first(query, Order, cursor, limit)
+    set_next_cursor(response, next_cursor)
     return orders
 
 @router.get("/orders/{order_id}", response_model=OrderListResponse)
@@ -282,17 +308,23 @@ async def update_order_status(
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
 
+    previous_status = order.status
     order.status = status_update.status
     order.updated_at = datetime.utcnow()
 
+    queue_entry = None
     if status_update.status == OrderStatus.READY:
         queue_entry = db.query(QueueEntry).filter(QueueEntry.order_id == order_id).first()
         if queue_entry:
             queue_entry.status = QueueStatus.READY
             queue_entry.updated_at = datetime.utcnow()
 
+    sales_rollups.apply_status_change(db, order, previous_status)
     db.commit()
     db.refresh(order)
+    publish_order_event(order)
+    if queue_entry:
+        publish_queue_event(queue_entry, order.user_id)
     return order
 
 @router.delete("/orders/{order_id}")
@@ -305,6 +337,7 @@ async def delete_order(
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
 
+    sales_rollups.remove_order(db, order)
     db.delete(order)
     db.commit()
     return {"message": "Order deleted successfully"}
@@ -314,42 +347,7 @@ async def get_dashboard_stats(
     admin_user: User = Depends(get_admin_user),
     db: Session = Depends(get_db)
 ):
-    total_users = db.query(func.count(User.id)).scalar()
-    total_stalls = db.query(func.count(Stall.id)).scalar()
-    total_orders = db.query(func.count(Order.id)).scalar()
-
-    active_orders = db.query(func.count(Order.id)).filter(
-        Order.status.in_([OrderStatus.PENDING, OrderStatus.PREPARING])
-    ).scalar()
-
-    total_revenue = db.query(func.sum(Order.total_amount)).filter(
-        Order.status == OrderStatus.COMPLETED
-    ).scalar() or 0.0
-
-    today = datetime.utcnow().date()
-    today_orders = db.query(func.count(Order.id)).filter(
-        func.date(Order.created_at) == today
-    ).scalar()
-
-    today_revenue = db.query(func.sum(Order.total_amount)).filter(
-        and_(
-            func.date(Order.created_at) == today,
-            Order.status == OrderStatus.COMPLETED
-        )
-    ).scalar() or 0.0
-
-    active_users = db.query(func.count(User.id)).filter(User.is_active == True).scalar()
-
-    return {
-        "total_users": total_users,
-        "active_users": active_users,
-        "total_stalls": total_stalls,
-        "total_orders": total_orders,
-        "active_orders": active_orders,
-        "total_revenue": total_revenue,
-        "today_orders": today_orders,
-        "today_revenue": today_revenue
-    }
+    return dashboard_stats.get(db)
 
 @router.get("/analytics/popular-items")
 async def get_popular_items(
@@ -357,26 +355,26 @@ async def get_popular_items(
     admin_user: User = Depends(get_admin_user),
     db: Session = Depends(get_db)
 ):
+    # Reads the daily item rollups (completed orders only) instead of scanning order history
+    total_quantity = func.sum(DailyItemSales.quantity)
     popular_items = db.query(
         MenuItem.id,
         MenuItem.name,
         MenuItem.stall_id,
         Stall.name.label('stall_name'),
-        func.count(OrderItem.id).label('order_count'),
-        func.sum(OrderItem.quantity).label('total_quantity'),
-        func.sum(OrderItem.quantity * OrderItem.unit_price).label('total_revenue')
-    ).join(
-        OrderItem, MenuItem.id == OrderItem.menu_item_id
+        func.sum(DailyItemSales.order_count).label('order_count'),
+        total_quantity.label('total_quantity'),
+        func.sum(DailyItemSales.revenue).label('total_revenue')
     ).join(
-        Order, OrderItem.order_id == Order.id
+        MenuItem, DailyItemSales.menu_item_id == MenuItem.id
     ).join(
         Stall, MenuItem.stall_id == Stall.id
-    ).filter(
-        Order.status == OrderStatus.COMPLETED
     ).group_by(
         MenuItem.id, MenuItem.name, MenuItem.stall_id, Stall.name
+    ).having(
+        total_quantity > 0
     ).order_by(
-        func.sum(OrderItem.quantity).desc()
+        total_quantity.desc()
     ).limit(limit).all()
 
     return [
@@ -387,7 +385,7 @@ async def get_popular_items(
             "stall_name": item.stall_name,
             "order_count": item.order_count,
             "total_quantity": item.total_quantity,
-            "total_revenue": float(item.total_revenue or 0)
+            "total_revenue": round(float(item.total_revenue or 0), 2)
         }
         for item in popular_items
     ]
@@ -397,21 +395,31 @@ async def get_stall_performance(
     admin_user: User = Depends(get_admin_user),
     db: Session = Depends(get_db)
 ):
+    # Per-stall totals come from the daily stall rollups and the stall_customers table
+    sales = db.query(
+        DailyStallSales.stall_id,
+        func.sum(DailyStallSales.completed_orders).label('total_orders'),
+        func.sum(DailyStallSales.revenue).label('total_revenue')
+    ).group_by(DailyStallSales.stall_id).subquery()
+
+    customers = db.query(
+        StallCustomer.stall_id,
+        func.count(StallCustomer.user_id).label('unique_customers')
+    ).filter(StallCustomer.completed_orders > 0).group_by(StallCustomer.stall_id).subquery()
+
+    total_revenue = func.coalesce(sales.c.total_revenue, 0)
     stall_stats = db.query(
         Stall.id,
         Stall.name,
-        func.count(Order.id).label('total_orders'),
-        func.sum(Order.total_amount).label('total_revenue'),
-        func.avg(Order.total_amount).label('avg_order_value'),
-        func.count(
-            func.distinct(Order.user_id)
-        ).label('unique_customers')
+        func.coalesce(sales.c.total_orders, 0).label('total_orders'),
+        total_revenue.label('total_revenue'),
+        func.coalesce(customers.c.unique_customers, 0).label('unique_customers')
     ).outerjoin(
-        Order, Stall.id == Order.stall_id
-    ).group_by(
-        Stall.id, Stall.name
+        sales, Stall.id == sales.c.stall_id
+    ).outerjoin(
+        customers, Stall.id == customers.c.stall_id
     ).order_by(
-        func.sum(Order.total_amount).desc()
+        total_revenue.desc()
     ).all()
 
     return [
@@ -419,8 +427,8 @@ async def get_stall_performance(
             "stall_id": stat.id,
             "stall_name": stat.name,
             "total_orders": stat.total_orders,
-            "total_revenue": float(stat.total_revenue or 0),
-            "avg_order_value": float(stat.avg_order_value or 0),
+            "total_revenue": round(float(stat.total_revenue), 2),
+            "avg_order_value": round(float(stat.total_revenue) / stat.total_orders, 2) if stat.total_orders else 0.0,
             "unique_customers": stat.unique_customers
         }
         for stat in stall_stats
@@ -432,7 +440,20 @@ async def get_recent_activity(
     admin_user: User = Depends(get_admin_user),
     db: Session = Depends(get_db)
 ):
-    recent_orders = db.query(Order).order_by(Order.created_at.desc()).limit(limit).all()
+    # One joined projection; touching order.user / order.stall would lazy-load 2 rows per order
+    recent_orders = db.query(
+        Order.id,
+        Order.order_number,
+        Order.user_id,
+        Order.stall_id,
+        Order.status,
+        Order.total_amount,
+        Order.created_at,
+        User.name.label("user_name"),
+        Stall.name.label("stall_name")
+    ).outerjoin(User, User.id == Order.user_id).outerjoin(
+        Stall, Stall.id == Order.stall_id
+    ).order_by(Order.created_at.desc(), Order.id.desc()).limit(limit).all()
 
     return [
         {
@@ -443,12 +464,43 @@ async def get_recent_activity(
             "status": order.status.value,
             "total_amount": order.total_amount,
             "created_at": order.created_at.isoformat(),
-            "user_name": order.user.name if order.user else None,
-            "stall_name": order.stall.name if order.stall else None
+            "user_name": order.user_name,
+            "stall_name": order.stall_name
         }
         for order in recent_orders
     ]
 
+@router.get("/system/auth-cache")
+async def get_auth_cache_stats(admin_user: User = Depends(get_admin_user)):
+    return user_cache.stats()
+
+@router.get("/system/password-hashing")
+async def get_password_hashing_stats(admin_user: User = Depends(get_admin_user)):
+    return password_hasher.stats()
+
+@router.post("/analytics/rebuild-rollups")
+async def rebuild_sales_rollups(
+    admin_user: User = Depends(get_admin_user),
+    db: Session = Depends(get_db)
+):
+    return sales_rollups.rebuild(db)
+
+@router.get("/system/catalogue-cache")
+async def get_catalogue_cache_stats(admin_user: User = Depends(get_admin_user)):
+    return catalogue_cache.stats()
+
+@router.get("/system/http-cache")
+async def get_http_cache_stats(admin_user: User = Depends(get_admin_user)):
+    return response_versions.stats()
+
+@router.get("/system/queue-index")
+async def get_queue_index_stats(admin_user: User = Depends(get_admin_user)):
+    return queue_index.stats()
+
+@router.get("/system/db-pool")
+async def get_db_pool_stats(admin_user: User = Depends(get_admin_user)):
+    return get_pool_stats()
+
 @router.post("/seed-admin")
 async def seed_admin_user(db: Session = Depends(get_db)):
     existing_admin = db.query(User).filter(User.role == UserRole.ADMIN).first()
@@ -460,7 +512,7 @@ async def seed_admin_user(db: Session = Depends(get_db)):
         student_id="ADMIN001",
         name="System Administrator",
         phone="+65 12345678",
-        hashed_password=get_password_hash("admin123"),
+        hashed_password=await password_hasher.hash("admin123"),
         role=UserRole.ADMIN,
         is_active=True,
         is_verified=True
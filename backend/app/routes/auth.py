@@ -1,17 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from app.database.database import get_db
 from app.models.user import User
 from app.schemas.auth import Token, TokenData, UserCreate, UserResponse, LoginRequest, UserProfile
 from app.config import settings
+from app.services.user_cache import user_cache
+from app.services.password_hasher import password_hasher, pwd_context
 
 router = APIRouter()
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
 
 def verify_password(plain_password, hashed_password):
@@ -41,9 +42,22 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
         token_data = TokenData(student_id=student_id)
     except JWTError:
         raise credentials_exception
-    user = db.query(User).filter(User.student_id == token_data.student_id).first()
+    user = user_cache.get(token_data.student_id)
+    if user is not None:
+        return user
+    # Off the event loop: when the pool is exhausted this blocks until a connection
+    # frees up, and the loop has to keep running for that to happen
+    user = await run_in_threadpool(_load_user, db, token_data.student_id)
     if user is None:
         raise credentials_exception
+    user_cache.set(token_data.student_id, user)
+    return user
+
+def _load_user(db: Session, student_id: str):
+    user = db.query(User).filter(User.student_id == student_id).first()
+    if user is not None:
+        # Detach so the cached row can be shared across requests without lazy loads
+        db.expunge(user)
     return user
 
 @router.post("/register", response_model=UserResponse)
@@ -73,7 +87,7 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
 @router.post("/login", response_model=Token)
 async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
     user = db.query(User).filter(User.ntu_email == login_data.ntu_email).first()
-    if not user or not verify_password(login_data.password, user.hashed_password):
+    if not user or not await password_hasher.verify(login_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -93,7 +107,7 @@ async def login_form(form_data: OAuth2PasswordRequestForm = Depends(), db: Sessi
     if not user:
         user = db.query(User).filter(User.student_id == form_data.username).first()
 
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not user or not await password_hasher.verify(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect credentials",
@@ -1,21 +1,26 @@
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
+from typing import List
 from app.database.database import get_db
 from app.models.user import User, UserRole
 from app.models.otp import OTPVerification
 from app.schemas.auth import (
     OTPRequest, OTPVerifyRequest, OTPResponse,
-    ResendOTPRequest, UserResponse, Token
+    ResendOTPRequest, UserResponse, Token, EmailDeliveryStatus
 )
 from app.services.email_service import email_service
 from app.services.supabase_email_service import supabase_email_service
+from app.services.mail_queue import mail_queue
 import os
 from app.utils.validators import (
     validate_ntu_email, validate_student_id,
     validate_phone, validate_password
 )
-from app.routes.auth import create_access_token, get_password_hash
+from app.routes.auth import create_access_token, get_current_user
+from app.services.password_hasher import password_hasher
+from app.services.user_cache import user_cache
 import logging
 
 logger = logging.getLogger(__name__)
@@ -59,6 +64,7 @@ async def register_with_otp(
             # Delete unverified user to allow re-registration
             db.delete(existing_user)
             db.commit()
+            user_cache.invalidate(subject=existing_user.student_id)
 
     # Check if student ID is already taken
     existing_student = db.query(User).filter(User.student_id == user_data.student_id.upper()).first()
@@ -92,13 +98,15 @@ async def register_with_otp(
         name=user_data.name,
         phone=user_data.phone,
         dietary_preferences=user_data.dietary_preferences or "",
-        hashed_password=get_password_hash(user_data.password)
+        hashed_password=await password_hasher.hash(user_data.password)
     )
     db.add(otp_verification)
     db.commit()
 
-    # Send OTP email using Gmail SMTP service
-    success, error_msg = email_service.send_otp_email(
+    # Queue OTP email for delivery by the background mail workers; the outbox
+    # insert commits on its own session, so keep it off the event loop
+    success, error_msg = await run_in_threadpool(
+        email_service.queue_otp_email,
         recipient_email=user_data.ntu_email,
         otp_code=otp_code,
         user_name=user_data.name
@@ -120,7 +128,7 @@ async def register_with_otp(
     )
 
 @router.post("/verify-otp", response_model=Token)
-async def verify_otp(
+def verify_otp(
     verify_data: OTPVerifyRequest,
     background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
@@ -195,9 +203,9 @@ async def verify_otp(
         db.commit()
         db.refresh(new_user)
 
-        # Send welcome email (don't block if it fails)
+        # Queue welcome email (don't block if it fails)
         try:
-            email_service.send_welcome_email(new_user.ntu_email, new_user.name)
+            email_service.queue_welcome_email(new_user.ntu_email, new_user.name)
         except Exception as e:
             logger.warning(f"Failed to send welcome email: {e}")
 
@@ -217,7 +225,7 @@ async def verify_otp(
         )
 
 @router.post("/resend-otp", response_model=OTPResponse)
-async def resend_otp(
+def resend_otp(
     resend_data: ResendOTPRequest,
     background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
@@ -261,8 +269,8 @@ async def resend_otp(
 
     db.commit()
 
-    # Send new OTP email using Gmail SMTP service
-    success, error_msg = email_service.send_otp_email(
+    # Queue new OTP email for delivery by the background mail workers
+    success, error_msg = email_service.queue_otp_email(
         recipient_email=otp_record.email,
         otp_code=new_otp_code,
         user_name=otp_record.name
@@ -280,6 +288,25 @@ async def resend_otp(
         testing_otp=new_otp_code if EMAIL_TESTING_MODE else None
     )
 
+@router.get("/delivery-status/{email}", response_model=List[EmailDeliveryStatus])
+def get_delivery_status(email: str, current_user: User = Depends(get_current_user)):
+    """
+    Delivery status of the most recent emails queued for an address.
+    Only admins and the owner of the address may look; SMTP errors are admin-only.
+    """
+    is_admin = current_user.role == UserRole.ADMIN
+    if not is_admin and current_user.ntu_email.lower() != email.lower():
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view delivery status for this email"
+        )
+
+    statuses = [EmailDeliveryStatus.model_validate(message) for message in mail_queue.delivery_status(email)]
+    if not is_admin:
+        for delivery in statuses:
+            delivery.last_error = None
+    return statuses
+
 @router.delete("/cancel-registration/{email}")
 async def cancel_registration(
     email: str,
@@ -0,0 +1,99 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+import asyncio
+from app.config import settings
+from app.database.database import SessionLocal
+from app.models.order import Order
+from app.models.stall import Stall
+from app.models.user import User, UserRole
+from app.routes.auth import get_current_user
+from app.services.event_broker import event_broker, encode_sse
+
+router = APIRouter()
+
+async def get_stream_user(token: str = Query(..., description="Access token (EventSource cannot send headers)")):
+    # Use a short-lived session so an open stream does not pin a pooled connection
+    db = SessionLocal()
+    try:
+        return await get_current_user(token=token, db=db)
+    finally:
+        db.close()
+
+def _authorize_stall(stall_id: int, current_user: User):
+    db = SessionLocal()
+    try:
+        stall = db.query(Stall).filter(Stall.id == stall_id).first()
+        if not stall:
+            raise HTTPException(status_code=404, detail="Stall not found")
+        if current_user.role != UserRole.ADMIN and stall.owner_id != current_user.id:
+            raise HTTPException(status_code=403, detail="Not authorized to view this stall's orders")
+    finally:
+        db.close()
+
+def _authorize_order(order_id: int, current_user: User):
+    db = SessionLocal()
+    try:
+        order = db.query(Order).filter(Order.id == order_id).first()
+        if not order:
+            raise HTTPException(status_code=404, detail="Order not found")
+        if (order.user_id != current_user.id and
+            current_user.role != UserRole.ADMIN and
+            (not order.stall.owner_id or order.stall.owner_id != current_user.id)):
+            raise HTTPException(status_code=403, detail="Not authorized to view this order")
+    finally:
+        db.close()
+
+def _event_stream(request: Request, topics):
+    subscription = event_broker.subscribe(topics)
+
+    async def stream():
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(
+                        subscription.queue.get(),
+                        timeout=settings.EVENT_HEARTBEAT_SECONDS
+                    )
+                    yield encode_sse(event)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    # Comment frame keeps proxies from closing idle connections
+                    yield ": heartbeat\n\n"
+        finally:
+            event_broker.unsubscribe(subscription)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/stall/{stall_id}")
+async def stream_stall_events(
+    stall_id: int,
+    request: Request,
+    current_user: User = Depends(get_stream_user)
+):
+    """Stream order and queue changes for a stall (Stall Owner only)"""
+    await asyncio.to_thread(_authorize_stall, stall_id, current_user)
+    return _event_stream(request, [f"stall:{stall_id}"])
+
+@router.get("/orders")
+async def stream_my_order_events(
+    request: Request,
+    current_user: User = Depends(get_stream_user)
+):
+    """Stream changes to all of the current user's orders"""
+    return _event_stream(request, [f"user:{current_user.id}"])
+
+@router.get("/orders/{order_id}")
+async def stream_order_events(
+    order_id: int,
+    request: Request,
+    current_user: User = Depends(get_stream_user)
+):
+    """Stream changes to a single order and its queue entry"""
+    await asyncio.to_thread(_authorize_order, order_id, current_user)
+    return _event_stream(request, [f"order:{order_id}"])
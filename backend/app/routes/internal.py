@@ -0,0 +1,46 @@
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import PlainTextResponse
+
+from app.config import settings
+from app.database.database import get_pool_stats
+from app.services.event_broker import event_broker
+from app.services.metrics import metrics
+from app.services.query_profiler import query_profiler
+
+router = APIRouter()
+# Served at /metrics, where Prometheus scrapes by default
+metrics_router = APIRouter()
+
+async def require_internal_token(authorization: Optional[str] = Header(None)):
+    if not settings.INTERNAL_METRICS_TOKEN:
+        # Fail closed: without a token these routes only exist when explicitly opened for development
+        if settings.INTERNAL_METRICS_OPEN:
+            return
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    expected = f"Bearer {settings.INTERNAL_METRICS_TOKEN}"
+    if authorization is None or not secrets.compare_digest(authorization, expected):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid internal metrics token"
+        )
+
+@router.get("/metrics", dependencies=[Depends(require_internal_token)])
+async def get_internal_metrics():
+    return {
+        "queries": query_profiler.stats(),
+        "db_pool": get_pool_stats()
+    }
+
+@router.post("/metrics/reset", dependencies=[Depends(require_internal_token)])
+async def reset_internal_metrics():
+    query_profiler.reset()
+    return {"message": "Query metrics reset"}
+
+@metrics_router.get("/metrics", response_class=PlainTextResponse, dependencies=[Depends(require_internal_token)])
+async def get_prometheus_metrics():
+    metrics.db_pool_checked_out.set(get_pool_stats().get("checked_out", 0))
+    metrics.event_streams.set(len(set().union(*event_broker.subscriptions.values())))
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,23 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app.database.database import get_db
 from app.models.menu import MenuItem
 from app.models.stall import Stall
 from app.schemas.menu import MenuItemCreate, MenuItemResponse, MenuItemUpdate
 from app.routes.auth import get_current_user
 from app.models.user import User, UserRole
+from app.services.response_versions import response_versions, menu_key
+from app.services.catalogue_cache import catalogue_cache
 
 router = APIRouter()
 
-@router.get("/stall/{stall_id}", response_model=List[MenuItemResponse])
-def get_stall_menu(stall_id: int, db: Session = Depends(get_db)):
-    stall = db.query(Stall).filter(Stall.id == stall_id).first()
+def _load_stall_menu(db: Session, stall_id: int) -> Optional[list]:
+    stall = db.query(Stall.id).filter(Stall.id == stall_id).first()
     if not stall:
-        raise HTTPException(status_code=404, detail="Stall not found")
+        return None
+    menu_items = db.query(MenuItem).filter(MenuItem.stall_id == stall_id).order_by(MenuItem.id).all()
+    return [MenuItemResponse.model_validate(item).model_dump(mode="json") for item in menu_items]
 
-    menu_items = db.query(MenuItem).filter(MenuItem.stall_id == stall_id).all()
-    return menu_items
+@router.get("/stall/{stall_id}", response_model=List[MenuItemResponse])
+def get_stall_menu(stall_id: int, request: Request, db: Session = Depends(get_db)):
+    # Cached payloads are already serialized, so skip response_model validation
+    menu_items = catalogue_cache.get_or_load(menu_key(stall_id), lambda: _load_stall_menu(db, stall_id))
+    if menu_items is None:
+        raise HTTPException(status_code=404, detail="Stall not found")
+    return response_versions.json_response(menu_items, request)
 
 @router.get("/{item_id}", response_model=MenuItemResponse)
 def get_menu_item(item_id: int, db: Session = Depends(get_db)):
@@ -43,6 +51,7 @@ def create_menu_item(
     db.add(db_item)
     db.commit()
     db.refresh(db_item)
+    catalogue_cache.invalidate_menu(db_item.stall_id)
     return db_item
 
 @router.put("/{item_id}", response_model=MenuItemResponse)
@@ -59,11 +68,13 @@ def update_menu_item(
     if item.stall.owner_id != current_user.id and current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=403, detail="Not authorized to update this item")
 
+    previous_stall_id = item.stall_id
     for key, value in item_update.dict(exclude_unset=True).items():
         setattr(item, key, value)
 
     db.commit()
     db.refresh(item)
+    catalogue_cache.invalidate_menu(previous_stall_id, item.stall_id)
     return item
 
 @router.delete("/{item_id}")
@@ -79,6 +90,8 @@ def delete_menu_item(
     if item.stall.owner_id != current_user.id and current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=403, detail="Not authorized to delete this item")
 
+    stall_id = item.stall_id
     db.delete(item)
     db.commit()
+    catalogue_cache.invalidate_menu(stall_id)
     return {"message": "Menu item deleted successfully"}
\ No newline at end of file
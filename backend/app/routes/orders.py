@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, joinedload
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import func, and_
+from typing import Dict, Iterable, List, Optional
 from datetime import datetime, timedelta
 from app.database.database import get_db
 from app.models.order import Order, OrderItem, OrderStatus, PaymentStatus
@@ -10,24 +11,78 @@ from app.models.queue import QueueEntry, QueueStatus
 from app.models.user import UserRole
 from app.schemas.order import OrderCreate, OrderResponse, OrderUpdate, OrderSummary, ConfirmPaymentRequest, UpdateOrderStatusRequest
 from app.routes.auth import get_current_user
+from app.services.event_broker import publish_order_event, publish_queue_event
+from app.services.queue_index import queue_index
+from app.services.queue_numbers import queue_number_allocator
+from app.services.sales_rollups import sales_rollups
+from app.utils.pagination import (
+    CHANGES_CURSOR_HEADER, changes_since, latest_change_cursor,
+    paginate_newest_first, set_next_cursor
+)
 from app.models.user import User
 
 router = APIRouter()
 
-def calculate_estimated_ready_time(stall_id: int, db: Session) -> datetime:
-    stall = db.query(Stall).filter(Stall.id == stall_id).first()
-    if not stall:
-        return datetime.now() + timedelta(minutes=15)
+ACTIVE_ORDER_STATUSES = [OrderStatus.PENDING_PAYMENT, OrderStatus.CONFIRMED, OrderStatus.PREPARING]
+
+def calculate_estimated_ready_times(stall_ids: Iterable[int], db: Session) -> Dict[int, datetime]:
+    """Estimate ready times for several stalls with a single grouped query"""
+    stall_ids = set(stall_ids)
+    if not stall_ids:
+        return {}
+
+    rows = db.query(
+        Stall.id,
+        Stall.avg_prep_time,
+        func.count(QueueEntry.id)
+    ).outerjoin(
+        QueueEntry,
+        and_(
+            QueueEntry.stall_id == Stall.id,
+            QueueEntry.status.in_([QueueStatus.WAITING, QueueStatus.PREPARING])
+        )
+    ).filter(
+        Stall.id.in_(stall_ids)
+    ).group_by(Stall.id, Stall.avg_prep_time).all()
+
+    now = datetime.now()
+    estimates = {}
+    for stall_id, avg_prep_time, active_orders_count in rows:
+        base_time = avg_prep_time or 0
+        queue_delay = active_orders_count * (base_time // 2)
+        estimates[stall_id] = now + timedelta(minutes=base_time + queue_delay)
 
-    active_orders_count = db.query(QueueEntry).filter(
-        QueueEntry.stall_id == stall_id,
-        QueueEntry.status.in_([QueueStatus.WAITING, QueueStatus.PREPARING])
-    ).count()
+    # Unknown stalls fall back to the default 15 minute estimate
+    for stall_id in stall_ids - estimates.keys():
+        estimates[stall_id] = now + timedelta(minutes=15)
 
-    base_time = stall.avg_prep_time
-    queue_delay = active_orders_count * (base_time // 2)
+    return estimates
 
-    return datetime.now() + timedelta(minutes=base_time + queue_delay)
+def calculate_estimated_ready_time(stall_id: int, db: Session) -> datetime:
+    return calculate_estimated_ready_times([stall_id], db)[stall_id]
+
+def build_order_summaries(orders: List[Order], db: Session) -> List[OrderSummary]:
+    """Build order summaries, computing ETAs for all active orders in one pass"""
+    active_stall_ids = {order.stall_id for order in orders if order.status in ACTIVE_ORDER_STATUSES}
+    estimates = calculate_estimated_ready_times(active_stall_ids, db)
+
+    return [
+        OrderSummary(
+            id=order.id,
+            stall_id=order.stall_id,
+            stall_name=order.stall.name,
+            status=order.status,
+            payment_status=order.payment_status,
+            total_amount=order.total_amount,
+            queue_number=order.queue_number,
+            order_number=order.order_number,
+            pickup_window_start=order.pickup_window_start,
+            pickup_window_end=order.pickup_window_end,
+            created_at=order.created_at,
+            estimated_ready_time=estimates.get(order.stall_id) if order.status in ACTIVE_ORDER_STATUSES else None
+        )
+        for order in orders
+    ]
 
 @router.post("/", response_model=OrderResponse)
 def create_order(
@@ -42,11 +97,18 @@ def create_order(
     if not stall.is_open:
         raise HTTPException(status_code=400, detail="Stall is currently closed")
 
+    # Fetch every referenced menu item in one query and validate in memory
+    menu_item_ids = {item.menu_item_id for item in order.items}
+    menu_items = {
+        menu_item.id: menu_item
+        for menu_item in db.query(MenuItem).filter(MenuItem.id.in_(menu_item_ids)).all()
+    }
+
     total_amount = 0
     order_items = []
 
     for item in order.items:
-        menu_item = db.query(MenuItem).filter(MenuItem.id == item.menu_item_id).first()
+        menu_item = menu_items.get(item.menu_item_id)
         if not menu_item:
             raise HTTPException(status_code=404, detail=f"Menu item {item.menu_item_id} not found")
         if menu_item.stall_id != order.stall_id:
@@ -65,12 +127,13 @@ def create_order(
         )
         order_items.append(order_item)
 
-    current_queue_length = db.query(QueueEntry).filter(
-        QueueEntry.stall_id == order.stall_id,
-        QueueEntry.status.in_([QueueStatus.WAITING, QueueStatus.PREPARING])
-    ).count()
+    queue_index.ensure_fresh(db)
+    current_queue_length = queue_index.queue_length(order.stall_id)
 
-    queue_number = current_queue_length + 1
+    # Atomic per-stall sequence; concurrent orders can never share a number
+    queue_number = queue_number_allocator.allocate(db, order.stall_id)
+
+    estimated_wait_time = stall.avg_prep_time + (current_queue_length * 3)
 
     db_order = Order(
         user_id=current_user.id,
@@ -83,60 +146,40 @@ def create_order(
         payment_status=PaymentStatus.PENDING,
         status=OrderStatus.PENDING_PAYMENT,
         special_instructions=order.special_instructions,
-        order_items=order_items
+        order_items=order_items,
+        queue_entry=QueueEntry(
+            stall_id=order.stall_id,
+            queue_position=queue_number,
+            estimated_wait_time=estimated_wait_time,
+            status=QueueStatus.WAITING
+        )
     )
 
+    # Order, items and queue entry go out in a single flush and transaction
     db.add(db_order)
-    db.commit()
-    db.refresh(db_order)
+    db.flush()
 
     db_order.order_number = f"ORD{db_order.id:05d}"
-
-    estimated_wait_time = stall.avg_prep_time + (current_queue_length * 3)
-
-    queue_entry = QueueEntry(
-        stall_id=order.stall_id,
-        order_id=db_order.id,
-        queue_position=queue_number,
-        estimated_wait_time=estimated_wait_time,
-        status=QueueStatus.WAITING
-    )
-    db.add(queue_entry)
     db.commit()
 
+    publish_order_event(db_order, "order.created")
     return db_order
 
 @router.get("/", response_model=List[OrderSummary])
 def get_user_orders(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    orders = db.query(Order).options(
+    query = db.query(Order).options(
         joinedload(Order.stall)
-    ).filter(Order.user_id == current_user.id).order_by(Order.created_at.desc()).all()
-
-    order_summaries = []
-    for order in orders:
-        estimated_ready_time = None
-        if order.status in [OrderStatus.PENDING_PAYMENT, OrderStatus.CONFIRMED, OrderStatus.PREPARING]:
-            estimated_ready_time = calculate_estimated_ready_time(order.stall_id, db)
-
-        order_summaries.append(OrderSummary(
-            id=order.id,
-            stall_id=order.stall_id,
-            stall_name=order.stall.name,
-            status=order.status,
-            payment_status=order.payment_status,
-            total_amount=order.total_amount,
-            queue_number=order.queue_number,
-            order_number=order.order_number,
-            pickup_window_start=order.pickup_window_start,
-            pickup_window_end=order.pickup_window_end,
-            created_at=order.created_at,
-            estimated_ready_time=estimated_ready_time
-        ))
+    ).filter(Order.user_id == current_user.id)
 
-    return order_summaries
+    orders, next_cursor = paginate_newest_first(query, Order, cursor, limit)
+    set_next_cursor(response, next_cursor)
+    return build_order_summaries(orders, db)
 
 @router.get("/{order_id}", response_model=OrderResponse)
 def get_order(
@@ -162,38 +205,22 @@ def get_order(
 @router.get("/user/{user_id}", response_model=List[OrderSummary])
 def get_user_order_history(
     user_id: int,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     if current_user.id != user_id and current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=403, detail="Not authorized to view this user's orders")
 
-    orders = db.query(Order).options(
+    query = db.query(Order).options(
         joinedload(Order.stall)
-    ).filter(Order.user_id == user_id).order_by(Order.created_at.desc()).all()
-
-    order_summaries = []
-    for order in orders:
-        estimated_ready_time = None
-        if order.status in [OrderStatus.PENDING_PAYMENT, OrderStatus.CONFIRMED, OrderStatus.PREPARING]:
-            estimated_ready_time = calculate_estimated_ready_time(order.stall_id, db)
-
-        order_summaries.append(OrderSummary(
-            id=order.id,
-            stall_id=order.stall_id,
-            stall_name=order.stall.name,
-            status=order.status,
-            payment_status=order.payment_status,
-            total_amount=order.total_amount,
-            queue_number=order.queue_number,
-            order_number=order.order_number,
-            pickup_window_start=order.pickup_window_start,
-            pickup_window_end=order.pickup_window_end,
-            created_at=order.created_at,
-            estimated_ready_time=estimated_ready_time
-        ))
+    ).filter(Order.user_id == user_id)
 
-    return order_summaries
+    orders, next_cursor = paginate_newest_first(query, Order, cursor, limit)
+    set_next_cursor(response, next_cursor)
+    return build_order_summaries(orders, db)
 
 @router.put("/{order_id}/status", response_model=OrderResponse)
 def update_order_status(
@@ -228,8 +255,12 @@ def update_order_status(
         elif status_update.status == OrderStatus.CANCELLED:
             queue_entry.status = QueueStatus.CANCELLED
 
+    sales_rollups.apply_status_change(db, order, old_status)
     db.commit()
     db.refresh(order)
+    publish_order_event(order)
+    if queue_entry:
+        publish_queue_event(queue_entry, order.user_id)
     return order
 
 @router.delete("/{order_id}")
@@ -256,6 +287,9 @@ def cancel_order(
         queue_entry.status = QueueStatus.CANCELLED
 
     db.commit()
+    publish_order_event(order)
+    if queue_entry:
+        publish_queue_event(queue_entry, order.user_id)
     return {"message": "Order cancelled successfully"}
 
 # Stall Owner Endpoints
@@ -263,11 +297,22 @@ def cancel_order(
 @router.get("/stall/{stall_id}/orders", response_model=List[OrderResponse])
 def get_stall_orders(
     stall_id: int,
+    response: Response,
     status: str = None,
+    cursor: Optional[str] = None,
+    since: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get all orders for a specific stall (Stall Owner only)"""
+    """
+    Get orders for a specific stall, newest first (Stall Owner only).
+
+    Every response carries an X-Changes-Cursor header. Passing it back as
+    `since` returns only orders updated after it (oldest change first) with
+    a new cursor, or 304 when nothing changed. Orders changed in the last
+    few seconds may be sent again on the next poll; merge them by id.
+    """
     stall = db.query(Stall).filter(Stall.id == stall_id).first()
     if not stall:
         raise HTTPException(status_code=404, detail="Stall not found")
@@ -279,20 +324,34 @@ def get_stall_orders(
     if current_user.role == UserRole.STALL_OWNER and stall.owner_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to view this stall's orders")
 
-    query = db.query(Order).options(
-        joinedload(Order.order_items).joinedload(OrderItem.menu_item),
-        joinedload(Order.user)
-    ).filter(Order.stall_id == stall_id)
+    base_query = db.query(Order).filter(Order.stall_id == stall_id)
 
     # Filter by status if provided
     if status:
         try:
             status_enum = OrderStatus(status)
-            query = query.filter(Order.status == status_enum)
+            base_query = base_query.filter(Order.status == status_enum)
         except ValueError:
             raise HTTPException(status_code=400, detail="Invalid status value")
 
-    orders = query.order_by(Order.created_at.desc()).all()
+    # selectinload keeps the LIMIT on orders rather than on the joined item rows
+    query = base_query.options(
+        selectinload(Order.order_items).joinedload(OrderItem.menu_item),
+        joinedload(Order.user)
+    )
+
+    if since:
+        orders, changes_cursor = changes_since(query, Order, since, limit)
+        if not orders:
+            return Response(status_code=304, headers={CHANGES_CURSOR_HEADER: changes_cursor})
+        response.headers[CHANGES_CURSOR_HEADER] = changes_cursor
+        return orders
+
+    orders, next_cursor = paginate_newest_first(query, Order, cursor, limit)
+    set_next_cursor(response, next_cursor)
+    changes_cursor = latest_change_cursor(base_query, Order)
+    if changes_cursor:
+        response.headers[CHANGES_CURSOR_HEADER] = changes_cursor
     return orders
 
 @router.put("/{order_id}/confirm-payment", response_model=OrderResponse)
@@ -314,15 +373,23 @@ def confirm_payment(
     if order.status != OrderStatus.PENDING_PAYMENT:
         raise HTTPException(status_code=400, detail="Order is not in pending payment status")
 
+    queue_entry = None
     if payment_request.payment_confirmed:
         order.payment_status = PaymentStatus.CONFIRMED
         order.status = OrderStatus.CONFIRMED
     else:
         order.payment_status = PaymentStatus.FAILED
         order.status = OrderStatus.CANCELLED
+        # A failed payment gives up the order's place in line, as cancelling does
+        queue_entry = db.query(QueueEntry).filter(QueueEntry.order_id == order_id).first()
+        if queue_entry:
+            queue_entry.status = QueueStatus.CANCELLED
 
     db.commit()
     db.refresh(order)
+    publish_order_event(order)
+    if queue_entry:
+        publish_queue_event(queue_entry, order.user_id)
     return order
 
 @router.put("/{order_id}/start-preparing", response_model=OrderResponse)
@@ -351,6 +418,9 @@ def start_preparing_order(
 
     db.commit()
     db.refresh(order)
+    publish_order_event(order)
+    if queue_entry:
+        publish_queue_event(queue_entry, order.user_id)
     return order
 
 @router.put("/{order_id}/mark-ready", response_model=OrderResponse)
@@ -380,6 +450,9 @@ def mark_order_ready(
 
     db.commit()
     db.refresh(order)
+    publish_order_event(order)
+    if queue_entry:
+        publish_queue_event(queue_entry, order.user_id)
     return order
 
 @router.put("/{order_id}/mark-completed", response_model=OrderResponse)
@@ -401,6 +474,7 @@ def mark_order_completed(
         raise HTTPException(status_code=400, detail="Order must be ready before marking as completed")
 
     order.status = OrderStatus.COMPLETED
+    sales_rollups.apply_status_change(db, order, OrderStatus.READY)
 
     queue_entry = db.query(QueueEntry).filter(QueueEntry.order_id == order_id).first()
     if queue_entry:
@@ -409,4 +483,7 @@ def mark_order_completed(
 
     db.commit()
     db.refresh(order)
+    publish_order_event(order)
+    if queue_entry:
+        publish_queue_event(queue_entry, order.user_id)
     return order
\ No newline at end of file
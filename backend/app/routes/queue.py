@@ -12,6 +12,10 @@ from app.schemas.queue import (
     QueuePositionResponse, StallQueueResponse, QueueUpdateRequest
 )
 from app.routes.auth import get_current_user
+from app.services.event_broker import event_broker, publish_order_event, publish_queue_event
+from app.services.queue_index import queue_index
+from app.services.queue_numbers import queue_number_allocator
+from app.services.sales_rollups import sales_rollups
 from app.models.user import User
 
 router = APIRouter()
@@ -27,7 +31,7 @@ def get_stall_queue(stall_id: int, db: Session = Depends(get_db)):
     ).filter(
         QueueEntry.stall_id == stall_id,
         QueueEntry.status.in_([QueueStatus.WAITING, QueueStatus.PREPARING, QueueStatus.READY])
-    ).order_by(QueueEntry.queue_position).all()
+    ).order_by(QueueEntry.id).all()  # join order, as queue_index counts orders ahead
 
     total_estimated_time = sum(entry.estimated_wait_time or 0 for entry in queue_entries)
 
@@ -52,7 +56,7 @@ def join_queue(
     if order.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized for this order")
 
-    if order.status not in [OrderStatus.PENDING, OrderStatus.ACCEPTED]:
+    if order.status not in [OrderStatus.PENDING_PAYMENT, OrderStatus.CONFIRMED]:
         raise HTTPException(status_code=400, detail="Order cannot be added to queue in current status")
 
     existing_entry = db.query(QueueEntry).filter(QueueEntry.order_id == queue_request.order_id).first()
@@ -63,12 +67,11 @@ def join_queue(
     if not stall:
         raise HTTPException(status_code=404, detail="Stall not found")
 
-    current_queue_length = db.query(QueueEntry).filter(
-        QueueEntry.stall_id == order.stall_id,
-        QueueEntry.status.in_([QueueStatus.WAITING, QueueStatus.PREPARING])
-    ).count()
+    queue_index.ensure_fresh(db)
+    current_queue_length = queue_index.queue_length(order.stall_id)
+
+    next_position = order.queue_number or queue_number_allocator.allocate(db, order.stall_id)
 
-    next_position = current_queue_length + 1
     estimated_wait_time = stall.avg_prep_time + (current_queue_length * 3)
 
     db_queue_entry = QueueEntry(
@@ -82,6 +85,7 @@ def join_queue(
     db.add(db_queue_entry)
     db.commit()
     db.refresh(db_queue_entry)
+    publish_queue_event(db_queue_entry, order.user_id, "queue.joined")
     return db_queue_entry
 
 @router.get("/position/{order_id}", response_model=QueuePositionResponse)
@@ -100,11 +104,9 @@ def get_queue_position(
     if queue_entry.order.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to view this queue position")
 
-    orders_ahead = db.query(QueueEntry).filter(
-        QueueEntry.stall_id == queue_entry.stall_id,
-        QueueEntry.queue_position < queue_entry.queue_position,
-        QueueEntry.status.in_([QueueStatus.WAITING, QueueStatus.PREPARING])
-    ).count()
+    # Answered from the in-memory queue index instead of counting rows on every poll
+    queue_index.ensure_fresh(db)
+    orders_ahead = queue_index.orders_ahead(queue_entry.stall_id, queue_entry.id)
 
     estimated_ready_time = None
     if queue_entry.estimated_wait_time:
@@ -113,7 +115,7 @@ def get_queue_position(
     return QueuePositionResponse(
         order_id=order_id,
         stall_id=queue_entry.stall_id,
-        queue_position=queue_entry.queue_position,
+        queue_position=orders_ahead + 1,  # live rank; queue_entry.queue_position is the day's ticket number
         estimated_wait_time=queue_entry.estimated_wait_time,
         orders_ahead=orders_ahead,
         status=queue_entry.status,
@@ -141,6 +143,7 @@ def update_queue_status(
         raise HTTPException(status_code=403, detail="Not authorized to update this queue")
 
     queue_entry.status = status_update.status
+    previous_order_status = queue_entry.order.status
 
     if status_update.status == QueueStatus.PREPARING:
         queue_entry.order.status = OrderStatus.PREPARING
@@ -153,8 +156,11 @@ def update_queue_status(
     elif status_update.status == QueueStatus.CANCELLED:
         queue_entry.order.status = OrderStatus.CANCELLED
 
+    sales_rollups.apply_status_change(db, queue_entry.order, previous_order_status)
     db.commit()
     db.refresh(queue_entry)
+    publish_order_event(queue_entry.order)
+    publish_queue_event(queue_entry, queue_entry.order.user_id)
     return queue_entry
 
 @router.put("/update", response_model=dict)
@@ -167,6 +173,7 @@ def update_queue_positions(
         raise HTTPException(status_code=403, detail="Not authorized to update queue positions")
 
     completed_orders = []
+    completed_entries = []
     stall_ids = set()
 
     for order_id in update_request.completed_order_ids:
@@ -182,24 +189,25 @@ def update_queue_positions(
             queue_entry.stall.owner_id != current_user.id):
             continue
 
+        previous_order_status = queue_entry.order.status
         queue_entry.status = QueueStatus.COLLECTED
         queue_entry.collected_at = datetime.now()
         queue_entry.order.status = OrderStatus.COMPLETED
+        sales_rollups.apply_status_change(db, queue_entry.order, previous_order_status)
 
         completed_orders.append(order_id)
+        completed_entries.append(queue_entry)
         stall_ids.add(queue_entry.stall_id)
 
-    for stall_id in stall_ids:
-        remaining_entries = db.query(QueueEntry).filter(
-            QueueEntry.stall_id == stall_id,
-            QueueEntry.status.in_([QueueStatus.WAITING, QueueStatus.PREPARING, QueueStatus.READY])
-        ).order_by(QueueEntry.queue_position).all()
-
-        for i, entry in enumerate(remaining_entries):
-            entry.queue_position = i + 1
-
+    # Positions are kept as issued; orders ahead come from the queue index, so nothing is renumbered
     db.commit()
 
+    for queue_entry in completed_entries:
+        publish_order_event(queue_entry.order)
+        publish_queue_event(queue_entry, queue_entry.order.user_id)
+    for stall_id in stall_ids:
+        event_broker.publish([f"stall:{stall_id}"], "queue.reordered", {"stall_id": stall_id})
+
     return {
         "message": f"Updated {len(completed_orders)} orders",
         "completed_orders": completed_orders,
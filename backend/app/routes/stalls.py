@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from app.database.database import get_db
@@ -6,38 +6,78 @@ from app.models.stall import Stall
 from app.schemas.stall import StallCreate, StallResponse, StallUpdate, StallWithDistance
 from app.routes.auth import get_current_user
 from app.models.user import User, UserRole
-from app.utils.distance import get_distance_and_time
+from app.utils.distance import calculate_walking_times
+from app.services.stall_index import stall_index
+from app.services.response_versions import response_versions, stall_key, STALL_LIST
+from app.services.catalogue_cache import catalogue_cache
 
 router = APIRouter()
 
+def _load_stall_list(db: Session) -> list:
+    stalls = db.query(Stall).order_by(Stall.id).all()
+    return [StallResponse.model_validate(stall).model_dump(mode="json") for stall in stalls]
+
+def _load_stall(db: Session, stall_id: int) -> Optional[dict]:
+    stall = db.query(Stall).filter(Stall.id == stall_id).first()
+    if not stall:
+        return None
+    return StallResponse.model_validate(stall).model_dump(mode="json")
+
 @router.get("/", response_model=List[StallResponse])
-def get_all_stalls(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    stalls = db.query(Stall).offset(skip).limit(limit).all()
-    return stalls
+def get_all_stalls(
+    request: Request,
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_db)
+):
+    # Cached payloads are already serialized, so skip response_model validation
+    stalls = catalogue_cache.get_or_load(STALL_LIST, lambda: _load_stall_list(db))
+    return response_versions.json_response(stalls[skip:skip + limit], request)
 
 @router.get("/nearby", response_model=List[StallWithDistance])
 def get_nearby_stalls(
-    lat: float = Query(..., description="User's latitude"),
-    lng: float = Query(..., description="User's longitude"),
-    skip: int = 0,
-    limit: int = 100,
+    lat: float = Query(..., ge=-90, le=90, description="User's latitude"),
+    lng: float = Query(..., ge=-180, le=180, description="User's longitude"),
+    radius_km: Optional[float] = Query(None, gt=0, description="Only return stalls within this distance"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
     db: Session = Depends(get_db)
 ):
     """
     Get stalls sorted by distance from user's location.
     Returns stalls with distance and walking time information.
+    Paging is applied after sorting, so skip/limit walk outwards from the user.
 
-    Example: /api/stalls/nearby?lat=1.347&lng=103.680
+    Example: /api/stalls/nearby?lat=1.347&lng=103.680&radius_km=1
     """
-    # Get all stalls
-    stalls = db.query(Stall).offset(skip).limit(limit).all()
+    stall_index.ensure_fresh(db)
+
+    # k-nearest lookup for everything up to the end of the requested page
+    ranked = stall_index.nearest(lat, lng, k=skip + limit, radius_km=radius_km)
+
+    # Stalls without coordinates sort after every located stall
+    if radius_km is None and len(ranked) < skip + limit:
+        ranked += [(stall_id, None) for stall_id in stall_index.unlocated_ids]
+
+    page = ranked[skip:skip + limit]
+    if not page:
+        return []
+
+    stalls = {
+        stall.id: stall
+        for stall in db.query(Stall).filter(Stall.id.in_([stall_id for stall_id, _ in page])).all()
+    }
+
+    # Walking times for the whole page in one vectorized pass
+    located_distances = [distance_km for _, distance_km in page if distance_km is not None]
+    walking_times = iter(calculate_walking_times(located_distances))
 
-    # Calculate distance and walking time for each stall
     stalls_with_distance = []
-    for stall in stalls:
-        distance_km, walking_time = get_distance_and_time(
-            lat, lng, stall.latitude, stall.longitude
-        )
+    for stall_id, distance_km in page:
+        walking_time = int(next(walking_times)) if distance_km is not None else None
+        stall = stalls.get(stall_id)
+        if stall is None:
+            continue
 
         # Convert stall to dict and add distance info
         stall_dict = {
@@ -62,19 +102,14 @@ def get_nearby_stalls(
         }
         stalls_with_distance.append(stall_dict)
 
-    # Sort by distance (closest first), putting stalls without coordinates at the end
-    stalls_with_distance.sort(
-        key=lambda x: (x["distance_km"] is None, x["distance_km"] or float('inf'))
-    )
-
     return stalls_with_distance
 
 @router.get("/{stall_id}", response_model=StallResponse)
-def get_stall(stall_id: int, db: Session = Depends(get_db)):
-    stall = db.query(Stall).filter(Stall.id == stall_id).first()
-    if not stall:
+def get_stall(stall_id: int, request: Request, db: Session = Depends(get_db)):
+    stall = catalogue_cache.get_or_load(stall_key(stall_id), lambda: _load_stall(db, stall_id))
+    if stall is None:
         raise HTTPException(status_code=404, detail="Stall not found")
-    return stall
+    return response_versions.json_response(stall, request)
 
 @router.post("/", response_model=StallResponse)
 def create_stall(
@@ -89,6 +124,8 @@ def create_stall(
     db.add(db_stall)
     db.commit()
     db.refresh(db_stall)
+    stall_index.invalidate()
+    catalogue_cache.invalidate_stall(db_stall.id)
     return db_stall
 
 @router.put("/{stall_id}", response_model=StallResponse)
@@ -110,6 +147,8 @@ def update_stall(
 
     db.commit()
     db.refresh(stall)
+    stall_index.invalidate()
+    catalogue_cache.invalidate_stall(stall_id)
     return stall
 
 @router.delete("/{stall_id}")
@@ -127,4 +166,6 @@ def delete_stall(
 
     db.delete(stall)
     db.commit()
+    stall_index.invalidate()
+    catalogue_cache.invalidate_stall(stall_id)
     return {"message": "Stall deleted successfully"}
\ No newline at end of file
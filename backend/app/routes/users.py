@@ -5,6 +5,7 @@ from app.database.database import get_db
 from app.models.user import User, UserRole
 from app.schemas.user import UserResponse, UserUpdate
 from app.routes.auth import get_current_user
+from app.services.user_cache import user_cache
 
 router = APIRouter()
 
@@ -54,6 +55,7 @@ def update_user(
 
     db.commit()
     db.refresh(user)
+    user_cache.invalidate(subject=user.student_id)
     return user
 
 @router.delete("/{user_id}")
@@ -71,4 +73,5 @@ def delete_user(
 
     db.delete(user)
     db.commit()
+    user_cache.invalidate(subject=user.student_id)
     return {"message": "User deleted successfully"}
\ No newline at end of file
@@ -126,7 +126,9 @@ class OrderListResponse(BaseModel):
     stall_id: int
     status: OrderStatus
     total_amount: float
-    pickup_time: Optional[datetime]
+    pickup_time: Optional[datetime] = None
+    pickup_window_start: Optional[datetime] = None
+    pickup_window_end: Optional[datetime] = None
     created_at: datetime
     updated_at: datetime
 
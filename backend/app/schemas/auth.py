@@ -3,6 +3,7 @@ from typing import Optional
 from datetime import datetime
 import re
 from app.models.user import UserRole
+from app.models.email import EmailStatus
 
 class Token(BaseModel):
     access_token: str
@@ -124,4 +125,16 @@ class OTPResponse(BaseModel):
     testing_otp: Optional[str] = None  # Only included in testing mode
 
 class ResendOTPRequest(BaseModel):
-    email: EmailStr
\ No newline at end of file
+    email: EmailStr
+
+class EmailDeliveryStatus(BaseModel):
+    id: int
+    kind: str
+    status: EmailStatus
+    attempts: int
+    last_error: Optional[str] = None
+    created_at: datetime
+    sent_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,216 @@
+"""
+Catalogue Cache for NTU Food App
+Read-through cache of serialized stall and menu payloads, in-process or shared through Redis
+"""
+import json
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.config import settings
+from app.services.response_versions import STALL_LIST, stall_key, menu_key
+
+logger = logging.getLogger(__name__)
+
+REDIS_KEY_PREFIX = "ntu-food:catalogue:"
+# Kept apart from the payload keys so clear() never resets a generation
+REDIS_GENERATION_PREFIX = "ntu-food:catalogue-generation:"
+
+
+class InProcessCacheBackend:
+    """Default backend: each worker process keeps its own copy"""
+
+    def __init__(self):
+        self.entries: Dict[str, Tuple[float, Any]] = {}
+        self.generations: Dict[str, int] = {}
+        self.lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self.entries[key]
+                return None
+            return value
+
+    def generation(self, key: str) -> int:
+        with self.lock:
+            return self.generations.get(key, 0)
+
+    def set_if_generation(self, key: str, value: Any, ttl_seconds: int, generation: int) -> bool:
+        with self.lock:
+            if self.generations.get(key, 0) != generation:
+                return False
+            self.entries[key] = (time.monotonic() + ttl_seconds, value)
+            return True
+
+    def invalidate(self, *keys: str):
+        with self.lock:
+            for key in keys:
+                self.generations[key] = self.generations.get(key, 0) + 1
+                self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def size(self) -> Optional[int]:
+        return len(self.entries)
+
+
+class RedisCacheBackend:
+    """Shared backend so every uvicorn worker reads and invalidates the same entries"""
+
+    def __init__(self, url: str):
+        # Imported lazily so redis stays an optional dependency
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.watch_error = redis.WatchError
+
+    def get(self, key: str) -> Optional[Any]:
+        raw = self.client.get(REDIS_KEY_PREFIX + key)
+        return json.loads(raw) if raw is not None else None
+
+    def generation(self, key: str) -> int:
+        return int(self.client.get(REDIS_GENERATION_PREFIX + key) or 0)
+
+    def set_if_generation(self, key: str, value: Any, ttl_seconds: int, generation: int) -> bool:
+        """Write only if no worker has invalidated key since generation was read"""
+        generation_key = REDIS_GENERATION_PREFIX + key
+        with self.client.pipeline() as pipe:
+            try:
+                pipe.watch(generation_key)
+                if int(pipe.get(generation_key) or 0) != generation:
+                    return False
+                pipe.multi()
+                pipe.set(REDIS_KEY_PREFIX + key, json.dumps(value), ex=ttl_seconds)
+                pipe.execute()
+                return True
+            except self.watch_error:
+                # Invalidated between the check and the write
+                return False
+
+    def invalidate(self, *keys: str):
+        if not keys:
+            return
+        with self.client.pipeline() as pipe:
+            for key in keys:
+                pipe.incr(REDIS_GENERATION_PREFIX + key)
+            pipe.delete(*(REDIS_KEY_PREFIX + key for key in keys))
+            pipe.execute()
+
+    def clear(self):
+        for key in self.client.scan_iter(match=REDIS_KEY_PREFIX + "*"):
+            self.client.delete(key)
+
+    def size(self) -> Optional[int]:
+        return None
+
+
+class CatalogueCache:
+    """
+    Holds JSON-ready stall and menu payloads keyed like response_versions
+    ("stalls", "stall:<id>", "menu:<id>"). Write handlers invalidate the
+    exact keys they touch; the TTL only catches writes made outside the API.
+
+    Each key has a generation, bumped on invalidate and stored in the
+    backend next to the payload. A miss notes the generation before
+    loading and writes only if it is unchanged, so a load that raced a
+    write in any worker never stores the stale payload.
+    """
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self.backend = self._create_backend()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.errors = 0
+
+    def _create_backend(self):
+        url = settings.CATALOGUE_CACHE_URL
+        if url and url.startswith(("redis://", "rediss://")):
+            logger.info("Catalogue cache using Redis backend")
+            return RedisCacheBackend(url)
+        return InProcessCacheBackend()
+
+    def _count(self, counter: str):
+        with self.lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def get_or_load(self, key: str, loader: Callable[[], Optional[Any]]) -> Optional[Any]:
+        """
+        Return the cached payload for key, calling loader on a miss.
+        A loader result of None (e.g. stall not found) is returned but not cached.
+        """
+        try:
+            value = self.backend.get(key)
+        except Exception as e:
+            logger.warning(f"Catalogue cache read failed for {key}: {e}")
+            self._count("errors")
+            value = None
+
+        if value is not None:
+            self._count("hits")
+            return value
+
+        self._count("misses")
+        try:
+            generation = self.backend.generation(key)
+        except Exception as e:
+            logger.warning(f"Catalogue cache read failed for {key}: {e}")
+            self._count("errors")
+            generation = None
+
+        value = loader()
+        if value is None or generation is None:
+            return value
+
+        try:
+            self.backend.set_if_generation(key, value, self.ttl_seconds, generation)
+        except Exception as e:
+            logger.warning(f"Catalogue cache write failed for {key}: {e}")
+            self._count("errors")
+        return value
+
+    def invalidate(self, *keys: str):
+        with self.lock:
+            self.invalidations += len(keys)
+        try:
+            self.backend.invalidate(*keys)
+        except Exception as e:
+            logger.warning(f"Catalogue cache invalidation failed for {keys}: {e}")
+            self._count("errors")
+
+    def invalidate_stall(self, stall_id: int):
+        self.invalidate(STALL_LIST, stall_key(stall_id), menu_key(stall_id))
+
+    def invalidate_menu(self, *stall_ids: Optional[int]):
+        self.invalidate(*(menu_key(stall_id) for stall_id in set(stall_ids) if stall_id is not None))
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self) -> dict:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": type(self.backend).__name__,
+                "size": self.backend.size(),
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "invalidations": self.invalidations,
+                "errors": self.errors,
+            }
+
+
+# Initialize catalogue cache
+catalogue_cache = CatalogueCache(ttl_seconds=settings.CATALOGUE_CACHE_TTL_SECONDS)
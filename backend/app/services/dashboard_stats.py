@@ -0,0 +1,83 @@
+"""
+Dashboard Stats for NTU Food App
+Admin dashboard totals from two conditional-aggregation queries, behind a short TTL cache
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.order import Order, OrderStatus
+from app.models.stall import Stall
+from app.models.user import User
+
+# Orders still moving through the kitchen
+ACTIVE_STATUSES = [OrderStatus.PENDING_PAYMENT, OrderStatus.CONFIRMED, OrderStatus.PREPARING, OrderStatus.READY]
+
+
+class DashboardStatsService:
+    """Computes the admin dashboard in two queries and reuses the result for ttl_seconds"""
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self.cached: Optional[Tuple[float, dict]] = None
+        self.lock = threading.Lock()
+
+    def get(self, db: Session) -> dict:
+        with self.lock:
+            if self.cached and time.monotonic() - self.cached[0] < self.ttl_seconds:
+                return self.cached[1]
+
+        stats = self.compute(db)
+        with self.lock:
+            self.cached = (time.monotonic(), stats)
+        return stats
+
+    def invalidate(self):
+        with self.lock:
+            self.cached = None
+
+    def compute(self, db: Session, now: Optional[datetime] = None) -> dict:
+        today_start = datetime.combine((now or datetime.utcnow()).date(), datetime.min.time())
+        tomorrow_start = today_start + timedelta(days=1)
+
+        is_completed = Order.status == OrderStatus.COMPLETED
+        # Range rather than func.date() so an index on created_at stays usable
+        is_today = (Order.created_at >= today_start) & (Order.created_at < tomorrow_start)
+
+        # One pass over orders for every order-derived figure
+        orders = db.query(
+            func.count(Order.id),
+            func.sum(case((Order.status.in_(ACTIVE_STATUSES), 1), else_=0)),
+            func.sum(case((is_completed, Order.total_amount), else_=0)),
+            func.sum(case((is_today, 1), else_=0)),
+            func.sum(case((is_today & is_completed, Order.total_amount), else_=0))
+        ).one()
+
+        # Users and stalls together as scalar subqueries in a single round trip
+        people = db.execute(select(
+            select(func.count(User.id)).scalar_subquery(),
+            select(func.count(User.id)).where(User.is_active == True).scalar_subquery(),
+            select(func.count(Stall.id)).scalar_subquery()
+        )).one()
+
+        total_orders, active_orders, total_revenue, today_orders, today_revenue = orders
+        total_users, active_users, total_stalls = people
+        return {
+            "total_users": total_users,
+            "active_users": active_users,
+            "total_stalls": total_stalls,
+            "total_orders": total_orders,
+            "active_orders": active_orders or 0,
+            "total_revenue": float(total_revenue or 0),
+            "today_orders": today_orders or 0,
+            "today_revenue": float(today_revenue or 0)
+        }
+
+
+# Initialize dashboard stats
+dashboard_stats = DashboardStatsService(ttl_seconds=settings.DASHBOARD_CACHE_TTL_SECONDS)
@@ -100,18 +100,7 @@ class EmailService:
 
         # Testing mode - just log the OTP
         if self.testing_mode:
-            logger.info(f"\n{'='*60}")
-            logger.info(f"📧 EMAIL TESTING MODE - OTP NOT SENT")
-            logger.info(f"To: {recipient_email}")
-            logger.info(f"Name: {user_name}")
-            logger.info(f"OTP Code: {otp_code}")
-            logger.info(f"{'='*60}\n")
-            print(f"\n{'='*60}")
-            print(f"📧 EMAIL TESTING MODE - OTP NOT SENT")
-            print(f"To: {recipient_email}")
-            print(f"Name: {user_name}")
-            print(f"OTP Code: {otp_code}")
-            print(f"{'='*60}\n")
+            self._log_testing_otp(recipient_email, otp_code, user_name)
             return True, None
 
         # Production mode - send actual email
@@ -151,6 +140,87 @@ class EmailService:
         logger.error(error_msg)
         return False, "Failed to send verification email. Please try again later."
 
+    def _log_testing_otp(self, recipient_email: str, otp_code: str, user_name: str):
+        """Log the OTP instead of sending it (EMAIL_TESTING_MODE)"""
+        logger.info(f"\n{'='*60}")
+        logger.info(f"📧 EMAIL TESTING MODE - OTP NOT SENT")
+        logger.info(f"To: {recipient_email}")
+        logger.info(f"Name: {user_name}")
+        logger.info(f"OTP Code: {otp_code}")
+        logger.info(f"{'='*60}\n")
+        print(f"\n{'='*60}")
+        print(f"📧 EMAIL TESTING MODE - OTP NOT SENT")
+        print(f"To: {recipient_email}")
+        print(f"Name: {user_name}")
+        print(f"OTP Code: {otp_code}")
+        print(f"{'='*60}\n")
+
+    def queue_otp_email(
+        self,
+        recipient_email: str,
+        otp_code: str,
+        user_name: str
+    ) -> Tuple[bool, Optional[str]]:
+        """
+        Queue OTP verification email for background delivery
+
+        Unlike send_otp_email this returns as soon as the message is in the
+        outbox; delivery (with retries) happens on the mail queue workers.
+
+        Returns:
+            tuple: (queued: bool, error_message: Optional[str])
+        """
+        from app.services.metrics import metrics
+
+        is_allowed, rate_limit_error = self._check_rate_limit(recipient_email)
+        if not is_allowed:
+            logger.warning(f"Rate limit exceeded for {recipient_email}")
+            metrics.otp_requests.inc(result="rate_limited")
+            return False, rate_limit_error
+
+        if self.testing_mode:
+            self._log_testing_otp(recipient_email, otp_code, user_name)
+            metrics.otp_requests.inc(result="logged")
+            return True, None
+
+        if not self.smtp_email or not self.smtp_password:
+            error_msg = "SMTP credentials not configured. Please set SMTP_EMAIL and SMTP_PASSWORD in .env file."
+            logger.error(error_msg)
+            metrics.otp_requests.inc(result="not_configured")
+            return False, error_msg
+
+        from app.services.mail_queue import mail_queue
+        mail_queue.enqueue(
+            recipient=recipient_email,
+            subject=f"{self.app_name} - Your Verification Code",
+            html_body=self._create_otp_email_html(otp_code, user_name),
+            text_body=self._create_otp_email_text(otp_code, user_name),
+            kind="otp"
+        )
+        metrics.otp_requests.inc(result="queued")
+        return True, None
+
+    def queue_welcome_email(self, recipient_email: str, user_name: str) -> Tuple[bool, Optional[str]]:
+        """Queue welcome email after successful registration"""
+        if self.testing_mode:
+            logger.info(f"\n📧 Welcome email would be sent to: {recipient_email}\n")
+            print(f"\n📧 Welcome email would be sent to: {recipient_email}\n")
+            return True, None
+
+        if not self.smtp_email or not self.smtp_password:
+            logger.warning("SMTP not configured, skipping welcome email")
+            return False, "SMTP not configured"
+
+        from app.services.mail_queue import mail_queue
+        mail_queue.enqueue(
+            recipient=recipient_email,
+            subject=f"Welcome to {self.app_name}!",
+            html_body=self._create_welcome_email_html(user_name),
+            text_body=self._create_welcome_email_text(user_name),
+            kind="welcome"
+        )
+        return True, None
+
     def _send_email_smtp(
         self,
         to_email: str,
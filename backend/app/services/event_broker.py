@@ -0,0 +1,214 @@
+"""
+Event Broker for NTU Food App
+Pushes order and queue updates to subscribed clients (Server-Sent Events)
+"""
+import asyncio
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+REDIS_CHANNEL = "ntu-food:events"
+
+
+class Subscription:
+    """A single client's view of the broker: a bounded queue of pending events"""
+
+    def __init__(self, topics: List[str], loop: asyncio.AbstractEventLoop, max_pending: int = 100):
+        self.topics = topics
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+
+    def _offer(self, event: dict):
+        # Slow consumers drop their oldest events rather than blocking publishers
+        if self.queue.full():
+            try:
+                self.queue.get_nowait()
+            except asyncio.QueueEmpty:
+                pass
+        self.queue.put_nowait(event)
+
+    def deliver(self, event: dict):
+        """Thread-safe delivery, callable from sync route handlers"""
+        try:
+            self.loop.call_soon_threadsafe(self._offer, event)
+        except RuntimeError:
+            # Event loop already closed; the client is gone
+            pass
+
+
+class InProcessBackend:
+    """Default backend: events only reach subscribers in this worker process"""
+
+    def __init__(self):
+        self.broker: Optional["EventBroker"] = None
+
+    async def start(self, broker: "EventBroker"):
+        self.broker = broker
+
+    async def stop(self):
+        pass
+
+    def publish(self, topics: List[str], event: dict):
+        if self.broker:
+            self.broker.dispatch(topics, event)
+
+
+class RedisBackend:
+    """Fan events out through Redis pub/sub so every uvicorn worker receives them"""
+
+    def __init__(self, url: str):
+        # Imported lazily so redis stays an optional dependency
+        import redis
+        import redis.asyncio as aioredis
+
+        self.url = url
+        self.publisher = redis.Redis.from_url(url)
+        self.subscriber = aioredis.Redis.from_url(url)
+        # One thread keeps events in publish order and keeps the Redis round trip
+        # off the caller, which may be the event loop (async admin handlers)
+        self.publish_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="event-publish")
+        self.broker: Optional["EventBroker"] = None
+        self.listener: Optional[asyncio.Task] = None
+
+    async def start(self, broker: "EventBroker"):
+        self.broker = broker
+        self.listener = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self.listener:
+            self.listener.cancel()
+        # Flush events already handed off before closing
+        await asyncio.get_running_loop().run_in_executor(None, self.publish_executor.shutdown)
+        await self.subscriber.close()
+
+    def publish(self, topics: List[str], event: dict):
+        payload = json.dumps({"topics": topics, "event": event}, default=_json_default)
+        self.publish_executor.submit(self._send, payload)
+
+    def _send(self, payload: str):
+        try:
+            self.publisher.publish(REDIS_CHANNEL, payload)
+        except Exception as e:
+            logger.warning(f"Failed to publish event to Redis: {e}")
+
+    async def _listen(self):
+        pubsub = self.subscriber.pubsub()
+        await pubsub.subscribe(REDIS_CHANNEL)
+        async for message in pubsub.listen():
+            if message.get("type") != "message":
+                continue
+            try:
+                data = json.loads(message["data"])
+                self.broker.dispatch(data["topics"], data["event"])
+            except Exception as e:
+                logger.warning(f"Dropping malformed event from Redis: {e}")
+
+
+class EventBroker:
+    """Topic-based pub/sub for order and queue updates"""
+
+    def __init__(self):
+        self.subscriptions: Dict[str, Set[Subscription]] = {}
+        self.backend = None
+
+    def _create_backend(self):
+        url = settings.EVENT_BROKER_URL
+        if url and url.startswith(("redis://", "rediss://")):
+            logger.info("Event broker using Redis backend")
+            return RedisBackend(url)
+        return InProcessBackend()
+
+    async def start(self):
+        self.backend = self._create_backend()
+        await self.backend.start(self)
+
+    async def stop(self):
+        if self.backend:
+            await self.backend.stop()
+            self.backend = None
+
+    def subscribe(self, topics: List[str]) -> Subscription:
+        subscription = Subscription(topics, asyncio.get_running_loop())
+        for topic in topics:
+            self.subscriptions.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        for topic in subscription.topics:
+            subscribers = self.subscriptions.get(topic)
+            if subscribers:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self.subscriptions[topic]
+
+    def publish(self, topics: List[str], event_type: str, data: Dict[str, Any]):
+        """Publish an event to every subscriber of any of the given topics"""
+        event = {"type": event_type, "data": data}
+        if self.backend is None:
+            return
+        try:
+            self.backend.publish(topics, event)
+        except Exception as e:
+            # Push is best effort; clients can always fall back to polling
+            logger.warning(f"Failed to publish {event_type}: {e}")
+
+    def dispatch(self, topics: List[str], event: dict):
+        """Deliver an event to local subscribers (called by the backend)"""
+        delivered = set()
+        for topic in topics:
+            for subscription in list(self.subscriptions.get(topic, ())):
+                if subscription not in delivered:
+                    subscription.deliver(event)
+                    delivered.add(subscription)
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if hasattr(value, "value"):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def encode_sse(event: dict) -> str:
+    """Format an event as a Server-Sent Events frame"""
+    return f"event: {event['type']}\ndata: {json.dumps(event['data'], default=_json_default)}\n\n"
+
+
+def order_topics(order) -> List[str]:
+    return [f"stall:{order.stall_id}", f"user:{order.user_id}", f"order:{order.id}"]
+
+
+def publish_order_event(order, event_type: str = "order.updated"):
+    """Publish only the fields of an order that change across transitions"""
+    event_broker.publish(order_topics(order), event_type, {
+        "id": order.id,
+        "stall_id": order.stall_id,
+        "user_id": order.user_id,
+        "order_number": order.order_number,
+        "status": order.status,
+        "payment_status": order.payment_status,
+        "queue_number": order.queue_number,
+        "updated_at": order.updated_at,
+    })
+
+
+def publish_queue_event(queue_entry, user_id: int, event_type: str = "queue.updated"):
+    event_broker.publish([f"stall:{queue_entry.stall_id}", f"user:{user_id}", f"order:{queue_entry.order_id}"], event_type, {
+        "id": queue_entry.id,
+        "order_id": queue_entry.order_id,
+        "stall_id": queue_entry.stall_id,
+        "queue_position": queue_entry.queue_position,
+        "status": queue_entry.status,
+        "estimated_wait_time": queue_entry.estimated_wait_time,
+    })
+
+
+# Initialize event broker
+event_broker = EventBroker()
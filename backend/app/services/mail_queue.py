@@ -0,0 +1,256 @@
+"""
+Outbound Mail Queue for NTU Food App
+Durable outbox table drained by background workers over persistent SMTP connections
+"""
+import logging
+import smtplib
+import ssl
+import threading
+import time
+from datetime import datetime, timedelta
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from typing import List, Optional
+
+from sqlalchemy import update
+
+from app.config import settings
+from app.database.database import SessionLocal
+from app.models.email import EmailOutbox, EmailStatus
+from app.services.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class SMTPConnection:
+    """One authenticated SMTP session, reused across messages and reopened on failure"""
+
+    def __init__(self, host: str, port: int, username: str, password: str, timeout: int):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.timeout = timeout
+        self.server: Optional[smtplib.SMTP] = None
+        self.last_used = 0.0
+
+    def _connect(self):
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        server.ehlo()
+        if server.has_extn("starttls"):
+            server.starttls(context=ssl.create_default_context())
+            server.ehlo()
+        if self.username and self.password and server.has_extn("auth"):
+            server.login(self.username, self.password)
+        self.server = server
+
+    def _is_alive(self) -> bool:
+        try:
+            return self.server.noop()[0] == 250
+        except OSError:
+            return False
+
+    def send(self, message: MIMEMultipart):
+        # Servers drop idle sessions; probe with NOOP before reusing an old one
+        if self.server is not None and time.monotonic() - self.last_used > 30 and not self._is_alive():
+            self.close()
+        if self.server is None:
+            self._connect()
+
+        try:
+            self.server.send_message(message)
+        except smtplib.SMTPResponseException:
+            # The server answered and refused; let the queue decide whether to retry
+            raise
+        except OSError:
+            # Connection went away mid-session: reconnect once and retry
+            self.close()
+            self._connect()
+            self.server.send_message(message)
+        self.last_used = time.monotonic()
+
+    def close(self):
+        if self.server is not None:
+            try:
+                self.server.quit()
+            except Exception:
+                pass
+            self.server = None
+
+
+class MailQueue:
+    """Background delivery of queued emails with retries and exponential backoff"""
+
+    def __init__(self):
+        self.workers: List[threading.Thread] = []
+        self.wakeup = threading.Event()
+        self.stopping = threading.Event()
+        self.lock = threading.Lock()
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+
+    def enqueue(self, recipient: str, subject: str, html_body: str, text_body: str, kind: str) -> int:
+        """Persist a message to the outbox and wake a worker; returns the outbox id"""
+        db = SessionLocal()
+        try:
+            message = EmailOutbox(
+                recipient=recipient.lower(),
+                kind=kind,
+                subject=subject,
+                html_body=html_body,
+                text_body=text_body,
+                status=EmailStatus.PENDING,
+                next_attempt_at=datetime.utcnow()
+            )
+            db.add(message)
+            db.commit()
+            message_id = message.id
+        finally:
+            db.close()
+
+        self.wakeup.set()
+        return message_id
+
+    def delivery_status(self, recipient: str, limit: int = 5) -> List[EmailOutbox]:
+        db = SessionLocal()
+        try:
+            return db.query(EmailOutbox).filter(
+                EmailOutbox.recipient == recipient.lower()
+            ).order_by(EmailOutbox.created_at.desc()).limit(limit).all()
+        finally:
+            db.close()
+
+    def start(self):
+        if self.workers:
+            return
+        self.stopping.clear()
+        for i in range(settings.MAIL_WORKERS):
+            worker = threading.Thread(target=self._run_worker, name=f"mail-worker-{i}", daemon=True)
+            worker.start()
+            self.workers.append(worker)
+        logger.info(f"Mail queue started with {settings.MAIL_WORKERS} workers")
+
+    def stop(self, timeout: float = 5.0):
+        self.stopping.set()
+        self.wakeup.set()
+        for worker in self.workers:
+            worker.join(timeout=timeout)
+        self.workers = []
+
+    def _claim_next(self) -> Optional[int]:
+        """Atomically move one due message to SENDING; safe across processes"""
+        now = datetime.utcnow()
+        stale_claim = now - timedelta(seconds=settings.MAIL_CLAIM_TIMEOUT_SECONDS)
+        db = SessionLocal()
+        try:
+            candidates = db.query(EmailOutbox.id).filter(
+                ((EmailOutbox.status == EmailStatus.PENDING) & (EmailOutbox.next_attempt_at <= now)) |
+                ((EmailOutbox.status == EmailStatus.SENDING) & (EmailOutbox.claimed_at < stale_claim))
+            ).order_by(EmailOutbox.next_attempt_at).limit(5).all()
+
+            for (message_id,) in candidates:
+                result = db.execute(
+                    update(EmailOutbox).where(
+                        EmailOutbox.id == message_id,
+                        ((EmailOutbox.status == EmailStatus.PENDING) |
+                         ((EmailOutbox.status == EmailStatus.SENDING) & (EmailOutbox.claimed_at < stale_claim)))
+                    ).values(status=EmailStatus.SENDING, claimed_at=now)
+                )
+                db.commit()
+                if result.rowcount == 1:
+                    return message_id
+            return None
+        finally:
+            db.close()
+
+    def _build_message(self, message: EmailOutbox) -> MIMEMultipart:
+        mime = MIMEMultipart('alternative')
+        mime['Subject'] = message.subject
+        mime['From'] = f'{settings.SMTP_FROM_NAME} <{settings.SMTP_EMAIL}>'
+        mime['To'] = message.recipient
+        mime.attach(MIMEText(message.text_body, 'plain'))
+        mime.attach(MIMEText(message.html_body, 'html'))
+        return mime
+
+    def _deliver(self, connection: SMTPConnection, message_id: int):
+        db = SessionLocal()
+        try:
+            message = db.query(EmailOutbox).filter(EmailOutbox.id == message_id).first()
+            if message is None:
+                return
+            message.attempts += 1
+
+            started = time.perf_counter()
+            try:
+                connection.send(self._build_message(message))
+            except Exception as e:
+                connection.close()
+                metrics.email_latency.observe(time.perf_counter() - started, kind=message.kind)
+                message.last_error = str(e)[:1000]
+                if message.attempts >= settings.MAIL_MAX_ATTEMPTS:
+                    message.status = EmailStatus.FAILED
+                    with self.lock:
+                        self.failed += 1
+                    metrics.emails.inc(kind=message.kind, result="failed")
+                    logger.error(f"Giving up on {message.kind} email to {message.recipient}: {e}")
+                else:
+                    backoff = settings.MAIL_RETRY_BASE_SECONDS * (2 ** (message.attempts - 1))
+                    message.status = EmailStatus.PENDING
+                    message.next_attempt_at = datetime.utcnow() + timedelta(seconds=backoff)
+                    with self.lock:
+                        self.retried += 1
+                    metrics.emails.inc(kind=message.kind, result="retried")
+                    logger.warning(f"Attempt {message.attempts} for {message.kind} email to {message.recipient} failed, retrying in {backoff}s: {e}")
+            else:
+                metrics.email_latency.observe(time.perf_counter() - started, kind=message.kind)
+                metrics.emails.inc(kind=message.kind, result="sent")
+                message.status = EmailStatus.SENT
+                message.sent_at = datetime.utcnow()
+                message.last_error = None
+                with self.lock:
+                    self.sent += 1
+                logger.info(f"✅ {message.kind} email sent to {message.recipient}")
+
+            db.commit()
+        finally:
+            db.close()
+
+    def _run_worker(self):
+        connection = SMTPConnection(
+            host=settings.SMTP_HOST,
+            port=settings.SMTP_PORT,
+            username=settings.SMTP_EMAIL,
+            password=settings.SMTP_PASSWORD,
+            timeout=settings.MAIL_SMTP_TIMEOUT_SECONDS
+        )
+        try:
+            while not self.stopping.is_set():
+                try:
+                    message_id = self._claim_next()
+                except Exception as e:
+                    logger.error(f"Mail worker failed to read outbox: {e}")
+                    message_id = None
+
+                if message_id is None:
+                    # Idle: wait for an enqueue or poll for retries that became due
+                    self.wakeup.wait(timeout=settings.MAIL_POLL_SECONDS)
+                    self.wakeup.clear()
+                    continue
+
+                self._deliver(connection, message_id)
+        finally:
+            connection.close()
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "workers": len(self.workers),
+                "sent": self.sent,
+                "retried": self.retried,
+                "failed": self.failed,
+            }
+
+
+# Initialize mail queue
+mail_queue = MailQueue()
@@ -0,0 +1,256 @@
+"""
+Metrics for NTU Food App
+Request latency, in-flight and business counters rendered in the Prometheus text format
+"""
+import bisect
+import threading
+import time
+from typing import Dict, List, Sequence, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.models.order import Order
+from app.services.query_profiler import route_template
+
+LabelValues = Tuple[str, ...]
+
+# Seconds; lunch-hour p99 is the interesting tail, so resolution is finest below 1s
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+EMAIL_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self.lock = threading.Lock()
+
+    def _key(self, labels: dict) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        super().__init__(name, documentation, labels)
+        # Unlabelled series report 0 from the first scrape rather than appearing later
+        self.values: Dict[LabelValues, float] = {} if self.label_names else {(): 0}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self.lock:
+            return self.values.get(self._key(labels), 0)
+
+    def render(self) -> List[str]:
+        with self.lock:
+            items = sorted(self.values.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}" for key, value in items
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = value
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [per-bucket counts (+Inf last), sum]
+        self.series: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self) -> List[str]:
+        with self.lock:
+            items = sorted((key, (list(counts), total)) for key, (counts, total) in self.series.items())
+        lines = self.header()
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Process-local metrics, scraped from /metrics. With several workers each
+    process reports its own series; Prometheus sums them across targets.
+    """
+
+    def __init__(self):
+        self.metrics: List[Metric] = []
+
+        self.http_requests = self.counter(
+            "ntu_food_http_requests_total", "HTTP requests by route template and status", ["method", "route", "status"]
+        )
+        self.http_latency = self.histogram(
+            "ntu_food_http_request_duration_seconds", "HTTP request latency by route template", ["method", "route"]
+        )
+        self.http_in_flight = self.gauge("ntu_food_http_requests_in_flight", "HTTP requests currently being served")
+
+        self.orders_created = self.counter("ntu_food_orders_created_total", "Orders created")
+        self.order_transitions = self.counter(
+            "ntu_food_order_status_transitions_total", "Committed order status changes", ["from_status", "to_status"]
+        )
+
+        self.otp_requests = self.counter(
+            "ntu_food_otp_requests_total", "OTP email requests by outcome", ["result"]
+        )
+        self.emails = self.counter(
+            "ntu_food_email_deliveries_total", "Outbox delivery attempts by email kind and outcome", ["kind", "result"]
+        )
+        self.email_latency = self.histogram(
+            "ntu_food_email_send_duration_seconds", "SMTP send latency by email kind", ["kind"], buckets=EMAIL_BUCKETS
+        )
+
+        # Sampled when scraped
+        self.db_pool_checked_out = self.gauge("ntu_food_db_pool_checked_out", "Database connections checked out")
+        self.event_streams = self.gauge("ntu_food_event_streams_open", "Open server-sent event streams")
+
+    def counter(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labels))
+
+    def gauge(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labels))
+
+    def histogram(self, name: str, documentation: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labels, buckets))
+
+    def _register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def track_orders(self, session_factory):
+        """
+        Count order creations and status transitions from the session itself,
+        so every route that changes order.status is covered. Changes are only
+        counted once their transaction commits.
+        """
+        # active_history loads the old status even when the order was expired by a commit
+        event.listen(Order.status, "set", _keep_status_history, active_history=True)
+        event.listen(session_factory, "before_flush", self._collect_order_changes)
+        event.listen(session_factory, "after_commit", self._publish_order_changes)
+        event.listen(session_factory, "after_rollback", self._discard_order_changes)
+
+    def _collect_order_changes(self, session: Session, flush_context, instances):
+        pending = session.info.setdefault("metrics_order_changes", [])
+        for obj in session.new:
+            if isinstance(obj, Order):
+                pending.append(None)
+        for obj in session.dirty:
+            if isinstance(obj, Order):
+                history = inspect(obj).attrs.status.history
+                if history.added and history.deleted and history.added[0] != history.deleted[0]:
+                    pending.append((_status_label(history.deleted[0]), _status_label(history.added[0])))
+
+    def _publish_order_changes(self, session: Session):
+        for change in session.info.pop("metrics_order_changes", []):
+            if change is None:
+                self.orders_created.inc()
+            else:
+                self.order_transitions.inc(from_status=change[0], to_status=change[1])
+
+    def _discard_order_changes(self, session: Session):
+        session.info.pop("metrics_order_changes", None)
+
+
+def _keep_status_history(target, value, oldvalue, initiator):
+    return value
+
+
+def _status_label(status) -> str:
+    return getattr(status, "value", str(status))
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording latency per route template and in-flight requests"""
+
+    def __init__(self, app, registry: MetricsRegistry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        self.registry.http_in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.registry.http_in_flight.dec()
+            route = route_template(scope)
+            self.registry.http_latency.observe(elapsed, method=scope["method"], route=route)
+            self.registry.http_requests.inc(method=scope["method"], route=route, status=status_code)
+
+# Initialize metrics
+metrics = MetricsRegistry()
@@ -0,0 +1,218 @@
+"""
+Query Profiler for NTU Food App
+Per-request SQL statement counts and DB time, reported via Server-Timing and /internal/metrics
+"""
+import contextvars
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RequestProfile:
+    """Statements issued while serving one request"""
+
+    def __init__(self, keep_statements: bool):
+        self.count = 0
+        self.db_ms = 0.0
+        self.slowest_ms = 0.0
+        self.slowest_sql: Optional[str] = None
+        # Only kept in debug mode; a list per request is too much to pay for by default
+        self.statements: Optional[List[Tuple[float, str]]] = [] if keep_statements else None
+
+    def record(self, statement: str, elapsed_ms: float):
+        self.count += 1
+        self.db_ms += elapsed_ms
+        if elapsed_ms >= self.slowest_ms:
+            self.slowest_ms = elapsed_ms
+            self.slowest_sql = statement
+        if self.statements is not None:
+            self.statements.append((elapsed_ms, statement))
+
+
+class RouteStats:
+    def __init__(self):
+        self.requests = 0
+        self.statements = 0
+        self.max_statements = 0
+        self.db_ms = 0.0
+        self.max_db_ms = 0.0
+        self.over_budget = 0
+        self.slowest_ms = 0.0
+        self.slowest_sql: Optional[str] = None
+
+    def as_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "avg_statements": round(self.statements / self.requests, 2) if self.requests else 0.0,
+            "max_statements": self.max_statements,
+            "avg_db_ms": round(self.db_ms / self.requests, 3) if self.requests else 0.0,
+            "max_db_ms": round(self.max_db_ms, 3),
+            "over_budget": self.over_budget,
+            "slowest_statement_ms": round(self.slowest_ms, 3),
+            "slowest_statement": self.slowest_sql,
+        }
+
+
+class QueryProfiler:
+    """
+    Engine event hooks attribute each statement to the request being served
+    (tracked in a context variable, which Starlette copies into the threadpool
+    for sync dependencies). Statements outside a request, such as the mail
+    workers, are not counted.
+    """
+
+    def __init__(self, budget: int, slow_request_ms: float, debug: bool):
+        self.budget = budget
+        self.slow_request_ms = slow_request_ms
+        self.debug = debug
+        self.current: contextvars.ContextVar[Optional[RequestProfile]] = contextvars.ContextVar(
+            "query_profile", default=None
+        )
+        self.routes: Dict[str, RouteStats] = {}
+        self.lock = threading.Lock()
+
+    def instrument(self, engine: Engine):
+        event.listen(engine, "before_cursor_execute", self._before_execute)
+        event.listen(engine, "after_cursor_execute", self._after_execute)
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if self.current.get() is not None:
+            conn.info.setdefault("query_profiler_started", []).append(time.perf_counter())
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        profile = self.current.get()
+        if profile is None:
+            return
+        started = conn.info.get("query_profiler_started")
+        if not started:
+            return
+        profile.record(statement, (time.perf_counter() - started.pop()) * 1000)
+
+    def begin(self) -> Tuple[RequestProfile, contextvars.Token]:
+        profile = RequestProfile(keep_statements=self.debug)
+        return profile, self.current.set(profile)
+
+    def end(self, token: contextvars.Token):
+        self.current.reset(token)
+
+    def finish(self, route: str, method: str, profile: RequestProfile, elapsed_ms: float):
+        over_budget = self.budget > 0 and profile.count > self.budget
+        key = f"{method} {route}"
+        with self.lock:
+            stats = self.routes.get(key)
+            if stats is None:
+                stats = self.routes[key] = RouteStats()
+            stats.requests += 1
+            stats.statements += profile.count
+            stats.max_statements = max(stats.max_statements, profile.count)
+            stats.db_ms += profile.db_ms
+            stats.max_db_ms = max(stats.max_db_ms, profile.db_ms)
+            if over_budget:
+                stats.over_budget += 1
+            if profile.slowest_sql is not None and profile.slowest_ms >= stats.slowest_ms:
+                stats.slowest_ms = profile.slowest_ms
+                stats.slowest_sql = " ".join(profile.slowest_sql.split())
+
+        if over_budget:
+            logger.warning(f"{key} issued {profile.count} SQL statements (budget {self.budget})")
+        if profile.statements is not None and (over_budget or elapsed_ms >= self.slow_request_ms):
+            listing = "\n".join(
+                f"  {i}. [{ms:.2f} ms] {' '.join(sql.split())}"
+                for i, (ms, sql) in enumerate(profile.statements, 1)
+            )
+            logger.warning(
+                f"{key} took {elapsed_ms:.1f} ms with {profile.count} statements "
+                f"({profile.db_ms:.1f} ms in DB):\n{listing}"
+            )
+
+    def server_timing(self, profile: RequestProfile, elapsed_ms: float) -> str:
+        return (
+            f'db;dur={profile.db_ms:.2f};desc="{profile.count} queries", '
+            f"db-slowest;dur={profile.slowest_ms:.2f}, "
+            f"app;dur={elapsed_ms:.2f}"
+        )
+
+    def stats(self) -> dict:
+        with self.lock:
+            routes = {key: stats.as_dict() for key, stats in self.routes.items()}
+        return {
+            "budget_per_request": self.budget,
+            "debug": self.debug,
+            "slow_request_ms": self.slow_request_ms,
+            # Chattiest routes first
+            "routes": dict(sorted(routes.items(), key=lambda item: -item[1]["max_statements"])),
+        }
+
+    def reset(self):
+        with self.lock:
+            self.routes.clear()
+
+
+class QueryProfilingMiddleware:
+    """
+    Pure ASGI middleware (BaseHTTPMiddleware would buffer the SSE stream).
+    Server-Timing is added when the response starts, which for ordinary
+    handlers is after all of their queries have run.
+    """
+
+    def __init__(self, app, profiler: "QueryProfiler"):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile, token = self.profiler.begin()
+        started = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", self.profiler.server_timing(profile, elapsed_ms).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            self.profiler.end(token)
+            self.profiler.finish(route_template(scope), scope["method"], profile, (time.perf_counter() - started) * 1000)
+
+
+def route_template(scope) -> str:
+    """
+    Full path template for the matched route, e.g. /api/orders/user/{user_id}.
+    Included routers only know their own suffix, so the router prefix is
+    recovered by stripping the rendered suffix off the request path.
+    """
+    route_format = getattr(scope.get("route"), "path_format", None)
+    if not route_format:
+        # Unmatched paths share one bucket so scanners cannot grow the table
+        return "<unmatched>"
+    try:
+        rendered = route_format.format(**scope.get("path_params", {}))
+    except (KeyError, IndexError, ValueError):
+        return route_format
+    path = scope["path"]
+    if path.endswith(rendered):
+        return path[:len(path) - len(rendered)] + route_format
+    return route_format
+
+
+# Initialize query profiler
+query_profiler = QueryProfiler(
+    budget=settings.QUERY_BUDGET_PER_REQUEST,
+    slow_request_ms=settings.QUERY_PROFILE_SLOW_REQUEST_MS,
+    debug=settings.QUERY_PROFILE_DEBUG
+)
@@ -0,0 +1,162 @@
+"""
+Queue Index for NTU Food App
+In-memory per-stall ordering of live queue entries for O(log n) "orders ahead" lookups
+"""
+import bisect
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.queue import QueueEntry, QueueStatus
+
+logger = logging.getLogger(__name__)
+
+# Entries that still hold a place in the line; READY orders are only waiting for pickup
+AHEAD_STATUSES = (QueueStatus.WAITING, QueueStatus.PREPARING)
+
+Change = Tuple[int, int, bool]  # (entry_id, stall_id, holds a place)
+
+
+class QueueIndex:
+    """
+    Per stall, a sorted list of the ids of entries still in line. Entry ids
+    grow in join order, so the number of orders ahead of an entry is one
+    bisect. Joining appends at the tail and leaving removes one element
+    from a list that only ever holds the live queue, so completions need
+    no renumbering of the entries behind them.
+
+    Changes are applied from committed sessions only (see track). Each
+    process keeps its own copy; the max age bounds how long changes made
+    by other workers take to show up.
+    """
+
+    def __init__(self):
+        self.queues: Dict[int, List[int]] = {}
+        self.built_at: Optional[float] = None
+        self.dirty = True
+        self.lock = threading.Lock()
+        self.rebuild_lock = threading.Lock()
+        # Changes committed while a rebuild is reading, replayed onto its snapshot
+        self.replay: Optional[List[Change]] = None
+        self.lookups = 0
+        self.rebuilds = 0
+
+    def rebuild(self, db: Session):
+        """Reload every live queue entry from the database"""
+        with self.rebuild_lock:
+            with self.lock:
+                self.replay = []
+            try:
+                rows = db.query(QueueEntry.id, QueueEntry.stall_id).filter(
+                    QueueEntry.status.in_(AHEAD_STATUSES)
+                ).order_by(QueueEntry.id).all()
+            except Exception:
+                with self.lock:
+                    self.replay = None
+                raise
+
+            queues: Dict[int, List[int]] = {}
+            for entry_id, stall_id in rows:
+                queues.setdefault(stall_id, []).append(entry_id)
+
+            with self.lock:
+                for change in self.replay:
+                    _apply(queues, *change)
+                self.replay = None
+                self.queues = queues
+                self.built_at = time.monotonic()
+                self.dirty = False
+                self.rebuilds += 1
+
+        logger.info(f"Queue index built: {len(rows)} live entries across {len(queues)} stalls")
+
+    def invalidate(self):
+        """Mark the index stale; it is rebuilt on the next lookup"""
+        self.dirty = True
+
+    def ensure_fresh(self, db: Session):
+        stale = (
+            self.dirty or
+            self.built_at is None or
+            time.monotonic() - self.built_at > settings.QUEUE_INDEX_MAX_AGE_SECONDS
+        )
+        if stale:
+            self.rebuild(db)
+
+    def orders_ahead(self, stall_id: int, entry_id: int) -> int:
+        """Entries at the stall that joined before entry_id and are still in line"""
+        with self.lock:
+            self.lookups += 1
+            return bisect.bisect_left(self.queues.get(stall_id, ()), entry_id)
+
+    def queue_length(self, stall_id: int) -> int:
+        with self.lock:
+            return len(self.queues.get(stall_id, ()))
+
+    def apply(self, entry_id: int, stall_id: int, in_line: bool):
+        with self.lock:
+            _apply(self.queues, entry_id, stall_id, in_line)
+            if self.replay is not None:
+                self.replay.append((entry_id, stall_id, in_line))
+
+    def track(self, session_factory):
+        """
+        Keep the index in step with every session that adds, updates or
+        deletes queue entries. Changes are captured at flush, when new
+        entries have their ids, and applied only once the transaction
+        commits.
+        """
+        event.listen(session_factory, "after_flush", self._collect_changes)
+        event.listen(session_factory, "after_commit", self._publish_changes)
+        event.listen(session_factory, "after_rollback", self._discard_changes)
+
+    def _collect_changes(self, session: Session, flush_context):
+        pending = session.info.setdefault("queue_index_changes", [])
+        for obj in session.new | session.dirty:
+            if isinstance(obj, QueueEntry) and obj.id is not None:
+                pending.append((obj.id, obj.stall_id, obj.status in AHEAD_STATUSES))
+        for obj in session.deleted:
+            if isinstance(obj, QueueEntry):
+                pending.append((obj.id, obj.stall_id, False))
+
+    def _publish_changes(self, session: Session):
+        for change in session.info.pop("queue_index_changes", []):
+            self.apply(*change)
+
+    def _discard_changes(self, session: Session):
+        session.info.pop("queue_index_changes", None)
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "stalls": len(self.queues),
+                "live_entries": sum(len(entries) for entries in self.queues.values()),
+                "longest_queue": max((len(entries) for entries in self.queues.values()), default=0),
+                "lookups": self.lookups,
+                "rebuilds": self.rebuilds,
+                "age_seconds": round(time.monotonic() - self.built_at, 1) if self.built_at is not None else None,
+            }
+
+
+def _apply(queues: Dict[int, List[int]], entry_id: int, stall_id: int, in_line: bool):
+    entries = queues.get(stall_id)
+    if entries is None:
+        if in_line:
+            queues[stall_id] = [entry_id]
+        return
+    position = bisect.bisect_left(entries, entry_id)
+    present = position < len(entries) and entries[position] == entry_id
+    if in_line and not present:
+        entries.insert(position, entry_id)
+    elif not in_line and present:
+        del entries[position]
+        if not entries:
+            del queues[stall_id]
+
+# Initialize queue index
+queue_index = QueueIndex()
@@ -0,0 +1,73 @@
+"""
+Queue Number Allocator for NTU Food App
+Hands out per-stall queue numbers from a counter row, atomically and in O(1)
+"""
+import sqlite3
+from datetime import date, datetime
+from typing import Optional
+from sqlalchemy import case, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app.models.queue import QueueCounter
+
+
+class QueueNumberAllocator:
+    """Allocates daily-resetting queue numbers per stall"""
+
+    def allocate(self, db: Session, stall_id: int, today: Optional[date] = None) -> int:
+        """
+        Increment the stall's counter and return the new queue number.
+
+        The increment is a single upsert with RETURNING, so concurrent orders
+        can never observe the same number. On SQLite the upsert is the first
+        write of the transaction, which takes the database write lock exactly
+        like BEGIN IMMEDIATE and holds it until the caller commits.
+        """
+        today = today or datetime.now().date()
+        dialect = db.get_bind().dialect.name
+
+        if dialect == "postgresql":
+            return self._upsert(db, postgresql.insert(QueueCounter), stall_id, today)
+        if dialect == "sqlite" and sqlite3.sqlite_version_info >= (3, 35, 0):
+            return self._upsert(db, sqlite.insert(QueueCounter), stall_id, today)
+        return self._lock_and_increment(db, stall_id, today)
+
+    def _upsert(self, db: Session, insert_stmt, stall_id: int, today: date) -> int:
+        excluded = insert_stmt.excluded
+        stmt = insert_stmt.values(
+            stall_id=stall_id, service_date=today, last_number=1
+        ).on_conflict_do_update(
+            index_elements=[QueueCounter.stall_id],
+            set_={
+                # Restart numbering when the first order of a new day arrives
+                "last_number": _next_number(excluded.service_date),
+                "service_date": excluded.service_date,
+            }
+        ).returning(QueueCounter.last_number)
+        return db.execute(stmt).scalar_one()
+
+    def _lock_and_increment(self, db: Session, stall_id: int, today: date) -> int:
+        counter = db.execute(
+            select(QueueCounter).where(QueueCounter.stall_id == stall_id).with_for_update()
+        ).scalar_one_or_none()
+
+        if counter is None:
+            db.add(QueueCounter(stall_id=stall_id, service_date=today, last_number=1))
+            db.flush()
+            return 1
+
+        counter.last_number = 1 if counter.service_date != today else counter.last_number + 1
+        counter.service_date = today
+        db.flush()
+        return counter.last_number
+
+
+def _next_number(new_service_date):
+    return case(
+        (QueueCounter.service_date == new_service_date, QueueCounter.last_number + 1),
+        else_=1
+    )
+
+
+# Initialize queue number allocator
+queue_number_allocator = QueueNumberAllocator()
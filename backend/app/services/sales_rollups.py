@@ -0,0 +1,187 @@
+"""
+Sales Rollups for NTU Food App
+Incrementally maintained per-stall, per-item daily sales for admin analytics
+"""
+import logging
+import sqlite3
+from collections import defaultdict
+from datetime import date
+from typing import Dict, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.analytics import DailyItemSales, DailyStallSales, StallCustomer
+from app.models.order import Order, OrderItem, OrderStatus
+
+logger = logging.getLogger(__name__)
+
+
+class SalesRollups:
+    """
+    Keeps the rollup tables in step with COMPLETED orders.
+
+    Route handlers call apply_status_change() after changing an order's status
+    and before committing, so the rollup update shares the order's transaction.
+    """
+
+    def apply_status_change(self, db: Session, order: Order, previous_status: Optional[OrderStatus]):
+        """Add the order when it becomes COMPLETED, subtract it if it leaves COMPLETED"""
+        was_completed = previous_status == OrderStatus.COMPLETED
+        is_completed = order.status == OrderStatus.COMPLETED
+        if is_completed and not was_completed:
+            self._apply(db, order, sign=1)
+        elif was_completed and not is_completed:
+            self._apply(db, order, sign=-1)
+
+    def remove_order(self, db: Session, order: Order):
+        """Call before deleting an order"""
+        if order.status == OrderStatus.COMPLETED:
+            self._apply(db, order, sign=-1)
+
+    def _apply(self, db: Session, order: Order, sign: int):
+        sales_date = order.created_at.date()
+        items = db.query(
+            OrderItem.menu_item_id, OrderItem.quantity, OrderItem.unit_price
+        ).filter(OrderItem.order_id == order.id).all()
+
+        # One row per menu item even if it appears on several lines of the order
+        per_item: Dict[int, list] = defaultdict(lambda: [0, 0.0])
+        for menu_item_id, quantity, unit_price in items:
+            per_item[menu_item_id][0] += quantity
+            per_item[menu_item_id][1] += quantity * unit_price
+
+        self._increment(
+            db, DailyStallSales,
+            keys={"stall_id": order.stall_id, "sales_date": sales_date},
+            increments={
+                "completed_orders": sign,
+                "items_sold": sign * sum(quantity for quantity, _ in per_item.values()),
+                "revenue": sign * order.total_amount,
+            }
+        )
+        for menu_item_id, (quantity, revenue) in per_item.items():
+            self._increment(
+                db, DailyItemSales,
+                keys={"menu_item_id": menu_item_id, "sales_date": sales_date},
+                increments={"order_count": sign, "quantity": sign * quantity, "revenue": sign * revenue},
+                values={"stall_id": order.stall_id}
+            )
+        self._increment(
+            db, StallCustomer,
+            keys={"stall_id": order.stall_id, "user_id": order.user_id},
+            increments={"completed_orders": sign},
+            values={"first_order_at": order.created_at}
+        )
+
+    def _increment(self, db: Session, model, keys: dict, increments: dict, values: Optional[dict] = None):
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            return self._upsert(db, postgresql.insert(model), model, keys, increments, values)
+        if dialect == "sqlite" and sqlite3.sqlite_version_info >= (3, 24, 0):
+            return self._upsert(db, sqlite.insert(model), model, keys, increments, values)
+        return self._lock_and_increment(db, model, keys, increments, values)
+
+    def _upsert(self, db: Session, insert_stmt, model, keys: dict, increments: dict, values: Optional[dict]):
+        columns = model.__table__.c
+        stmt = insert_stmt.values(**keys, **increments, **(values or {})).on_conflict_do_update(
+            index_elements=list(keys),
+            set_={name: columns[name] + insert_stmt.excluded[name] for name in increments}
+        )
+        db.execute(stmt)
+
+    def _lock_and_increment(self, db: Session, model, keys: dict, increments: dict, values: Optional[dict]):
+        row = db.execute(select(model).filter_by(**keys).with_for_update()).scalar_one_or_none()
+        if row is None:
+            db.add(model(**keys, **increments, **(values or {})))
+        else:
+            for name, delta in increments.items():
+                setattr(row, name, getattr(row, name) + delta)
+        db.flush()
+
+    def rebuild(self, db: Session) -> dict:
+        """Recompute every rollup from the full order history (backfill / repair)"""
+        db.query(DailyItemSales).delete()
+        db.query(DailyStallSales).delete()
+        db.query(StallCustomer).delete()
+
+        sales_date = func.date(Order.created_at)
+        completed = Order.status == OrderStatus.COMPLETED
+
+        stall_rows = db.query(
+            Order.stall_id,
+            sales_date.label("sales_date"),
+            func.count(Order.id),
+            func.sum(Order.total_amount)
+        ).filter(completed).group_by(Order.stall_id, sales_date).all()
+
+        items_sold = {
+            (stall_id, _as_date(day)): quantity or 0
+            for stall_id, day, quantity in db.query(
+                Order.stall_id, sales_date, func.sum(OrderItem.quantity)
+            ).join(OrderItem, OrderItem.order_id == Order.id).filter(completed).group_by(Order.stall_id, sales_date)
+        }
+
+        db.bulk_insert_mappings(DailyStallSales, [
+            {
+                "stall_id": stall_id,
+                "sales_date": _as_date(day),
+                "completed_orders": orders,
+                "items_sold": items_sold.get((stall_id, _as_date(day)), 0),
+                "revenue": revenue or 0.0,
+            }
+            for stall_id, day, orders, revenue in stall_rows
+        ])
+
+        item_rows = db.query(
+            OrderItem.menu_item_id,
+            sales_date.label("sales_date"),
+            Order.stall_id,
+            func.count(func.distinct(Order.id)),
+            func.sum(OrderItem.quantity),
+            func.sum(OrderItem.quantity * OrderItem.unit_price)
+        ).join(Order, OrderItem.order_id == Order.id).filter(completed).group_by(
+            OrderItem.menu_item_id, sales_date, Order.stall_id
+        ).all()
+
+        db.bulk_insert_mappings(DailyItemSales, [
+            {
+                "menu_item_id": menu_item_id,
+                "sales_date": _as_date(day),
+                "stall_id": stall_id,
+                "order_count": orders,
+                "quantity": quantity or 0,
+                "revenue": revenue or 0.0,
+            }
+            for menu_item_id, day, stall_id, orders, quantity, revenue in item_rows
+        ])
+
+        customer_rows = db.query(
+            Order.stall_id, Order.user_id, func.count(Order.id), func.min(Order.created_at)
+        ).filter(completed).group_by(Order.stall_id, Order.user_id).all()
+
+        db.bulk_insert_mappings(StallCustomer, [
+            {"stall_id": stall_id, "user_id": user_id, "completed_orders": orders, "first_order_at": first_order_at}
+            for stall_id, user_id, orders, first_order_at in customer_rows
+        ])
+
+        db.commit()
+        summary = {
+            "stall_days": len(stall_rows),
+            "item_days": len(item_rows),
+            "stall_customers": len(customer_rows),
+        }
+        logger.info(f"Sales rollups rebuilt: {summary}")
+        return summary
+
+
+def _as_date(value) -> date:
+    # func.date() returns a string on SQLite and a date on PostgreSQL
+    if isinstance(value, str):
+        return date.fromisoformat(value)
+    return value
+
+
+# Initialize sales rollups
+sales_rollups = SalesRollups()
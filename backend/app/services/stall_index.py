@@ -0,0 +1,187 @@
+"""
+Stall Spatial Index for NTU Food App
+In-memory grid over stall coordinates for radius and k-nearest lookups
+"""
+import logging
+import math
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.stall import Stall
+from app.utils.distance import calculate_distances, np
+
+logger = logging.getLogger(__name__)
+
+KM_PER_DEGREE = 111.32
+# Beyond this many rings (about 11 km at the default cell size) one vectorized pass over every stall is cheaper
+MAX_SCAN_RINGS = 20
+
+
+class StallSpatialIndex:
+    """
+    Uniform lat/lon grid over contiguous coordinate arrays.
+    Each cell holds positions into ids/lats/lons so candidate distances
+    can be computed in one batch call.
+    """
+
+    def __init__(self, cell_size_deg: float = 0.005):
+        self.cell_size_deg = cell_size_deg
+        self.cells: Dict[Tuple[int, int], List[int]] = {}
+        self.ids: List[int] = []
+        self.lats = []
+        self.lons = []
+        self.unlocated_ids: List[int] = []
+        self.bounds: Optional[Tuple[int, int, int, int]] = None
+        self.built_at: Optional[float] = None
+        self.dirty = True
+        self.lock = threading.Lock()
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return math.floor(lat / self.cell_size_deg), math.floor(lon / self.cell_size_deg)
+
+    def rebuild(self, db: Session):
+        """Reload coordinates for every stall from the database"""
+        rows = db.query(Stall.id, Stall.latitude, Stall.longitude).order_by(Stall.id).all()
+        self.load(rows)
+
+    def load(self, rows: List[Tuple[int, Optional[float], Optional[float]]]):
+        """Replace the index contents with (stall_id, latitude, longitude) rows"""
+        cells: Dict[Tuple[int, int], List[int]] = {}
+        ids, lats, lons = [], [], []
+        unlocated_ids = []
+        for stall_id, lat, lon in rows:
+            if lat is None or lon is None:
+                unlocated_ids.append(stall_id)
+                continue
+            cells.setdefault(self._cell(lat, lon), []).append(len(ids))
+            ids.append(stall_id)
+            lats.append(lat)
+            lons.append(lon)
+
+        if np is not None:
+            lats = np.asarray(lats, dtype=np.float64)
+            lons = np.asarray(lons, dtype=np.float64)
+
+        bounds = None
+        if cells:
+            rows_idx = [cell[0] for cell in cells]
+            cols_idx = [cell[1] for cell in cells]
+            bounds = (min(rows_idx), max(rows_idx), min(cols_idx), max(cols_idx))
+
+        with self.lock:
+            self.cells = cells
+            self.ids = ids
+            self.lats = lats
+            self.lons = lons
+            self.unlocated_ids = unlocated_ids
+            self.bounds = bounds
+            self.built_at = time.monotonic()
+            self.dirty = False
+
+        logger.info(f"Stall spatial index built: {len(rows)} stalls in {len(cells)} cells")
+
+    def invalidate(self):
+        """Mark the index stale; it is rebuilt on the next query"""
+        self.dirty = True
+
+    def ensure_fresh(self, db: Session):
+        stale = (
+            self.dirty or
+            self.built_at is None or
+            time.monotonic() - self.built_at > settings.STALL_INDEX_MAX_AGE_SECONDS
+        )
+        if stale:
+            self.rebuild(db)
+
+    def _ring(self, center: Tuple[int, int], radius: int):
+        row, col = center
+        if radius == 0:
+            yield center
+            return
+        for d in range(-radius, radius + 1):
+            yield row - radius, col + d
+            yield row + radius, col + d
+        for d in range(-radius + 1, radius):
+            yield row + d, col - radius
+            yield row + d, col + radius
+
+    def nearest(
+        self,
+        lat: float,
+        lon: float,
+        k: Optional[int] = None,
+        radius_km: Optional[float] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        Return (stall_id, distance_km) pairs sorted by distance.
+
+        Cells are scanned in rings around the query point, stopping once the
+        next ring cannot hold anything closer than the k-th result found so
+        far, lies entirely outside radius_km, or every stall has been seen.
+        Query points far from all stalls fall back to a single pass over the
+        coordinate arrays instead of walking MAX_SCAN_RINGS or more rings.
+        """
+        with self.lock:
+            cells = self.cells
+            ids, lats, lons = self.ids, self.lats, self.lons
+            bounds = self.bounds
+        if not cells:
+            return []
+
+        center = self._cell(lat, lon)
+        # Smallest on-the-ground width of a cell, so ring bounds stay conservative
+        cell_km = self.cell_size_deg * KM_PER_DEGREE * max(math.cos(math.radians(abs(lat) + self.cell_size_deg)), 0.01)
+        max_ring = max(
+            abs(center[0] - bounds[0]), abs(center[0] - bounds[1]),
+            abs(center[1] - bounds[2]), abs(center[1] - bounds[3])
+        )
+
+        found: List[Tuple[float, int]] = []
+        scanned = 0
+        for ring in range(min(max_ring, MAX_SCAN_RINGS) + 1):
+            # Anything in this ring or beyond is at least (ring - 1) cells away
+            ring_min_km = max(ring - 1, 0) * cell_km
+            if radius_km is not None and ring_min_km > radius_km:
+                break
+            if k is not None and len(found) >= k:
+                found.sort()
+                if found[k - 1][0] <= ring_min_km:
+                    break
+
+            positions = [pos for cell in self._ring(center, ring) for pos in cells.get(cell, ())]
+            if not positions:
+                continue
+            found += self._within(lat, lon, positions, ids, lats, lons, radius_km)
+            scanned += len(positions)
+            if scanned == len(ids):
+                break
+        else:
+            if max_ring > MAX_SCAN_RINGS:
+                found = self._within(lat, lon, range(len(ids)), ids, lats, lons, radius_km)
+
+        found.sort()
+        if k is not None:
+            found = found[:k]
+        return [(stall_id, distance) for distance, stall_id in found]
+
+    @staticmethod
+    def _within(lat, lon, positions, ids, lats, lons, radius_km) -> List[Tuple[float, int]]:
+        """(distance_km, stall_id) for the stalls at positions, limited to radius_km"""
+        positions = list(positions)
+        if np is not None:
+            distances = calculate_distances(lat, lon, lats[positions], lons[positions])
+        else:
+            distances = calculate_distances(lat, lon, [lats[p] for p in positions], [lons[p] for p in positions])
+        return [
+            (float(distance), ids[pos])
+            for pos, distance in zip(positions, distances)
+            if radius_km is None or float(distance) <= radius_km
+        ]
+
+
+# Initialize stall spatial index
+stall_index = StallSpatialIndex()
@@ -0,0 +1,101 @@
+"""
+Authenticated User Cache for NTU Food App
+TTL + LRU cache of users keyed by JWT subject (student_id)
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from app.config import settings
+from app.models.user import User
+
+
+class UserPrincipalCache:
+    """Caches detached User rows so authenticated requests skip the users lookup"""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.entries: "OrderedDict[str, Tuple[float, User]]" = OrderedDict()
+        self.subjects_by_id: Dict[int, str] = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, subject: str) -> Optional[User]:
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(subject)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, user = entry
+            if expires_at <= now:
+                self._remove(subject)
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end(subject)
+            self.hits += 1
+            return user
+
+    def set(self, subject: str, user: User):
+        if self.max_size <= 0 or self.ttl_seconds <= 0:
+            return
+        with self.lock:
+            self.entries[subject] = (time.monotonic() + self.ttl_seconds, user)
+            self.entries.move_to_end(subject)
+            self.subjects_by_id[user.id] = subject
+            while len(self.entries) > self.max_size:
+                oldest = next(iter(self.entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, user_id: Optional[int] = None, subject: Optional[str] = None):
+        """Drop a cached user after a write to their role, status or account"""
+        with self.lock:
+            if subject is None and user_id is not None:
+                subject = self.subjects_by_id.get(user_id)
+            if subject is not None and subject in self.entries:
+                self._remove(subject)
+                self.invalidations += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.subjects_by_id.clear()
+
+    def _remove(self, subject: str):
+        entry = self.entries.pop(subject, None)
+        if entry is not None:
+            user_id = entry[1].id
+            if self.subjects_by_id.get(user_id) == subject:
+                del self.subjects_by_id[user_id]
+
+    def stats(self) -> dict:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self.entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "expirations": self.expirations,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+# Initialize user principal cache
+user_cache = UserPrincipalCache(
+    max_size=settings.AUTH_CACHE_MAX_SIZE,
+    ttl_seconds=settings.AUTH_CACHE_TTL_SECONDS
+)
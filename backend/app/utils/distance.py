@@ -4,7 +4,14 @@ for calculating distances between geographical coordinates
 """
 
 import math
-from typing import Optional
+from typing import List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; batch functions fall back to pure Python
+    np = None
+
+EARTH_RADIUS_KM = 6371.0
 
 def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     """
@@ -25,7 +32,7 @@ def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> fl
         0.545  # ~0.5 km
     """
     # Radius of Earth in kilometers
-    R = 6371.0
+    R = EARTH_RADIUS_KM
 
     # Convert decimal degrees to radians
     lat1_rad = math.radians(lat1)
@@ -105,6 +112,80 @@ def get_distance_and_time(
     return distance, walking_time
 
 
+def calculate_distances(
+    user_lat: float,
+    user_lon: float,
+    lats: Sequence[float],
+    lons: Sequence[float],
+    use_numpy: Optional[bool] = None
+):
+    """
+    Calculate distances from one point to many points in a single pass
+
+    Args:
+        user_lat: User's latitude (decimal degrees)
+        user_lon: User's longitude (decimal degrees)
+        lats: Contiguous array/sequence of latitudes
+        lons: Contiguous array/sequence of longitudes (same length as lats)
+        use_numpy: Force (True) or skip (False) NumPy; defaults to NumPy when installed
+
+    Returns:
+        Distances in kilometers, rounded like calculate_distance
+        (a NumPy array when NumPy is used, otherwise a list)
+
+    Example:
+        >>> calculate_distances(1.3470, 103.6802, [1.3424, 1.3470], [103.6824, 103.6802])
+        array([0.57, 0.  ])
+    """
+    if use_numpy is None:
+        use_numpy = np is not None
+
+    if not use_numpy:
+        return [calculate_distance(user_lat, user_lon, lat, lon) for lat, lon in zip(lats, lons)]
+
+    lat1 = math.radians(user_lat)
+    lat2 = np.radians(np.asarray(lats, dtype=np.float64))
+    dlat = lat2 - lat1
+    dlon = np.radians(np.asarray(lons, dtype=np.float64)) - math.radians(user_lon)
+
+    a = np.sin(dlat / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    distances = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+    return np.round(distances, 2)
+
+
+def calculate_walking_times(distances_km, walking_speed_kmh: float = 5.0):
+    """
+    Vectorized calculate_walking_time for the output of calculate_distances
+
+    Returns:
+        Walking times in whole minutes (NumPy int array or list)
+    """
+    if np is None:
+        return [calculate_walking_time(d, walking_speed_kmh) for d in distances_km]
+
+    distances_km = np.asarray(distances_km, dtype=np.float64)
+    minutes = np.maximum(1, np.ceil(distances_km / walking_speed_kmh * 60)).astype(np.int64)
+    return np.where(distances_km <= 0, 0, minutes)
+
+
+def get_distances_and_times(
+    user_lat: float,
+    user_lon: float,
+    lats: Sequence[float],
+    lons: Sequence[float]
+) -> List[Tuple[float, int]]:
+    """
+    Batch version of get_distance_and_time for stalls that all have coordinates
+
+    Returns:
+        List of (distance_km, walking_time_minutes) as plain Python numbers
+    """
+    distances = calculate_distances(user_lat, user_lon, lats, lons)
+    times = calculate_walking_times(distances)
+    return [(float(d), int(t)) for d, t in zip(distances, times)]
+
+
 def format_distance(distance_km: Optional[float]) -> str:
     """
     Format distance for display
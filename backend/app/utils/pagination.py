@@ -0,0 +1,89 @@
+import base64
+import json
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException, Response
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Query
+
+from app.config import settings
+
+# List bodies stay plain JSON arrays; cursors travel in these headers
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+CHANGES_CURSOR_HEADER = "X-Changes-Cursor"
+
+def encode_cursor(timestamp: datetime, row_id: int) -> str:
+    """Opaque token for the position just after (timestamp, id)"""
+    payload = json.dumps({"c": timestamp.isoformat(), "i": row_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(payload["c"]), int(payload["i"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def paginate_newest_first(query: Query, model, cursor: Optional[str], limit: int) -> Tuple[List, Optional[str]]:
+    """
+    Keyset pagination over (created_at, id), newest first.
+    Each page seeks straight to the cursor position, so page cost does not
+    grow with how deep the client has paged.
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        query = query.filter(or_(
+            model.created_at < created_at,
+            and_(model.created_at == created_at, model.id < row_id)
+        ))
+
+    rows = query.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(last.created_at, last.id)
+
+def changes_since(query: Query, model, since: str, limit: int) -> Tuple[List, str]:
+    """
+    Rows whose (updated_at, id) moved past the cursor, oldest change first.
+    Returns (rows, cursor); the cursor is unchanged when nothing moved.
+
+    updated_at is stamped at flush, not commit, so a row can become visible
+    with a timestamp behind a cursor already handed out. Cursors therefore
+    never advance into the last CHANGES_FEED_SETTLE_SECONDS: rows in that
+    window are returned again on later polls and clients de-duplicate by id.
+    """
+    cursor = decode_cursor(since)
+    updated_at, row_id = cursor
+    rows = query.filter(or_(
+        model.updated_at > updated_at,
+        and_(model.updated_at == updated_at, model.id > row_id)
+    )).order_by(model.updated_at.asc(), model.id.asc()).limit(limit).all()
+
+    if not rows:
+        return rows, since
+    last = rows[-1]
+    settled = min((last.updated_at, last.id), _settle_cutoff())
+    return rows, encode_cursor(*max(settled, cursor))
+
+def latest_change_cursor(query: Query, model) -> Optional[str]:
+    """Cursor at the most recent settled (updated_at, id) matched by query, for starting a changes feed"""
+    latest = query.with_entities(model.updated_at, model.id).order_by(
+        model.updated_at.desc(), model.id.desc()
+    ).first()
+    if latest is None or latest.updated_at is None:
+        return None
+    return encode_cursor(*min((latest.updated_at, latest.id), _settle_cutoff()))
+
+def _settle_cutoff() -> Tuple[datetime, int]:
+    # Position before every row stamped within the settle window
+    return datetime.utcnow() - timedelta(seconds=settings.CHANGES_FEED_SETTLE_SECONDS), 0
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]):
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
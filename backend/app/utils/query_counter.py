@@ -0,0 +1,59 @@
+import threading
+from contextlib import contextmanager
+from typing import List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.database.database import engine as default_engine
+
+class QueryCounter:
+    """
+    Records every SQL statement the engine executes while active.
+    Opt-in: nothing is hooked until the counter is entered, so production
+    code pays nothing for it.
+
+        with QueryCounter() as counter:
+            client.get("/api/admin/analytics/recent-activity", headers=admin)
+        assert counter.count <= 2
+    """
+
+    def __init__(self, bind: Optional[Engine] = None):
+        self.engine = bind or default_engine
+        self.statements: List[str] = []
+        self.lock = threading.Lock()
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        with self.lock:
+            self.statements.append(statement)
+
+    def __enter__(self) -> "QueryCounter":
+        event.listen(self.engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc_info):
+        event.remove(self.engine, "before_cursor_execute", self._record)
+        return False
+
+    def report(self) -> str:
+        return "\n".join(f"  {i}. {' '.join(sql.split())}" for i, sql in enumerate(self.statements, 1))
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+@contextmanager
+def query_budget(max_queries: int, bind: Optional[Engine] = None):
+    """
+    Fail with QueryBudgetExceeded if the block runs more than max_queries statements.
+    The message lists every statement, which makes N+1 loops obvious.
+    """
+    with QueryCounter(bind) as counter:
+        yield counter
+    if counter.count > max_queries:
+        raise QueryBudgetExceeded(
+            f"{counter.count} queries executed, budget is {max_queries}:\n{counter.report()}"
+        )
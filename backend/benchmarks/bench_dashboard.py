@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Benchmark: admin dashboard stats, eight separate aggregates vs conditional aggregation
+
+Seeds a throwaway SQLite database (1M orders by default) and reports the
+query count and latency of each implementation.
+
+Usage:
+    python benchmarks/bench_dashboard.py
+    python benchmarks/bench_dashboard.py --orders 100000 --repeat 3
+    python benchmarks/bench_dashboard.py --database-url postgresql://...   # existing seeded DB, no seeding
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+parser = argparse.ArgumentParser(description="Benchmark admin dashboard aggregation")
+parser.add_argument("--orders", type=int, default=1_000_000)
+parser.add_argument("--repeat", type=int, default=5)
+parser.add_argument("--database-url", help="Benchmark an existing database instead of seeding SQLite")
+args = parser.parse_args()
+
+if args.database_url:
+    os.environ["DATABASE_URL"] = args.database_url
+else:
+    DB_PATH = os.path.join(tempfile.mkdtemp(), "bench_dashboard.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import event, func, and_
+
+from app.database.database import Base, engine, SessionLocal
+from app.models import user, stall, menu, order, queue, otp, email, analytics  # noqa: F401
+from app.models.order import Order, OrderStatus
+from app.models.stall import Stall
+from app.models.user import User
+from app.services.dashboard_stats import ACTIVE_STATUSES, dashboard_stats
+
+STATUSES = [status.value for status in OrderStatus]
+
+
+def seed(n_orders: int, n_users: int = 5000, n_stalls: int = 40, seed: int = 42):
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        cursor.executemany(
+            "INSERT INTO users (id, ntu_email, student_id, name, phone, hashed_password, role, is_active) "
+            "VALUES (?, ?, ?, ?, '91234567', 'x', 'student', ?)",
+            [(i, f"u{i}@e.ntu.edu.sg", f"U{i:09d}", f"User {i}", i % 10 != 0) for i in range(1, n_users + 1)]
+        )
+        cursor.executemany(
+            "INSERT INTO stalls (id, name, location, is_open) VALUES (?, ?, 'North Spine', 1)",
+            [(i, f"Stall {i}") for i in range(1, n_stalls + 1)]
+        )
+
+        batch = []
+        for i in range(1, n_orders + 1):
+            created_at = (now - timedelta(minutes=rng.randrange(0, 60 * 24 * 365))).strftime("%Y-%m-%d %H:%M:%S.%f")
+            batch.append((
+                i, rng.randint(1, n_users), rng.randint(1, n_stalls), round(rng.uniform(3, 25), 2),
+                rng.choice(STATUSES), f"ORD{i:07d}", created_at, created_at
+            ))
+            if len(batch) == 50_000:
+                cursor.executemany(
+                    "INSERT INTO orders (id, user_id, stall_id, total_amount, status, order_number, created_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", batch
+                )
+                batch = []
+        if batch:
+            cursor.executemany(
+                "INSERT INTO orders (id, user_id, stall_id, total_amount, status, order_number, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", batch
+            )
+        raw.commit()
+        cursor.execute("ANALYZE")
+    finally:
+        raw.close()
+
+
+def legacy_dashboard(db):
+    """The previous implementation: one aggregate query per figure"""
+    total_users = db.query(func.count(User.id)).scalar()
+    total_stalls = db.query(func.count(Stall.id)).scalar()
+    total_orders = db.query(func.count(Order.id)).scalar()
+    active_orders = db.query(func.count(Order.id)).filter(Order.status.in_(ACTIVE_STATUSES)).scalar()
+    total_revenue = db.query(func.sum(Order.total_amount)).filter(
+        Order.status == OrderStatus.COMPLETED
+    ).scalar() or 0.0
+    today = datetime.utcnow().date()
+    today_orders = db.query(func.count(Order.id)).filter(func.date(Order.created_at) == today).scalar()
+    today_revenue = db.query(func.sum(Order.total_amount)).filter(
+        and_(func.date(Order.created_at) == today, Order.status == OrderStatus.COMPLETED)
+    ).scalar() or 0.0
+    active_users = db.query(func.count(User.id)).filter(User.is_active == True).scalar()
+    return {
+        "total_users": total_users,
+        "active_users": active_users,
+        "total_stalls": total_stalls,
+        "total_orders": total_orders,
+        "active_orders": active_orders,
+        "total_revenue": float(total_revenue),
+        "today_orders": today_orders,
+        "today_revenue": float(today_revenue),
+    }
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._count)
+
+    def _count(self, *args):
+        self.count += 1
+
+
+def measure(label: str, fn, counter: QueryCounter, repeat: int):
+    db = SessionLocal()
+    try:
+        result = fn(db)
+        counter.count = 0
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            fn(db)
+            timings.append((time.perf_counter() - started) * 1000)
+        queries = counter.count // repeat
+    finally:
+        db.close()
+    print(f"{label:<28}  {queries:>7}  {min(timings):>10.1f}  {sorted(timings)[len(timings) // 2]:>10.1f}")
+    return result
+
+
+def main():
+    if not args.database_url:
+        started = time.perf_counter()
+        seed(args.orders)
+        print(f"Seeded {args.orders:,} orders in {time.perf_counter() - started:.1f}s ({engine.dialect.name})\n")
+
+    counter = QueryCounter()
+    print(f"{'implementation':<28}  {'queries':>7}  {'min ms':>10}  {'median ms':>10}")
+    before = measure("separate aggregates", legacy_dashboard, counter, args.repeat)
+    after = measure("conditional aggregation", dashboard_stats.compute, counter, args.repeat)
+    measure("conditional + TTL cache", dashboard_stats.get, counter, args.repeat)
+
+    # Both implementations must agree (revenue up to float summation order)
+    for key in before:
+        assert abs(before[key] - after[key]) < 0.01 * max(1, abs(before[key])), (key, before[key], after[key])
+    print("\n✅ Results match")
+
+
+if __name__ == "__main__":
+    main()
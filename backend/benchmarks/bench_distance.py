@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: scalar vs batch haversine for /api/stalls/nearby
+
+Usage:
+    python benchmarks/bench_distance.py
+    python benchmarks/bench_distance.py --sizes 100 1000 10000 --repeat 20
+"""
+
+import argparse
+import os
+import random
+import sys
+import timeit
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.utils.distance import get_distance_and_time, get_distances_and_times, calculate_distances, np
+
+USER_LAT, USER_LON = 1.3483, 103.6831  # NTU campus centre
+
+
+def make_stalls(n: int, seed: int = 42):
+    rng = random.Random(seed)
+    lats = [1.335 + rng.random() * 0.03 for _ in range(n)]
+    lons = [103.67 + rng.random() * 0.03 for _ in range(n)]
+    return lats, lons
+
+
+def scalar(lats, lons):
+    return [get_distance_and_time(USER_LAT, USER_LON, lat, lon) for lat, lon in zip(lats, lons)]
+
+
+def batch_python(lats, lons):
+    return calculate_distances(USER_LAT, USER_LON, lats, lons, use_numpy=False)
+
+
+def batch_numpy(lats, lons):
+    return get_distances_and_times(USER_LAT, USER_LON, lats, lons)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark scalar vs vectorized haversine")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    if np is None:
+        print("⚠️  NumPy not installed; only the pure-Python paths will be timed")
+
+    print(f"{'stalls':>8}  {'scalar ms':>10}  {'py batch ms':>12}  {'numpy ms':>10}  {'speedup':>8}")
+    for n in args.sizes:
+        lats, lons = make_stalls(n)
+        if np is not None:
+            lat_arr, lon_arr = np.asarray(lats), np.asarray(lons)
+            # Batch results must match the scalar path exactly
+            assert [d for d, _ in scalar(lats, lons)] == [d for d, _ in batch_numpy(lat_arr, lon_arr)]
+
+        scalar_ms = min(timeit.repeat(lambda: scalar(lats, lons), number=1, repeat=args.repeat)) * 1000
+        python_ms = min(timeit.repeat(lambda: batch_python(lats, lons), number=1, repeat=args.repeat)) * 1000
+        if np is not None:
+            numpy_ms = min(timeit.repeat(lambda: batch_numpy(lat_arr, lon_arr), number=1, repeat=args.repeat)) * 1000
+            print(f"{n:>8}  {scalar_ms:>10.3f}  {python_ms:>12.3f}  {numpy_ms:>10.3f}  {scalar_ms / numpy_ms:>7.1f}x")
+        else:
+            print(f"{n:>8}  {scalar_ms:>10.3f}  {python_ms:>12.3f}  {'n/a':>10}  {'n/a':>8}")
+
+
+if __name__ == "__main__":
+    main()
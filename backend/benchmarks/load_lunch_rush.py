@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Load test: a campus lunch rush against the ASGI app in-process
+
+Students arrive over the ramp, browse /api/stalls/nearby and a menu, place an
+order and then poll order tracking and queue position until it is collected.
+Stall owners poll their dashboard with ?since= and advance orders through
+confirm-payment -> start-preparing -> mark-ready -> mark-completed.
+
+Reports p50/p95/p99 and throughput per route and compares p95 against a
+saved baseline (benchmarks/baselines/lunch_rush.json). Baselines are
+machine-specific: record one on the machine you compare on.
+
+The default profile stays below saturation so its p95s are stable enough to
+compare. Client and app share one process, so a full-size rush mostly
+measures queueing; use it to find the throughput ceiling, not for --check.
+
+Usage:
+    python benchmarks/load_lunch_rush.py
+    python benchmarks/load_lunch_rush.py --students 3000 --stalls 40 --duration 300
+    python benchmarks/load_lunch_rush.py --save-baseline
+    python benchmarks/load_lunch_rush.py --check            # exit 1 if any route's p95 regressed
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+parser = argparse.ArgumentParser(description="Simulate a campus lunch rush in-process")
+parser.add_argument("--students", type=int, default=200)
+parser.add_argument("--stalls", type=int, default=20)
+parser.add_argument("--duration", type=float, default=60, help="Seconds of simulated rush")
+parser.add_argument("--ramp", type=float, default=None, help="Seconds over which students arrive (default: half the duration)")
+parser.add_argument("--poll-interval", type=float, default=5.0, help="Seconds between tracking/dashboard polls")
+parser.add_argument("--prep-seconds", type=float, default=3.0, help="Seconds an owner leaves an order in each status")
+parser.add_argument("--seed", type=int, default=42)
+parser.add_argument("--baseline", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "lunch_rush.json"))
+parser.add_argument("--save-baseline", action="store_true", help="Overwrite the baseline with this run")
+parser.add_argument("--check", action="store_true", help="Exit non-zero when p95 regresses past --tolerance")
+parser.add_argument("--tolerance", type=float, default=0.5, help="Allowed p95 growth over baseline (0.5 = 50%%)")
+parser.add_argument("--min-delta-ms", type=float, default=20, help="Ignore p95 growth smaller than this")
+args = parser.parse_args()
+
+# Fresh database; testing mode keeps OTP/welcome emails out of the picture
+DB_PATH = os.path.join(tempfile.mkdtemp(), "lunch_rush.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ["EMAIL_TESTING_MODE"] = "true"
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import httpx
+
+from app.database.database import Base, engine, SessionLocal
+from app.main import app
+from app.models import user, stall, menu, order, queue, otp, email, analytics  # noqa: F401
+from app.models.menu import MenuItem
+from app.models.stall import Stall
+from app.models.user import User, UserRole
+from app.routes.auth import create_access_token
+
+CAMPUS_LAT, CAMPUS_LNG = 1.3483, 103.6831  # NTU campus centre
+# Owner actions in order; each moves the order to the next status
+NEXT_ACTION = {
+    "pending_payment": ("confirm-payment", {"payment_confirmed": True}),
+    "confirmed": ("start-preparing", None),
+    "preparing": ("mark-ready", None),
+    "ready": ("mark-completed", None),
+}
+
+
+def seed(rng: random.Random):
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        owners = [
+            User(ntu_email=f"owner{i}@e.ntu.edu.sg", student_id=f"S{i:09d}", name=f"Owner {i}",
+                 phone="91234567", hashed_password="x", role=UserRole.STALL_OWNER)
+            for i in range(args.stalls)
+        ]
+        students = [
+            User(ntu_email=f"student{i}@e.ntu.edu.sg", student_id=f"U{i:09d}", name=f"Student {i}",
+                 phone="91234567", hashed_password="x", role=UserRole.STUDENT)
+            for i in range(args.students)
+        ]
+        db.add_all(owners + students)
+        db.flush()
+
+        stalls = []
+        for i, owner in enumerate(owners):
+            stall_row = Stall(
+                name=f"Stall {i}", location="North Spine", owner_id=owner.id, avg_prep_time=10,
+                latitude=1.335 + rng.random() * 0.03, longitude=103.67 + rng.random() * 0.03
+            )
+            db.add(stall_row)
+            stalls.append(stall_row)
+        db.flush()
+
+        menus = {}
+        for stall_row in stalls:
+            items = [
+                MenuItem(stall_id=stall_row.id, name=f"Dish {j}", price=round(rng.uniform(3, 8), 2), prep_time=5)
+                for j in range(8)
+            ]
+            db.add_all(items)
+            db.flush()
+            menus[stall_row.id] = [item.id for item in items]
+        db.commit()
+
+        return (
+            [(stall_row.id, owner.student_id) for stall_row, owner in zip(stalls, owners)],
+            [student.student_id for student in students],
+            menus,
+        )
+    finally:
+        db.close()
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    async def call(self, client: httpx.AsyncClient, route: str, method: str, url: str, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except Exception:
+            self.errors[route] += 1
+            return None
+        self.latencies[route].append((time.perf_counter() - started) * 1000)
+        if response.status_code >= 400:
+            self.errors[route] += 1
+        return response
+
+
+def auth(subject: str) -> dict:
+    return {"Authorization": "Bearer " + create_access_token({"sub": subject})}
+
+
+async def student(client, recorder: Recorder, rng: random.Random, subject: str, menus: dict, arrive_at: float, deadline: float):
+    await asyncio.sleep(max(0.0, arrive_at - time.monotonic()))
+    headers = auth(subject)
+    lat = CAMPUS_LAT + rng.uniform(-0.005, 0.005)
+    lng = CAMPUS_LNG + rng.uniform(-0.005, 0.005)
+
+    nearby = await recorder.call(client, "GET /api/stalls/nearby", "GET", "/api/stalls/nearby",
+                                 params={"lat": lat, "lng": lng, "limit": 20})
+    if nearby is None or nearby.status_code != 200 or not nearby.json():
+        return
+    # Most students pick one of the closest few stalls
+    stall_id = rng.choice(nearby.json()[:5])["id"]
+    await recorder.call(client, "GET /api/menu/stall/{stall_id}", "GET", f"/api/menu/stall/{stall_id}")
+
+    pickup = datetime.now() + timedelta(minutes=rng.randint(15, 45))
+    body = {
+        "stall_id": stall_id,
+        "items": [{"menu_item_id": item_id, "quantity": rng.randint(1, 2)}
+                  for item_id in rng.sample(menus[stall_id], rng.randint(1, 3))],
+        "pickup_window_start": pickup.isoformat(),
+        "pickup_window_end": (pickup + timedelta(minutes=10)).isoformat(),
+    }
+    created = await recorder.call(client, "POST /api/orders/", "POST", "/api/orders/", json=body, headers=headers)
+    if created is None or created.status_code != 200:
+        return
+    order_id = created.json()["id"]
+
+    while time.monotonic() < deadline:
+        await asyncio.sleep(args.poll_interval * rng.uniform(0.8, 1.2))
+        tracked = await recorder.call(client, "GET /api/orders/{order_id}", "GET", f"/api/orders/{order_id}", headers=headers)
+        await recorder.call(client, "GET /api/queue/position/{order_id}", "GET", f"/api/queue/position/{order_id}", headers=headers)
+        if tracked is not None and tracked.status_code == 200 and tracked.json()["status"] in ("completed", "cancelled"):
+            return
+
+
+async def owner(client, recorder: Recorder, rng: random.Random, stall_id: int, subject: str, deadline: float):
+    headers = auth(subject)
+    orders = {}  # order_id -> [status, changed_at]
+    since = None
+    while time.monotonic() < deadline:
+        params = {"since": since} if since else {}
+        response = await recorder.call(client, "GET /api/orders/stall/{stall_id}/orders", "GET",
+                                       f"/api/orders/stall/{stall_id}/orders", params=params, headers=headers)
+        if response is not None and response.status_code in (200, 304):
+            since = response.headers.get("X-Changes-Cursor", since)
+            if response.status_code == 200:
+                now = time.monotonic()
+                for row in response.json():
+                    orders[row["id"]] = [row["status"], now]
+
+        now = time.monotonic()
+        due = [
+            order_id for order_id, (status, changed_at) in orders.items()
+            if status in NEXT_ACTION and now - changed_at >= args.prep_seconds
+        ]
+        # Several staff work the counter at once
+        results = await asyncio.gather(*(
+            recorder.call(client, f"PUT /api/orders/{{order_id}}/{NEXT_ACTION[orders[order_id][0]][0]}", "PUT",
+                          f"/api/orders/{order_id}/{NEXT_ACTION[orders[order_id][0]][0]}",
+                          json=NEXT_ACTION[orders[order_id][0]][1], headers=headers)
+            for order_id in due
+        ))
+        for order_id, result in zip(due, results):
+            if result is not None and result.status_code == 200:
+                orders[order_id] = [result.json()["status"], time.monotonic()]
+
+        await asyncio.sleep(args.poll_interval * rng.uniform(0.8, 1.2))
+
+
+def percentile(sorted_values, fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarise(recorder: Recorder, elapsed: float) -> dict:
+    summary = {}
+    for route in sorted(set(recorder.latencies) | set(recorder.errors)):
+        values = sorted(recorder.latencies[route])
+        summary[route] = {
+            "requests": len(values),
+            "errors": recorder.errors[route],
+            "rps": round(len(values) / elapsed, 2),
+            "p50_ms": round(percentile(values, 0.50), 2),
+            "p95_ms": round(percentile(values, 0.95), 2),
+            "p99_ms": round(percentile(values, 0.99), 2),
+        }
+    return summary
+
+
+def compare(summary: dict, baseline: dict) -> list:
+    regressions = []
+    print(f"\nAgainst baseline ({args.baseline}):")
+    for route, stats in summary.items():
+        before = baseline.get("routes", {}).get(route)
+        if not before or not before["p95_ms"]:
+            continue
+        change = (stats["p95_ms"] - before["p95_ms"]) / before["p95_ms"]
+        # Run-to-run p95 wobble is tens of ms on a shared CPU; only flag real jumps
+        regressed = change > args.tolerance and stats["p95_ms"] - before["p95_ms"] > args.min_delta_ms
+        marker = "❌" if regressed else "✅"
+        print(f"  {marker} {route:<48} p95 {before['p95_ms']:>8.1f} -> {stats['p95_ms']:>8.1f} ms ({change:+.0%})")
+        if regressed:
+            regressions.append(route)
+    return regressions
+
+
+async def run():
+    rng = random.Random(args.seed)
+    stalls, students, menus = seed(rng)
+    ramp = args.ramp if args.ramp is not None else args.duration / 2
+    recorder = Recorder()
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=60) as client:
+            started = time.monotonic()
+            deadline = started + args.duration
+            tasks = [
+                asyncio.create_task(owner(client, recorder, random.Random(rng.random()), stall_id, subject, deadline))
+                for stall_id, subject in stalls
+            ]
+            # Arrivals bunch up towards the middle of the ramp, like a 12pm rush
+            tasks += [
+                asyncio.create_task(student(
+                    client, recorder, random.Random(rng.random()), subject, menus,
+                    started + min(ramp, max(0.0, rng.gauss(ramp / 2, ramp / 5))), deadline
+                ))
+                for subject in students
+            ]
+            await asyncio.gather(*tasks)
+            elapsed = time.monotonic() - started
+
+    return summarise(recorder, elapsed), elapsed
+
+
+def main():
+    print(f"Lunch rush: {args.students:,} students, {args.stalls} stalls, {args.duration:.0f}s")
+    summary, elapsed = asyncio.run(run())
+
+    total = sum(stats["requests"] for stats in summary.values())
+    errors = sum(stats["errors"] for stats in summary.values())
+    print(f"\n{'route':<50} {'reqs':>7} {'err':>5} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for route, stats in summary.items():
+        print(f"{route:<50} {stats['requests']:>7} {stats['errors']:>5} {stats['rps']:>8.1f} "
+              f"{stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f}")
+    print(f"\nTotal: {total:,} requests in {elapsed:.1f}s ({total / elapsed:.1f} req/s), {errors} errors")
+
+    result = {
+        "config": {key: getattr(args, key) for key in ("students", "stalls", "duration", "poll_interval", "prep_seconds", "seed")},
+        "total_rps": round(total / elapsed, 2),
+        "routes": summary,
+    }
+
+    regressions = []
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("config") != result["config"]:
+            print(f"\n⚠️  Baseline was recorded with {baseline.get('config')}; comparison is indicative only")
+        regressions = compare(summary, baseline)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump(result, f, indent=2)
+            f.write("\n")
+        print(f"\n💾 Baseline saved to {args.baseline}")
+
+    if args.check and (regressions or errors):
+        print(f"\n❌ {len(regressions)} route(s) regressed, {errors} errors")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
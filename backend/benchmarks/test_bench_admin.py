@@ -0,0 +1,39 @@
+"""
+Micro-benchmarks for the admin analytics handlers
+Run with: pytest benchmarks/test_bench_admin.py (see benchmarks/conftest.py)
+"""
+
+from app.routes.admin import (
+    get_dashboard_stats, get_popular_items, get_recent_activity, get_stall_performance
+)
+from app.services.dashboard_stats import dashboard_stats
+
+
+def test_dashboard_stats_uncached(benchmark, seeded, db, run_async):
+    # Drop the TTL cache before every round so each one runs the aggregates
+    stats = benchmark.pedantic(
+        lambda: run_async(get_dashboard_stats(admin_user=seeded.admin, db=db)),
+        setup=dashboard_stats.invalidate, rounds=20, warmup_rounds=1
+    )
+    assert stats["total_orders"] >= seeded.scale.orders
+
+
+def test_dashboard_stats_cached(benchmark, seeded, db, run_async):
+    dashboard_stats.invalidate()
+    stats = benchmark(lambda: run_async(get_dashboard_stats(admin_user=seeded.admin, db=db)))
+    assert stats["total_stalls"] == seeded.scale.stalls
+
+
+def test_popular_items(benchmark, seeded, db, run_async):
+    items = benchmark(lambda: run_async(get_popular_items(limit=10, admin_user=seeded.admin, db=db)))
+    assert len(items) == 10
+
+
+def test_stall_performance(benchmark, seeded, db, run_async):
+    stalls = benchmark(lambda: run_async(get_stall_performance(admin_user=seeded.admin, db=db)))
+    assert len(stalls) == seeded.scale.stalls
+
+
+def test_recent_activity(benchmark, seeded, db, run_async):
+    activity = benchmark(lambda: run_async(get_recent_activity(limit=20, admin_user=seeded.admin, db=db)))
+    assert len(activity) == 20
@@ -0,0 +1,59 @@
+"""
+Micro-benchmarks for the hot student and stall-owner route handlers
+Run with: pytest benchmarks/test_bench_routes.py (see benchmarks/conftest.py)
+"""
+
+from datetime import datetime, timedelta
+
+from fastapi import Response
+
+from app.routes.orders import create_order, get_stall_orders, get_user_orders
+from app.routes.queue import get_queue_position, get_stall_queue
+from app.routes.stalls import get_nearby_stalls
+from app.schemas.order import OrderCreate, OrderItemCreate
+from app.services.stall_index import stall_index
+
+# North Spine, where most lunch-hour requests originate
+NORTH_SPINE = (1.3474, 103.6802)
+
+
+def test_create_order(benchmark, seeded, db):
+    pickup = datetime.now() + timedelta(minutes=30)
+    order = OrderCreate(
+        stall_id=seeded.order_stall_id,
+        items=[OrderItemCreate(menu_item_id=item_id, quantity=1) for item_id in seeded.order_menu_item_ids],
+        pickup_window_start=pickup,
+        pickup_window_end=pickup + timedelta(minutes=15)
+    )
+    created = benchmark(create_order, order=order, current_user=seeded.student, db=db)
+    assert created.queue_entry is not None
+
+
+def test_get_stall_queue(benchmark, seeded, db):
+    result = benchmark(get_stall_queue, stall_id=seeded.busy_stall_id, db=db)
+    assert result.current_queue_length > 0
+
+
+def test_get_queue_position(benchmark, seeded, db):
+    result = benchmark(get_queue_position, order_id=seeded.queued_order_id, current_user=seeded.student, db=db)
+    assert result.order_id == seeded.queued_order_id
+
+
+def test_get_stall_orders(benchmark, seeded, db):
+    orders = benchmark(
+        get_stall_orders, stall_id=seeded.busy_stall_id, response=Response(), status=None,
+        cursor=None, since=None, limit=50, current_user=seeded.owner, db=db
+    )
+    assert len(orders) == 50
+
+
+def test_get_user_orders(benchmark, seeded, db):
+    orders = benchmark(get_user_orders, response=Response(), cursor=None, limit=50, current_user=seeded.student, db=db)
+    assert orders
+
+
+def test_get_nearby_stalls(benchmark, seeded, db):
+    lat, lng = NORTH_SPINE
+    stall_index.rebuild(db)
+    stalls = benchmark(get_nearby_stalls, lat=lat, lng=lng, radius_km=None, skip=0, limit=20, db=db)
+    assert len(stalls) == 20
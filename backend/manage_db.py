@@ -1,16 +1,35 @@
 #!/usr/bin/env python3
 
+import argparse
 import sys
 import os
+from datetime import datetime
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from app.database.init_db import init_database, reset_database
+from app.database.init_db import init_database, reset_database, rebuild_rollups, generate_synthetic_data
+
+def parse_generate_args(args):
+    parser = argparse.ArgumentParser(
+        prog="manage_db.py generate",
+        description="Replace the database contents with a synthetic order history"
+    )
+    parser.add_argument("--users", type=int, default=5000, help="Student accounts")
+    parser.add_argument("--stalls", type=int, default=40)
+    parser.add_argument("--items-per-stall", type=int, default=12)
+    parser.add_argument("--orders", type=int, default=100_000)
+    parser.add_argument("--days", type=int, default=90, help="Days of history, ending now")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--now", type=datetime.fromisoformat,
+                        help="End of the history (e.g. 2025-03-04T12:30); fix it for reproducible data")
+    return parser.parse_args(args)
 
 def main():
     if len(sys.argv) < 2:
-        print("Usage: python manage_db.py [init|reset]")
-        print("  init  - Initialize database with test data")
-        print("  reset - Reset database (clear all data)")
+        print("Usage: python manage_db.py [init|reset|rollups|generate]")
+        print("  init     - Initialize database with test data")
+        print("  reset    - Reset database (clear all data)")
+        print("  rollups  - Rebuild daily sales rollups from order history")
+        print("  generate - Replace all data with a synthetic order history (see generate --help)")
         return
 
     command = sys.argv[1]
@@ -21,9 +40,20 @@ def main():
     elif command == "reset":
         print("Resetting database...")
         reset_database()
+    elif command == "rollups":
+        print("Rebuilding sales rollups...")
+        rebuild_rollups()
+    elif command == "generate":
+        options = parse_generate_args(sys.argv[2:])
+        print(f"Generating {options.orders:,} orders for {options.users:,} users and {options.stalls:,} stalls "
+              f"(seed {options.seed})...")
+        generate_synthetic_data(
+            users=options.users, stalls=options.stalls, items_per_stall=options.items_per_stall,
+            orders=options.orders, days=options.days, seed=options.seed, now=options.now
+        )
     else:
         print(f"Unknown command: {command}")
-        print("Available commands: init, reset")
+        print("Available commands: init, reset, rollups, generate")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,117 @@
+"""
+Migration script to add composite indexes for the order and queue access paths
+Indexes are built CONCURRENTLY on PostgreSQL so live traffic is not blocked
+Works with both SQLite and PostgreSQL
+"""
+
+import sys
+import os
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.config import settings
+from sqlalchemy import create_engine, text
+
+# (index name, table, columns) - must match __table_args__ on Order and QueueEntry
+INDEXES = [
+    ("ix_orders_stall_status_created", "orders", "stall_id, status, created_at"),
+    ("ix_orders_stall_created", "orders", "stall_id, created_at"),
+    ("ix_orders_stall_updated", "orders", "stall_id, updated_at"),
+    ("ix_orders_user_created", "orders", "user_id, created_at"),
+    ("ix_queue_entries_stall_status_id", "queue_entries", "stall_id, status, id"),
+]
+
+# Superseded indexes dropped by migrate(); queue entries are now listed in join (id) order
+RETIRED_INDEXES = ["ix_queue_entries_stall_status_position"]
+
+def migrate():
+    """Create composite indexes on orders and queue_entries"""
+
+    is_postgres = settings.DATABASE_URL.startswith("postgresql")
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    engine = create_engine(settings.DATABASE_URL, isolation_level="AUTOCOMMIT")
+
+    try:
+        with engine.connect() as conn:
+            for name, table, columns in INDEXES:
+                if is_postgres:
+                    # A failed concurrent build leaves an INVALID index behind; drop it and retry
+                    invalid = conn.execute(text("""
+                        SELECT 1
+                        FROM pg_index i
+                        JOIN pg_class c ON c.oid = i.indexrelid
+                        WHERE c.relname = :name AND NOT i.indisvalid
+                    """), {"name": name}).first()
+                    if invalid:
+                        conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+                        print(f"🧹 Dropped invalid index {name}")
+
+                    exists = conn.execute(
+                        text("SELECT 1 FROM pg_indexes WHERE indexname = :name"),
+                        {"name": name}
+                    ).first()
+                    if exists:
+                        print(f"⏭️  {name} already exists")
+                        continue
+                    conn.execute(text(f"CREATE INDEX CONCURRENTLY {name} ON {table} ({columns})"))
+                else:
+                    exists = conn.execute(
+                        text("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = :name"),
+                        {"name": name}
+                    ).first()
+                    if exists:
+                        print(f"⏭️  {name} already exists")
+                        continue
+                    conn.execute(text(f"CREATE INDEX {name} ON {table} ({columns})"))
+                print(f"✅ Created {name} on {table} ({columns})")
+
+            for name in RETIRED_INDEXES:
+                if is_postgres:
+                    conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+                else:
+                    conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+                print(f"🧹 Dropped superseded index {name}")
+
+            # Refresh planner statistics so the new indexes are picked up straight away
+            for table in ("orders", "queue_entries"):
+                conn.execute(text(f"ANALYZE {table}"))
+
+        print("\n✅ Migration completed successfully!")
+
+    except Exception as e:
+        print(f"\n❌ Migration failed: {str(e)}")
+        raise
+
+def rollback():
+    """Drop the composite indexes"""
+
+    is_postgres = settings.DATABASE_URL.startswith("postgresql")
+    engine = create_engine(settings.DATABASE_URL, isolation_level="AUTOCOMMIT")
+
+    try:
+        with engine.connect() as conn:
+            for name, _, _ in INDEXES:
+                if is_postgres:
+                    conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+                else:
+                    conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+                print(f"✅ Dropped {name}")
+        print("✅ Rollback completed successfully!")
+
+    except Exception as e:
+        print(f"❌ Rollback failed: {str(e)}")
+        raise
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Add composite indexes for order and queue lookups")
+    parser.add_argument("--rollback", action="store_true", help="Rollback the migration")
+    args = parser.parse_args()
+
+    if args.rollback:
+        rollback()
+    else:
+        migrate()
@@ -8,15 +8,13 @@ from pathlib import Path
 
 sys.path.append(str(Path(__file__).parent))
 
+from app.database.bulk_loader import BulkLoader, cached_password_hash
 from app.database.database import SessionLocal
 from app.models.user import User, UserRole
 from app.models.stall import Stall
 from app.models.menu import MenuItem
-from passlib.context import CryptContext
 from datetime import time
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 def seed_database():
     """Seed the Supabase database with initial data"""
     db = SessionLocal()
@@ -31,19 +29,19 @@ def seed_database():
         # =====================================================
         print("📝 Creating admin user...")
 
-        existing_admin = db.query(User).filter(User.ntu_email == "admin@ntu.edu.sg").first()
-        if not existing_admin:
-            admin = User(
-                ntu_email="admin@ntu.edu.sg",
-                student_id="ADMIN001",
-                name="System Administrator",
-                phone="+65 12345678",
-                hashed_password=pwd_context.hash("admin123"),
-                role=UserRole.ADMIN,
-                is_active=True,
-                is_verified=True
-            )
-            db.add(admin)
+        # Existing emails are fetched once and shared by the admin and student loads
+        users = BulkLoader(db, User, key=["ntu_email"])
+        result = users.load([{
+            "ntu_email": "admin@ntu.edu.sg",
+            "student_id": "ADMIN001",
+            "name": "System Administrator",
+            "phone": "+65 12345678",
+            "hashed_password": cached_password_hash("admin123"),
+            "role": UserRole.ADMIN,
+            "is_active": True,
+            "is_verified": True
+        }])
+        if result.inserted:
             print("   ✓ Admin user created")
         else:
             print("   ⚠️  Admin user already exists, skipping...")
@@ -80,26 +78,19 @@ def seed_database():
             }
         ]
 
-        created_students = []
-        for student_data in test_students:
-            existing = db.query(User).filter(User.ntu_email == student_data["ntu_email"]).first()
-            if not existing:
-                student = User(
-                    ntu_email=student_data["ntu_email"],
-                    student_id=student_data["student_id"],
-                    name=student_data["name"],
-                    phone=student_data["phone"],
-                    dietary_preferences=student_data["dietary_preferences"],
-                    hashed_password=pwd_context.hash(student_data["password"]),
-                    role=UserRole.STUDENT,
-                    is_active=True,
-                    is_verified=True
-                )
-                db.add(student)
-                created_students.append(student)
-                print(f"   ✓ Created: {student_data['name']} ({student_data['ntu_email']})")
-            else:
-                print(f"   ⚠️  {student_data['name']} already exists, skipping...")
+        result = users.load(test_students, transform=lambda student_data: {
+            "ntu_email": student_data["ntu_email"],
+            "student_id": student_data["student_id"],
+            "name": student_data["name"],
+            "phone": student_data["phone"],
+            "dietary_preferences": student_data["dietary_preferences"],
+            # All test students share one password, so bcrypt runs once
+            "hashed_password": cached_password_hash(student_data["password"]),
+            "role": UserRole.STUDENT,
+            "is_active": True,
+            "is_verified": True
+        })
+        print(f"   ✓ Created {result.inserted} student(s), {result.skipped} already existed")
 
         # Commit users before creating stalls
         db.commit()
@@ -149,20 +140,13 @@ def seed_database():
             }
         ]
 
-        created_stalls = []
-        for stall_data in stalls_data:
-            existing = db.query(Stall).filter(Stall.name == stall_data["name"]).first()
-            if not existing:
-                stall = Stall(**stall_data)
-                db.add(stall)
-                db.flush()  # Flush to get the stall ID
-                created_stalls.append(stall)
-                print(f"   ✓ Created: {stall_data['name']}")
-            else:
-                created_stalls.append(existing)
-                print(f"   ⚠️  {stall_data['name']} already exists, using existing...")
+        stalls = BulkLoader(db, Stall, key=["name"])
+        result = stalls.load(stalls_data)
+        print(f"   ✓ Created {result.inserted} stall(s), {result.skipped} already existed")
 
         db.commit()
+        # Existing and new stalls alike, by name
+        stall_ids = {name: stall_id for (name,), stall_id in stalls.fetch_ids().items()}
         print("   ✓ All stalls created")
 
         # =====================================================
@@ -334,28 +318,22 @@ def seed_database():
 
         # Add menu items to stalls
         menu_data = [
-            (created_stalls[0], western_menu, "Western Food Paradise"),
-            (created_stalls[1], chicken_rice_menu, "Hainanese Chicken Rice"),
-            (created_stalls[2], mala_menu, "Mala Xiang Guo")
+            (western_menu, "Western Food Paradise"),
+            (chicken_rice_menu, "Hainanese Chicken Rice"),
+            (mala_menu, "Mala Xiang Guo")
         ]
 
-        total_items = 0
-        for stall, menu_items, stall_name in menu_data:
-            for item_data in menu_items:
-                existing = db.query(MenuItem).filter(
-                    MenuItem.stall_id == stall.id,
-                    MenuItem.name == item_data["name"]
-                ).first()
-
-                if not existing:
-                    menu_item = MenuItem(stall_id=stall.id, **item_data)
-                    db.add(menu_item)
-                    total_items += 1
-
-            print(f"   ✓ Created {len(menu_items)} items for {stall_name}")
+        menu = BulkLoader(db, MenuItem, key=["stall_id", "name"])
+        result = menu.load(
+            {"stall_id": stall_ids[stall_name], **item_data}
+            for menu_items, stall_name in menu_data
+            for item_data in menu_items
+        )
+        for menu_items, stall_name in menu_data:
+            print(f"   ✓ {len(menu_items)} items for {stall_name}")
 
         db.commit()
-        print(f"   ✓ Total menu items created: {total_items}")
+        print(f"   ✓ Total menu items created: {result.inserted}")
 
         # =====================================================
         # SUMMARY
@@ -7,11 +7,9 @@ from pathlib import Path
 
 sys.path.append(str(Path(__file__).parent))
 
+from app.database.bulk_loader import BulkLoader, cached_password_hash
 from app.database.database import SessionLocal
 from app.models.user import User, UserRole
-from passlib.context import CryptContext
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 def create_test_users():
     db = SessionLocal()
@@ -51,30 +49,18 @@ def create_test_users():
             }
         ]
 
-        created_count = 0
-        for user_data in test_users:
-            # Check if user already exists
-            existing_user = db.query(User).filter(
-                User.ntu_email == user_data["ntu_email"]
-            ).first()
-
-            if existing_user:
-                print(f"⏭️  User already exists: {user_data['ntu_email']}")
-                continue
-
-            # Create new user
-            password = user_data.pop("password")
-            user = User(
-                **user_data,
-                hashed_password=pwd_context.hash(password),
-                is_active=True,
-                is_verified=True
-            )
-
-            db.add(user)
-            db.commit()
-            created_count += 1
-            print(f"✅ Created: {user.name} ({user.ntu_email})")
+        # One query for existing emails, one batched insert, one bcrypt per distinct password
+        loader = BulkLoader(db, User, key=["ntu_email"])
+        result = loader.load(test_users, transform=lambda user_data: {
+            **{field: value for field, value in user_data.items() if field != "password"},
+            "hashed_password": cached_password_hash(user_data["password"]),
+            "is_active": True,
+            "is_verified": True
+        })
+        db.commit()
+        created_count = result.inserted
+        if result.skipped:
+            print(f"⏭️  {result.skipped} user(s) already exist")
 
         print("\n" + "="*60)
         print(f"✅ COMPLETED: {created_count} new user(s) created")
@@ -6,8 +6,13 @@
 -- =====================================================
 
 -- Drop existing tables if they exist (for clean migration)
+DROP TABLE IF EXISTS stall_customers CASCADE;
+DROP TABLE IF EXISTS daily_item_sales CASCADE;
+DROP TABLE IF EXISTS daily_stall_sales CASCADE;
+DROP TABLE IF EXISTS email_outbox CASCADE;
 DROP TABLE IF EXISTS otp_verifications CASCADE;
 DROP TABLE IF EXISTS order_items CASCADE;
+DROP TABLE IF EXISTS queue_counters CASCADE;
 DROP TABLE IF EXISTS queue_entries CASCADE;
 DROP TABLE IF EXISTS orders CASCADE;
 DROP TABLE IF EXISTS menu_items CASCADE;
@@ -18,6 +23,7 @@ DROP TABLE IF EXISTS users CASCADE;
 DROP TYPE IF EXISTS user_role CASCADE;
 DROP TYPE IF EXISTS order_status CASCADE;
 DROP TYPE IF EXISTS queue_status CASCADE;
+DROP TYPE IF EXISTS email_status CASCADE;
 
 -- =====================================================
 -- CREATE ENUMS
@@ -26,6 +32,7 @@ DROP TYPE IF EXISTS queue_status CASCADE;
 CREATE TYPE user_role AS ENUM ('student', 'stall_owner', 'admin');
 CREATE TYPE order_status AS ENUM ('pending', 'accepted', 'preparing', 'ready', 'completed', 'cancelled');
 CREATE TYPE queue_status AS ENUM ('waiting', 'preparing', 'ready', 'collected', 'cancelled');
+CREATE TYPE email_status AS ENUM ('pending', 'sending', 'sent', 'failed');
 
 -- =====================================================
 -- CREATE TABLES
@@ -120,6 +127,13 @@ CREATE TABLE queue_entries (
     collected_at TIMESTAMP
 );
 
+-- Queue Counters Table (per-stall daily queue number sequence)
+CREATE TABLE queue_counters (
+    stall_id INTEGER PRIMARY KEY REFERENCES stalls(id) ON DELETE CASCADE,
+    service_date DATE NOT NULL,
+    last_number INTEGER NOT NULL DEFAULT 0
+);
+
 -- OTP Verifications Table
 CREATE TABLE otp_verifications (
     id SERIAL PRIMARY KEY,
@@ -136,6 +150,53 @@ CREATE TABLE otp_verifications (
     is_used BOOLEAN DEFAULT false
 );
 
+-- Daily Stall Sales Table (rollup of completed orders per stall per order date)
+CREATE TABLE daily_stall_sales (
+    stall_id INTEGER NOT NULL REFERENCES stalls(id) ON DELETE CASCADE,
+    sales_date DATE NOT NULL,
+    completed_orders INTEGER NOT NULL DEFAULT 0,
+    items_sold INTEGER NOT NULL DEFAULT 0,
+    revenue DOUBLE PRECISION NOT NULL DEFAULT 0,
+    PRIMARY KEY (stall_id, sales_date)
+);
+
+-- Daily Item Sales Table (rollup of completed orders per menu item per order date)
+CREATE TABLE daily_item_sales (
+    menu_item_id INTEGER NOT NULL REFERENCES menu_items(id) ON DELETE CASCADE,
+    sales_date DATE NOT NULL,
+    stall_id INTEGER NOT NULL REFERENCES stalls(id) ON DELETE CASCADE,
+    order_count INTEGER NOT NULL DEFAULT 0,
+    quantity INTEGER NOT NULL DEFAULT 0,
+    revenue DOUBLE PRECISION NOT NULL DEFAULT 0,
+    PRIMARY KEY (menu_item_id, sales_date)
+);
+
+-- Stall Customers Table (distinct customers with completed orders per stall)
+CREATE TABLE stall_customers (
+    stall_id INTEGER NOT NULL REFERENCES stalls(id) ON DELETE CASCADE,
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    completed_orders INTEGER NOT NULL DEFAULT 0,
+    first_order_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (stall_id, user_id)
+);
+
+-- Email Outbox Table (queued OTP and welcome emails)
+CREATE TABLE email_outbox (
+    id SERIAL PRIMARY KEY,
+    recipient VARCHAR(255) NOT NULL,
+    kind VARCHAR(50) NOT NULL,
+    subject VARCHAR(255) NOT NULL,
+    html_body TEXT NOT NULL,
+    text_body TEXT NOT NULL,
+    status email_status NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    next_attempt_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    claimed_at TIMESTAMP,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    sent_at TIMESTAMP
+);
+
 -- =====================================================
 -- CREATE INDEXES
 -- =====================================================
@@ -162,6 +223,10 @@ CREATE INDEX idx_orders_stall_id ON orders(stall_id);
 CREATE INDEX idx_orders_status ON orders(status);
 CREATE INDEX idx_orders_order_number ON orders(order_number);
 CREATE INDEX idx_orders_created_at ON orders(created_at);
+CREATE INDEX ix_orders_stall_status_created ON orders(stall_id, status, created_at);
+CREATE INDEX ix_orders_stall_created ON orders(stall_id, created_at);
+CREATE INDEX ix_orders_stall_updated ON orders(stall_id, updated_at);
+CREATE INDEX ix_orders_user_created ON orders(user_id, created_at);
 
 -- Order items indexes
 CREATE INDEX idx_order_items_order_id ON order_items(order_id);
@@ -171,11 +236,19 @@ CREATE INDEX idx_order_items_menu_item_id ON order_items(menu_item_id);
 CREATE INDEX idx_queue_entries_stall_id ON queue_entries(stall_id);
 CREATE INDEX idx_queue_entries_order_id ON queue_entries(order_id);
 CREATE INDEX idx_queue_entries_status ON queue_entries(status);
+CREATE INDEX ix_queue_entries_stall_status_id ON queue_entries(stall_id, status, id);
 
 -- OTP verifications indexes
 CREATE INDEX idx_otp_verifications_email ON otp_verifications(email);
 CREATE INDEX idx_otp_verifications_expires_at ON otp_verifications(expires_at);
 
+-- Sales rollup indexes
+CREATE INDEX idx_daily_item_sales_stall_id ON daily_item_sales(stall_id);
+
+-- Email outbox indexes
+CREATE INDEX idx_email_outbox_recipient ON email_outbox(recipient);
+CREATE INDEX ix_email_outbox_status_next_attempt ON email_outbox(status, next_attempt_at);
+
 -- =====================================================
 -- CREATE FUNCTIONS & TRIGGERS
 -- =====================================================
@@ -213,6 +286,7 @@ ALTER TABLE orders ENABLE ROW LEVEL SECURITY;
 ALTER TABLE order_items ENABLE ROW LEVEL SECURITY;
 ALTER TABLE queue_entries ENABLE ROW LEVEL SECURITY;
 ALTER TABLE otp_verifications ENABLE ROW LEVEL SECURITY;
+ALTER TABLE email_outbox ENABLE ROW LEVEL SECURITY;
 
 -- Create policies for public access (you can customize these later)
 -- For now, we'll allow all authenticated users to read/write
@@ -246,6 +320,10 @@ CREATE POLICY "Allow all operations for authenticated users" ON queue_entries
 CREATE POLICY "Allow all operations for authenticated users" ON otp_verifications
     FOR ALL USING (true) WITH CHECK (true);
 
+-- Email outbox policies
+CREATE POLICY "Allow all operations for authenticated users" ON email_outbox
+    FOR ALL USING (true) WITH CHECK (true);
+
 -- =====================================================
 -- VERIFICATION QUERIES
 -- =====================================================
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Tests for the batched bulk loader used by the seed and import scripts.
+Run with: pytest test_bulk_loader.py
+"""
+
+import os
+import sys
+import tempfile
+
+# Point the app at a throwaway database before importing it
+DB_PATH = os.path.join(tempfile.mkdtemp(), "bulk_loader_test.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from app.database.bulk_loader import BulkLoader
+from app.database.database import Base, engine, SessionLocal
+from app.models import stall, menu, order, queue, otp, email  # noqa: F401 - register tables
+from app.models.user import User
+
+
+def student(number: int) -> dict:
+    return {
+        "ntu_email": f"student{number}@e.ntu.edu.sg", "student_id": f"U{number:09d}", "name": f"Student {number}",
+        "phone": "+6591234567", "hashed_password": "x", "role": "student",
+    }
+
+
+@pytest.fixture()
+def db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+def test_rows_dropped_on_conflict_are_not_counted_as_inserted(db):
+    loader = BulkLoader(db, User, key=["ntu_email"])
+    loader.existing = loader.fetch_ids()
+
+    # Another loader claims one of the keys after this one took its snapshot
+    db.execute(User.__table__.insert(), [student(2)])
+
+    result = loader.load([student(1), student(2), student(3)])
+    db.commit()
+
+    assert (result.inserted, result.skipped) == (2, 1)
+    assert db.query(User).count() == 3
+
+
+def test_existing_keys_are_skipped_or_updated(db):
+    BulkLoader(db, User, key=["ntu_email"]).load([student(1)])
+    db.commit()
+
+    renamed = {**student(1), "name": "Renamed"}
+    assert str(BulkLoader(db, User, key=["ntu_email"]).load([renamed, student(2)])) == "1 inserted, 0 updated, 1 skipped"
+    assert str(BulkLoader(db, User, key=["ntu_email"], on_existing="update").load([renamed])) == "0 inserted, 1 updated, 0 skipped"
+    db.commit()
+    assert db.query(User).filter(User.ntu_email == "student1@e.ntu.edu.sg").one().name == "Renamed"
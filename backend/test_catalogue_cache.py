@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Tests for the stall/menu catalogue cache.
+Run with: pytest test_catalogue_cache.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.catalogue_cache import CatalogueCache
+
+
+def test_load_that_races_an_invalidation_is_not_cached():
+    cache = CatalogueCache(ttl_seconds=300)
+
+    def stale_loader():
+        # Another worker commits and invalidates while this load is in flight
+        cache.invalidate("menu:1")
+        return ["stale"]
+
+    assert cache.get_or_load("menu:1", stale_loader) == ["stale"]
+    assert cache.get_or_load("menu:1", lambda: ["fresh"]) == ["fresh"]
+    assert cache.get_or_load("menu:1", lambda: ["unused"]) == ["fresh"]
+    assert cache.stats()["hits"] == 1
+
+
+def test_missing_rows_are_not_cached():
+    cache = CatalogueCache(ttl_seconds=300)
+    assert cache.get_or_load("stall:9", lambda: None) is None
+    assert cache.get_or_load("stall:9", lambda: {"id": 9}) == {"id": 9}
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Tests for the stall order changes feed behind /api/orders/stall/{id}/orders?since=.
+Run with: pytest test_changes_feed.py
+"""
+
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+# Point the app at a throwaway database before importing it
+DB_PATH = os.path.join(tempfile.mkdtemp(), "changes_feed_test.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from app.config import settings
+from app.database.database import Base, engine, SessionLocal
+from app.models import menu, otp, email, queue  # noqa: F401 - register tables
+from app.models.order import Order, OrderStatus
+from app.models.stall import Stall
+from app.models.user import User, UserRole
+from app.utils.pagination import changes_since, decode_cursor, latest_change_cursor
+
+
+@pytest.fixture()
+def db(monkeypatch):
+    monkeypatch.setattr(settings, "CHANGES_FEED_SETTLE_SECONDS", 10)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    session.add_all([
+        User(ntu_email="s@e.ntu.edu.sg", student_id="U000000001", name="Student",
+             phone="91234567", hashed_password="x", role=UserRole.STUDENT),
+        Stall(name="Stall", location="North Spine"),
+    ])
+    session.commit()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+def add_order(db, number: int, updated_at: datetime) -> int:
+    order = Order(user_id=1, stall_id=1, total_amount=5.0, status=OrderStatus.CONFIRMED,
+                  order_number=f"ORD{number:05d}", created_at=updated_at, updated_at=updated_at)
+    db.add(order)
+    db.commit()
+    return order.id
+
+
+def stall_orders(db):
+    return db.query(Order).filter(Order.stall_id == 1)
+
+
+def test_late_commit_behind_the_cursor_is_not_skipped(db):
+    now = datetime.utcnow()
+    add_order(db, 1, now - timedelta(minutes=5))
+    seen = add_order(db, 2, now - timedelta(seconds=1))
+
+    cursor = latest_change_cursor(stall_orders(db), Order)
+    # The start cursor stays behind the settle window, so the recent order is (re)sent
+    assert decode_cursor(cursor)[0] < now - timedelta(seconds=9)
+    rows, cursor = changes_since(stall_orders(db), Order, cursor, 50)
+    assert [row.id for row in rows] == [seen]
+
+    # Stamped at flush before that poll, committed after it
+    late = add_order(db, 3, now - timedelta(seconds=2))
+
+    rows, cursor = changes_since(stall_orders(db), Order, cursor, 50)
+    assert [row.id for row in rows] == [late, seen]
+
+
+def test_settled_changes_advance_the_cursor(db):
+    now = datetime.utcnow()
+    add_order(db, 1, now - timedelta(minutes=5))
+    start = latest_change_cursor(stall_orders(db), Order)
+    second = add_order(db, 2, now - timedelta(minutes=4))
+
+    rows, cursor = changes_since(stall_orders(db), Order, start, 50)
+    assert [row.id for row in rows] == [second]
+    assert decode_cursor(cursor)[1] == second
+
+    rows, unchanged = changes_since(stall_orders(db), Order, cursor, 50)
+    assert rows == [] and unchanged == cursor
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Tests for request session admission in get_db.
+Run with: pytest test_db_admission.py
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+from contextlib import asynccontextmanager
+
+# Point the app at a throwaway database before importing it
+DB_PATH = os.path.join(tempfile.mkdtemp(), "db_admission_test.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+from sqlalchemy import inspect
+
+from app.database import database
+from app.database.database import Base, engine, SessionLocal
+from app.models import stall, menu, order, queue, otp, email  # noqa: F401 - register tables
+from app.models.user import User, UserRole
+from app.routes.auth import _load_user
+
+# FastAPI drives generator dependencies the same way
+request_session = asynccontextmanager(database.get_db)
+
+
+@pytest.fixture()
+def two_connections(monkeypatch):
+    monkeypatch.setattr(database, "DB_MAX_CONNECTIONS", 2)
+
+
+def test_admits_at_most_the_pool_capacity(two_connections):
+    active, peak = 0, 0
+
+    async def request():
+        nonlocal active, peak
+        async with request_session():
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+    async def burst():
+        await asyncio.gather(*(request() for _ in range(8)))
+
+    asyncio.run(burst())
+    assert peak == 2
+
+
+def test_failed_requests_release_their_permit(two_connections):
+    async def failing_request():
+        async with request_session():
+            raise RuntimeError("handler failed")
+
+    async def run():
+        for _ in range(3):
+            with pytest.raises(RuntimeError):
+                await failing_request()
+        async with request_session() as db:
+            return db
+
+    # Would wait forever if the failures had kept their permits
+    assert asyncio.run(asyncio.wait_for(run(), timeout=5)) is not None
+    # Each event loop gets its own permits
+    assert asyncio.run(asyncio.wait_for(run(), timeout=5)) is not None
+
+
+def test_user_lookup_returns_a_detached_user():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        db.add(User(ntu_email="s@e.ntu.edu.sg", student_id="U000000001", name="Student",
+                    phone="91234567", hashed_password="x", role=UserRole.STUDENT))
+        db.commit()
+
+        user = _load_user(db, "U000000001")
+        assert inspect(user).detached
+        assert user.name == "Student"
+        assert _load_user(db, "U999999999") is None
+    finally:
+        db.close()
+        Base.metadata.drop_all(bind=engine)
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Tests for the outbound mail queue against a local stand-in SMTP server.
+Run with: pytest test_mail_queue.py
+"""
+
+import os
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+
+# Point the app at a throwaway database before importing it
+DB_PATH = os.path.join(tempfile.mkdtemp(), "mail_queue_test.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from app.config import settings
+from app.database.database import Base, engine, SessionLocal
+from app.models.email import EmailOutbox, EmailStatus
+from app.services.mail_queue import mail_queue
+
+
+class StandInSMTPServer(socketserver.ThreadingTCPServer):
+    """Minimal SMTP server in the spirit of aiosmtpd's Debugging handler"""
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StandInSMTPHandler)
+        self.messages = []
+        self.connections = 0
+        self.logins = 0
+        self.fail_next_data = 0
+        self.reject_all = False
+
+
+class StandInSMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line: str):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        server = self.server
+        server.connections += 1
+        self.reply("220 stand-in ESMTP")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode().strip()
+            verb = command.split(" ", 1)[0].upper()
+
+            if verb == "EHLO":
+                self.reply("250-stand-in")
+                self.reply("250 AUTH PLAIN LOGIN")
+            elif verb == "AUTH":
+                server.logins += 1
+                self.reply("235 Authentication successful")
+            elif verb in ("MAIL", "RCPT", "RSET", "NOOP"):
+                self.reply("250 OK")
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                body = []
+                while True:
+                    data_line = self.rfile.readline()
+                    if data_line in (b".\r\n", b".\n", b""):
+                        break
+                    body.append(data_line)
+                if server.reject_all:
+                    self.reply("550 Mailbox unavailable")
+                elif server.fail_next_data:
+                    server.fail_next_data -= 1
+                    self.reply("451 Temporary local problem")
+                else:
+                    server.messages.append(b"".join(body).decode())
+                    self.reply("250 Queued")
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+
+@pytest.fixture()
+def smtp_server(monkeypatch):
+    server = StandInSMTPServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    monkeypatch.setattr(settings, "SMTP_HOST", "127.0.0.1")
+    monkeypatch.setattr(settings, "SMTP_PORT", server.server_address[1])
+    monkeypatch.setattr(settings, "SMTP_EMAIL", "noreply@ntufood.test")
+    monkeypatch.setattr(settings, "SMTP_PASSWORD", "app-password")
+    monkeypatch.setattr(settings, "MAIL_WORKERS", 1)
+    monkeypatch.setattr(settings, "MAIL_POLL_SECONDS", 0.05)
+    monkeypatch.setattr(settings, "MAIL_RETRY_BASE_SECONDS", 0)
+    monkeypatch.setattr(settings, "MAIL_MAX_ATTEMPTS", 3)
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    mail_queue.start()
+    yield server
+    mail_queue.stop()
+    server.shutdown()
+    server.server_close()
+
+
+def wait_for_status(message_id: int, status: EmailStatus, timeout: float = 5.0) -> EmailOutbox:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        db = SessionLocal()
+        try:
+            message = db.query(EmailOutbox).filter(EmailOutbox.id == message_id).first()
+            if message.status == status:
+                return message
+        finally:
+            db.close()
+        time.sleep(0.02)
+    raise AssertionError(f"Email {message_id} never reached {status.value}")
+
+
+def enqueue(recipient: str = "student@e.ntu.edu.sg") -> int:
+    return mail_queue.enqueue(recipient, "Your Verification Code", "<p>123456</p>", "123456", kind="otp")
+
+
+def test_delivers_over_one_persistent_connection(smtp_server):
+    first = enqueue()
+    second = enqueue()
+
+    wait_for_status(first, EmailStatus.SENT)
+    message = wait_for_status(second, EmailStatus.SENT)
+
+    assert message.attempts == 1
+    assert message.sent_at is not None
+    assert len(smtp_server.messages) == 2
+    assert smtp_server.connections == 1
+    assert smtp_server.logins == 1
+
+
+def test_retries_transient_failures(smtp_server):
+    smtp_server.fail_next_data = 1
+
+    message = wait_for_status(enqueue(), EmailStatus.SENT)
+
+    assert message.attempts == 2
+    assert len(smtp_server.messages) == 1
+
+
+def test_gives_up_after_max_attempts(smtp_server):
+    smtp_server.reject_all = True
+
+    message = wait_for_status(enqueue(), EmailStatus.FAILED)
+
+    assert message.attempts == settings.MAIL_MAX_ATTEMPTS
+    assert "Mailbox unavailable" in message.last_error
+
+
+def test_delivery_status_is_queryable_by_email(smtp_server):
+    message_id = enqueue("Someone@E.NTU.edu.sg")
+    wait_for_status(message_id, EmailStatus.SENT)
+
+    statuses = mail_queue.delivery_status("someone@e.ntu.edu.sg")
+
+    assert [s.id for s in statuses] == [message_id]
+    assert statuses[0].status == EmailStatus.SENT
+
+
+def test_delivery_status_route_is_limited_to_owner_and_admins(smtp_server):
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.models.user import User, UserRole
+    from app.routes.auth import create_access_token
+    from app.services.user_cache import user_cache
+
+    db = SessionLocal()
+    db.add_all([
+        User(ntu_email="someone@e.ntu.edu.sg", student_id="U000000001", name="Someone",
+             phone="91234567", hashed_password="x", role=UserRole.STUDENT),
+        User(ntu_email="admin@ntu.edu.sg", student_id="ADMIN001", name="Admin",
+             phone="91234567", hashed_password="x", role=UserRole.ADMIN),
+    ])
+    db.commit()
+    db.close()
+    user_cache.clear()
+
+    smtp_server.reject_all = True
+    wait_for_status(enqueue("someone@e.ntu.edu.sg"), EmailStatus.FAILED)
+
+    def get(email, student_id=None):
+        headers = {"Authorization": "Bearer " + create_access_token({"sub": student_id})} if student_id else {}
+        return TestClient(app).get(f"/api/auth/otp/delivery-status/{email}", headers=headers)
+
+    assert get("someone@e.ntu.edu.sg").status_code == 401
+    assert get("other@e.ntu.edu.sg", "U000000001").status_code == 403
+
+    own = get("someone@e.ntu.edu.sg", "U000000001")
+    assert own.status_code == 200
+    assert own.json()[0]["last_error"] is None
+
+    admin = get("someone@e.ntu.edu.sg", "ADMIN001")
+    assert "Mailbox unavailable" in admin.json()[0]["last_error"]
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Tests for the Prometheus metrics surface.
+Run with: pytest test_metrics.py
+"""
+
+import os
+import sys
+import tempfile
+
+# Point the app at a throwaway database before importing it
+DB_PATH = os.path.join(tempfile.mkdtemp(), "metrics_test.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.database.database import Base, engine, SessionLocal
+from app.main import app
+from app.models.order import Order, OrderStatus
+from app.models.stall import Stall
+from app.models.user import User, UserRole
+from app.services.metrics import Histogram, metrics
+
+
+@pytest.fixture(scope="module")
+def client():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    db.add_all([
+        User(ntu_email="s@e.ntu.edu.sg", student_id="U000000001", name="Student",
+             phone="91234567", hashed_password="x", role=UserRole.STUDENT),
+        Stall(name="Stall", location="North Spine")
+    ])
+    db.commit()
+    db.close()
+    yield TestClient(app)
+    Base.metadata.drop_all(bind=engine)
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("test_seconds", "Test", ["route"], buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, route="/x")
+    lines = histogram.render()
+    assert 'test_seconds_bucket{route="/x",le="0.1"} 2' in lines
+    assert 'test_seconds_bucket{route="/x",le="1"} 3' in lines
+    assert 'test_seconds_bucket{route="/x",le="+Inf"} 4' in lines
+    assert 'test_seconds_count{route="/x"} 4' in lines
+
+
+def test_order_transitions_count_only_committed_changes(client):
+    created = metrics.orders_created.value()
+    confirmed = metrics.order_transitions.value(from_status="pending_payment", to_status="confirmed")
+
+    db = SessionLocal()
+    try:
+        order = Order(user_id=1, stall_id=1, total_amount=5.0, order_number="ORD00001")
+        db.add(order)
+        db.commit()
+        assert metrics.orders_created.value() == created + 1
+
+        order.status = OrderStatus.CONFIRMED
+        db.flush()
+        db.rollback()
+        assert metrics.order_transitions.value(from_status="pending_payment", to_status="confirmed") == confirmed
+
+        order.status = OrderStatus.CONFIRMED
+        db.commit()
+        assert metrics.order_transitions.value(from_status="pending_payment", to_status="confirmed") == confirmed + 1
+    finally:
+        db.close()
+
+
+def test_metrics_endpoint_reports_route_latency(client, monkeypatch):
+    monkeypatch.setattr(settings, "INTERNAL_METRICS_TOKEN", "scrape-token")
+    client.get("/api/stalls/")
+    response = client.get("/metrics", headers={"Authorization": "Bearer scrape-token"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'ntu_food_http_request_duration_seconds_count{method="GET",route="/api/stalls/"}' in response.text
+    assert "ntu_food_http_requests_in_flight 1" in response.text
+
+
+def test_internal_endpoints_fail_closed_without_a_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "INTERNAL_METRICS_TOKEN", None)
+    assert client.get("/metrics").status_code == 404
+    assert client.get("/internal/metrics").status_code == 404
+
+    monkeypatch.setattr(settings, "INTERNAL_METRICS_OPEN", True)
+    assert client.get("/metrics").status_code == 200
+
+    monkeypatch.setattr(settings, "INTERNAL_METRICS_TOKEN", "scrape-token")
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
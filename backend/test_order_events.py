@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Tests that order and queue transitions are pushed to event subscribers.
+Run with: pytest test_order_events.py
+"""
+
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+# Point the app at a throwaway database before importing it
+DB_PATH = os.path.join(tempfile.mkdtemp(), "order_events_test.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.database.database import Base, engine, SessionLocal
+from app.main import app
+from app.models.menu import MenuItem
+from app.models.queue import QueueStatus
+from app.models.stall import Stall
+from app.models.user import User, UserRole
+from app.routes.auth import create_access_token
+from app.services.event_broker import event_broker
+from app.services.user_cache import user_cache
+
+
+@pytest.fixture(scope="module")
+def client():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    db.add_all([
+        User(ntu_email="s@e.ntu.edu.sg", student_id="U000000001", name="Student",
+             phone="91234567", hashed_password="x", role=UserRole.STUDENT),
+        User(ntu_email="o@e.ntu.edu.sg", student_id="S000000001", name="Owner",
+             phone="91234567", hashed_password="x", role=UserRole.STALL_OWNER),
+    ])
+    db.flush()
+    db.add(Stall(name="Stall", location="North Spine", owner_id=2))
+    db.flush()
+    db.add(MenuItem(stall_id=1, name="Chicken Rice", price=4.0))
+    db.commit()
+    db.close()
+    user_cache.clear()
+
+    with TestClient(app) as test_client:
+        yield test_client
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture()
+def published(monkeypatch):
+    events = []
+    publish = event_broker.publish
+
+    def record(topics, event_type, data):
+        events.append((event_type, data["status"]))
+        publish(topics, event_type, data)
+
+    monkeypatch.setattr(event_broker, "publish", record)
+    return events
+
+
+def auth(student_id):
+    return {"Authorization": "Bearer " + create_access_token({"sub": student_id})}
+
+
+def place_order(client) -> int:
+    pickup = datetime.now() + timedelta(minutes=30)
+    response = client.post("/api/orders/", headers=auth("U000000001"), json={
+        "stall_id": 1,
+        "items": [{"menu_item_id": 1, "quantity": 1}],
+        "pickup_window_start": pickup.isoformat(),
+        "pickup_window_end": (pickup + timedelta(minutes=15)).isoformat()
+    })
+    assert response.status_code == 200
+    return response.json()["id"]
+
+
+def test_every_queue_transition_is_published(client, published):
+    order_id = place_order(client)
+    for step in ("confirm-payment", "start-preparing", "mark-ready", "mark-completed"):
+        body = {"payment_confirmed": True} if step == "confirm-payment" else None
+        response = client.put(f"/api/orders/{order_id}/{step}", headers=auth("S000000001"), json=body)
+        assert response.status_code == 200
+
+    queue_statuses = [status for event_type, status in published if event_type == "queue.updated"]
+    assert queue_statuses == [QueueStatus.PREPARING, QueueStatus.READY, QueueStatus.COLLECTED]
+
+
+def test_failed_payment_releases_the_queue_place(client, published):
+    order_id = place_order(client)
+    response = client.put(f"/api/orders/{order_id}/confirm-payment", headers=auth("S000000001"),
+                          json={"payment_confirmed": False})
+    assert response.status_code == 200
+    assert ("queue.updated", QueueStatus.CANCELLED) in published
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Query-budget checks for routes that are prone to lazy-load N+1 patterns.
+Run with: pytest test_query_budget.py
+"""
+
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+# Point the app at a throwaway database before importing it
+DB_PATH = os.path.join(tempfile.mkdtemp(), "query_budget_test.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.database.database import Base, engine, SessionLocal
+from app.main import app
+from app.models.order import Order, OrderStatus
+from app.models.stall import Stall
+from app.models.user import User, UserRole
+from app.routes.auth import create_access_token
+from app.services.user_cache import user_cache
+from app.utils.query_counter import QueryBudgetExceeded, QueryCounter, query_budget
+
+N_ORDERS = 30
+
+
+@pytest.fixture(scope="module")
+def client():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    admin = User(ntu_email="admin@e.ntu.edu.sg", student_id="ADMIN001", name="Admin",
+                 phone="91234567", hashed_password="x", role=UserRole.ADMIN)
+    students = [
+        User(ntu_email=f"s{i}@e.ntu.edu.sg", student_id=f"U{i:09d}", name=f"Student {i}",
+             phone="91234567", hashed_password="x", role=UserRole.STUDENT)
+        for i in range(5)
+    ]
+    stalls = [Stall(name=f"Stall {i}", location="North Spine") for i in range(3)]
+    db.add_all([admin, *students, *stalls])
+    db.flush()
+    now = datetime.utcnow()
+    db.add_all([
+        Order(user_id=students[i % 5].id, stall_id=stalls[i % 3].id, total_amount=5.0,
+              status=OrderStatus.CONFIRMED, order_number=f"ORD{i:05d}",
+              created_at=now - timedelta(minutes=i))
+        for i in range(N_ORDERS)
+    ])
+    db.commit()
+    db.close()
+    user_cache.clear()
+
+    yield TestClient(app)
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def admin_headers(client):
+    headers = {"Authorization": "Bearer " + create_access_token({"sub": "ADMIN001"})}
+    # Warm the auth cache so budgets measure the route, not the login lookup
+    client.get("/api/admin/analytics/recent-activity?limit=1", headers=headers)
+    return headers
+
+
+def test_recent_activity_is_one_query(client, admin_headers):
+    with query_budget(1):
+        response = client.get(f"/api/admin/analytics/recent-activity?limit={N_ORDERS}", headers=admin_headers)
+    assert response.status_code == 200
+    rows = response.json()
+    assert len(rows) == N_ORDERS
+    assert rows[0]["order_number"] == "ORD00000"
+    assert rows[0]["user_name"] == "Student 0"
+    assert rows[0]["stall_name"] == "Stall 0"
+
+
+def test_budget_catches_lazy_loads(client):
+    db = SessionLocal()
+    try:
+        with pytest.raises(QueryBudgetExceeded) as excinfo:
+            with query_budget(1):
+                orders = db.query(Order).limit(5).all()
+                [(order.user.name, order.stall.name) for order in orders]
+        assert "budget is 1" in str(excinfo.value)
+    finally:
+        db.close()
+
+
+def test_counter_is_inactive_outside_block(client):
+    counter = QueryCounter()
+    with counter:
+        db = SessionLocal()
+        db.query(Order).count()
+        db.close()
+    recorded = counter.count
+    db = SessionLocal()
+    db.query(Order).count()
+    db.close()
+    assert recorded == 1
+    assert counter.count == recorded
+
+
+def test_server_timing_reports_request_queries(client, admin_headers):
+    response = client.get("/api/admin/analytics/recent-activity?limit=5", headers=admin_headers)
+    assert response.headers["server-timing"].startswith("db;dur=")
+    assert 'desc="1 queries"' in response.headers["server-timing"]
+
+
+def test_internal_metrics_groups_by_route_template(client, admin_headers, monkeypatch):
+    monkeypatch.setattr(settings, "INTERNAL_METRICS_TOKEN", "scrape-token")
+    internal_headers = {"Authorization": "Bearer scrape-token"}
+    client.post("/internal/metrics/reset", headers=internal_headers)
+    client.get("/api/admin/analytics/recent-activity?limit=5", headers=admin_headers)
+    routes = client.get("/internal/metrics", headers=internal_headers).json()["queries"]["routes"]
+    stats = routes["GET /api/admin/analytics/recent-activity"]
+    assert stats["requests"] == 1
+    assert stats["max_statements"] == 1
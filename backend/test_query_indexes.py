@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+EXPLAIN-based checks that the hot order and queue queries use the composite indexes.
+Run with: pytest test_query_indexes.py
+"""
+
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "query_indexes_test.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+from sqlalchemy import func, select, text
+
+from app.database.database import Base, engine
+from app.models import user, stall, menu, otp, email  # noqa: F401 - register tables
+from app.models.order import Order, OrderStatus
+from app.models.queue import QueueEntry, QueueStatus
+
+
+@pytest.fixture(scope="module", autouse=True)
+def schema():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+def query_plan(statement) -> str:
+    sql = str(statement.compile(engine, compile_kwargs={"literal_binds": True}))
+    with engine.connect() as conn:
+        rows = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+    return "\n".join(row[-1] for row in rows)
+
+
+def assert_uses_index(statement, index_name: str):
+    plan = query_plan(statement)
+    assert index_name in plan, f"expected {index_name} in plan:\n{plan}"
+    assert "USE TEMP B-TREE FOR ORDER BY" not in plan, f"unexpected sort in plan:\n{plan}"
+
+
+def test_stall_orders_by_status():
+    statement = select(Order).where(
+        Order.stall_id == 1, Order.status == OrderStatus.CONFIRMED
+    ).order_by(Order.created_at.desc())
+    assert_uses_index(statement, "ix_orders_stall_status_created")
+
+
+def test_stall_orders_without_status():
+    statement = select(Order).where(Order.stall_id == 1).order_by(Order.created_at.desc())
+    assert_uses_index(statement, "ix_orders_stall_created")
+
+
+def test_stall_order_changes_since():
+    statement = select(Order).where(
+        Order.stall_id == 1, Order.updated_at > datetime(2025, 1, 1)
+    ).order_by(Order.updated_at, Order.id)
+    assert "ix_orders_stall_updated" in query_plan(statement)
+
+
+def test_user_orders():
+    statement = select(Order).where(Order.user_id == 1).order_by(Order.created_at.desc())
+    assert_uses_index(statement, "ix_orders_user_created")
+
+
+def test_stall_queue():
+    statement = select(QueueEntry).where(
+        QueueEntry.stall_id == 1,
+        QueueEntry.status.in_([QueueStatus.WAITING, QueueStatus.PREPARING])
+    ).order_by(QueueEntry.id)
+    assert "ix_queue_entries_stall_status_id" in query_plan(statement)
+
+
+def test_active_queue_count():
+    statement = select(func.count(QueueEntry.id)).where(
+        QueueEntry.stall_id == 1,
+        QueueEntry.status.in_([QueueStatus.WAITING, QueueStatus.PREPARING])
+    )
+    assert "ix_queue_entries_stall_status_id" in query_plan(statement)
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Tests for the in-memory queue index behind /api/queue/position.
+Run with: pytest test_queue_index.py
+"""
+
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+# Point the app at a throwaway database before importing it
+DB_PATH = os.path.join(tempfile.mkdtemp(), "queue_index_test.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.database.database import Base, engine, SessionLocal
+from app.main import app
+from app.models.menu import MenuItem
+from app.models.queue import QueueEntry, QueueStatus
+from app.models.stall import Stall
+from app.models.user import User, UserRole
+from app.routes.auth import create_access_token
+from app.services.queue_index import QueueIndex, queue_index
+from app.services.user_cache import user_cache
+
+
+@pytest.fixture(scope="module")
+def client():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    student = User(ntu_email="s@e.ntu.edu.sg", student_id="U000000001", name="Student",
+                   phone="91234567", hashed_password="x", role=UserRole.STUDENT)
+    owner = User(ntu_email="o@e.ntu.edu.sg", student_id="S000000001", name="Owner",
+                 phone="91234567", hashed_password="x", role=UserRole.STALL_OWNER)
+    db.add_all([student, owner])
+    db.flush()
+    stall = Stall(name="Stall", location="North Spine", owner_id=owner.id)
+    db.add(stall)
+    db.flush()
+    db.add(MenuItem(stall_id=stall.id, name="Chicken Rice", price=4.0))
+    db.commit()
+    db.close()
+    user_cache.clear()
+
+    with TestClient(app) as test_client:
+        yield test_client
+    Base.metadata.drop_all(bind=engine)
+
+
+def auth(student_id):
+    return {"Authorization": "Bearer " + create_access_token({"sub": student_id})}
+
+
+def place_order(client):
+    pickup = datetime.now() + timedelta(minutes=30)
+    response = client.post("/api/orders/", headers=auth("U000000001"), json={
+        "stall_id": 1,
+        "items": [{"menu_item_id": 1, "quantity": 1}],
+        "pickup_window_start": pickup.isoformat(),
+        "pickup_window_end": (pickup + timedelta(minutes=15)).isoformat()
+    })
+    assert response.status_code == 200
+    return response.json()["id"]
+
+
+def test_orders_ahead_follows_join_order():
+    index = QueueIndex()
+    for entry_id in (3, 1, 2):  # commits may land out of id order
+        index.apply(entry_id, stall_id=7, in_line=True)
+    assert [index.orders_ahead(7, entry_id) for entry_id in (1, 2, 3)] == [0, 1, 2]
+
+    index.apply(1, stall_id=7, in_line=False)
+    index.apply(1, stall_id=7, in_line=False)
+    assert index.orders_ahead(7, 3) == 1
+    assert index.queue_length(7) == 2
+    assert index.orders_ahead(8, 3) == 0
+
+
+def test_only_committed_changes_reach_the_index(client):
+    order_id = place_order(client)
+    db = SessionLocal()
+    try:
+        entry = db.query(QueueEntry).filter(QueueEntry.order_id == order_id).one()
+        length = queue_index.queue_length(entry.stall_id)
+
+        entry.status = QueueStatus.READY
+        db.flush()
+        db.rollback()
+        assert queue_index.queue_length(entry.stall_id) == length
+
+        entry.status = QueueStatus.READY
+        db.commit()
+        assert queue_index.queue_length(entry.stall_id) == length - 1
+    finally:
+        db.close()
+
+
+def test_completions_update_position_without_renumbering(client):
+    first, second, third = (place_order(client) for _ in range(3))
+
+    position = client.get(f"/api/queue/position/{third}", headers=auth("U000000001")).json()
+    ahead = position["orders_ahead"]
+    assert ahead >= 2
+
+    response = client.put("/api/queue/update", headers=auth("S000000001"),
+                          json={"completed_order_ids": [first, second]})
+    assert response.status_code == 200
+
+    after = client.get(f"/api/queue/position/{third}", headers=auth("U000000001")).json()
+    assert after["orders_ahead"] == ahead - 2
+    # The reported position is the live rank, not the ticket number handed out at ordering time
+    assert position["queue_position"] == ahead + 1
+    assert after["queue_position"] == ahead - 1
+
+
+def test_stall_queue_lists_entries_in_join_order(client):
+    carried_over, today = place_order(client), place_order(client)
+    db = SessionLocal()
+    try:
+        # Queue numbers restart daily, so yesterday's #57 can still be waiting behind today's #1
+        for order_id, number in ((carried_over, 57), (today, 1)):
+            db.query(QueueEntry).filter(QueueEntry.order_id == order_id).update({"queue_position": number})
+        db.commit()
+    finally:
+        db.close()
+
+    listed = [entry["order_id"] for entry in client.get("/api/queue/1").json()["queue_entries"]]
+    assert listed.index(carried_over) < listed.index(today)
+
+    ahead = {
+        order_id: client.get(f"/api/queue/position/{order_id}", headers=auth("U000000001")).json()["orders_ahead"]
+        for order_id in (carried_over, today)
+    }
+    assert ahead[today] == ahead[carried_over] + 1
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Tests for content-hash ETags on the stall and menu catalogue.
+Run with: pytest test_response_versions.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from starlette.requests import Request
+
+from app.services.response_versions import ResponseVersions
+
+
+def request(if_none_match=None):
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/api/stalls/", "query_string": b"", "headers": headers})
+
+
+def test_etags_agree_across_workers_and_follow_the_content():
+    worker_a, worker_b = ResponseVersions(), ResponseVersions()
+    menu = [{"id": 1, "name": "Chicken Rice", "price": 4.0}]
+
+    first = worker_a.json_response(menu, request())
+    etag = first.headers["etag"]
+    assert first.status_code == 200
+
+    # Another worker serving the same content answers the revalidation with a 304
+    assert worker_b.json_response(menu, request(etag)).status_code == 304
+
+    # Once the content changes, the old ETag no longer matches anywhere
+    changed = [{"id": 1, "name": "Chicken Rice", "price": 4.5}]
+    response = worker_b.json_response(changed, request(etag))
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert worker_b.stats() == {"served": 1, "not_modified": 1}
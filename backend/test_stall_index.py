@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Tests for the stall spatial index behind /api/stalls/nearby.
+Run with: pytest test_stall_index.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+# Point the app at a throwaway database before importing it
+DB_PATH = os.path.join(tempfile.mkdtemp(), "stall_index_test.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.stall_index import StallSpatialIndex
+from app.utils.distance import calculate_distances
+
+STALLS = [(i, 1.340 + (i % 6) * 0.002, 103.680 + (i // 6) * 0.002) for i in range(1, 31)]
+
+
+@pytest.fixture(scope="module")
+def index():
+    index = StallSpatialIndex()
+    index.load(STALLS + [(31, None, None)])
+    return index
+
+
+def brute_force(lat, lon, k, radius_km):
+    distances = calculate_distances(lat, lon, [s[1] for s in STALLS], [s[2] for s in STALLS])
+    ranked = sorted((float(d), s[0]) for s, d in zip(STALLS, distances) if radius_km is None or float(d) <= radius_km)
+    return [(stall_id, distance) for distance, stall_id in ranked[:k]]
+
+
+@pytest.mark.parametrize("lat, lon", [(1.347, 103.683), (1.3, 100.0), (0.0, 90.0), (0.0, 0.0), (89.99, 103.68)])
+@pytest.mark.parametrize("k, radius_km", [(5, None), (100, None), (10, 0.5), (10, 5000.0)])
+def test_matches_a_full_scan_and_stays_fast(index, lat, lon, k, radius_km):
+    started = time.perf_counter()
+    assert index.nearest(lat, lon, k=k, radius_km=radius_km) == brute_force(lat, lon, k, radius_km)
+    # Far-away query points used to walk every ring between them and the stalls
+    assert time.perf_counter() - started < 0.5
+
+
+def test_nearby_rejects_coordinates_off_the_globe():
+    client = TestClient(app)
+    assert client.get("/api/stalls/nearby?lat=91&lng=103.68").status_code == 422
+    assert client.get("/api/stalls/nearby?lat=1.34&lng=-181").status_code == 422